@@ -12,6 +12,8 @@ from .users import router as users_router
 from .audit import router as audit_router
 from .search import router as search_router
 from .data_exchange import router as data_exchange_router
+from .menu_history import router as menu_history_router
+from .images import router as images_router
 
 # Main admin router
 router = APIRouter(prefix="/admin")
@@ -25,5 +27,7 @@ router.include_router(users_router, tags=["users"])
 router.include_router(audit_router, tags=["audit"])
 router.include_router(search_router, tags=["search"])
 router.include_router(data_exchange_router, tags=["data-exchange"])
+router.include_router(menu_history_router, tags=["menu-history"])
+router.include_router(images_router, tags=["images"])
 
 __all__ = ["router"]
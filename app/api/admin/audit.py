@@ -1,6 +1,8 @@
 """Audit log routes for admin panel."""
-from fastapi import APIRouter, Depends, Request, Query
-from fastapi.responses import HTMLResponse
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Optional
@@ -8,9 +10,9 @@ from typing import Optional
 from app.database import get_db
 from app.models import AdminUser
 from app.services.auth import get_current_admin
-from app.services.audit import AuditService
-from app.schemas import PaginatedResponse, AuditLogListItem
-from .dependencies import templates
+from app.services.audit import AuditService, AuditExporter, EXPORT_FORMATS, audit_writer, audit_archive
+from app.schemas import CursorPaginatedResponse, AuditLogListItem
+from .dependencies import templates, settings
 
 router = APIRouter()
 
@@ -33,7 +35,8 @@ async def audit_logs_page(
         {
             "request": request,
             "admin": admin,
-            "admins": admins
+            "admins": admins,
+            "retention_days": settings.audit_retention_days
         }
     )
 
@@ -42,25 +45,45 @@ async def audit_logs_page(
 
 @router.get("/api/audit-logs")
 async def api_audit_logs_list(
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
+    direction: str = Query("next", pattern="^(next|prev)$"),
     per_page: int = Query(50, ge=1, le=100),
     entity_type: Optional[str] = Query(None),
     admin_user_id: Optional[int] = Query(None),
     action: Optional[str] = Query(None),
     entity_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    source: str = Query("hot", pattern="^(hot|archive)$"),
+    with_total: bool = Query(False),
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Получить логи аудита с пагинацией и фильтрами"""
-    audit_service = AuditService(db)
-    logs, total = await audit_service.get_logs(
-        page=page,
-        per_page=per_page,
+    """
+    Получить логи аудита с курсорной пагинацией и фильтрами.
+    source=archive - из архива, with_total=true - с общим количеством.
+    """
+    filters = dict(
+        limit=per_page,
+        cursor=cursor,
+        direction=direction,
         entity_type=entity_type,
         admin_user_id=admin_user_id,
         action=action,
-        entity_id=entity_id
+        entity_id=entity_id,
+        date_from=date_from,
+        date_to=date_to,
+        with_total=with_total
     )
+    try:
+        if source == "archive":
+            # Архив читается с диска, не блокируем event loop
+            result = await run_in_threadpool(audit_archive.query, **filters)
+        else:
+            audit_service = AuditService(db)
+            result = await audit_service.get_logs(**filters)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
 
     items = [
         AuditLogListItem(
@@ -71,12 +94,82 @@ async def api_audit_logs_list(
             entity_type_display=log.entity_type_display,
             entity_id=log.entity_id,
             entity_name=log.entity_name,
-            admin_username=log.admin_user.username if log.admin_user else None,
+            admin_username=log.admin_username,
             created_at=log.created_at.isoformat() if log.created_at else "",
             old_data=log.old_data,
             new_data=log.new_data
         )
-        for log in logs
+        for log in result.logs
     ]
 
-    return PaginatedResponse.create(items=items, total=total, page=page, per_page=per_page)
+    return CursorPaginatedResponse.create(
+        items=items,
+        per_page=per_page,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
+        total=result.total
+    )
+
+
+@router.get("/api/audit-logs/export")
+async def api_audit_logs_export(
+    format: str = Query("csv", pattern="^(csv|jsonl)$"),
+    entity_type: Optional[str] = Query(None),
+    admin_user_id: Optional[int] = Query(None),
+    action: Optional[str] = Query(None),
+    entity_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    source: str = Query("all", pattern="^(all|hot|archive)$"),
+    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Потоковая выгрузка журнала аудита в CSV или JSONL (от старых к новым).
+    Фильтры те же, что у списка; source=all - архив и последние записи.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="Дата начала позже даты окончания")
+
+    filters = dict(
+        source=source,
+        entity_type=entity_type,
+        admin_user_id=admin_user_id,
+        action=action,
+        entity_id=entity_id,
+        date_from=date_from,
+        date_to=date_to
+    )
+
+    # Выгрузка журнала сама попадает в журнал
+    audit_service = AuditService(db)
+    await audit_service.log(
+        admin_user_id=admin.id,
+        action="export",
+        entity_type="system",
+        entity_name="Журнал аудита",
+        new_data={
+            "format": format,
+            **{key: str(value) if isinstance(value, date) else value
+               for key, value in filters.items() if value}
+        }
+    )
+
+    # Поток читает данные в своей сессии: он продолжается после выхода из обработчика
+    exporter = AuditExporter()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return StreamingResponse(
+        exporter.stream(format, **filters),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f"attachment; filename=audit_{timestamp}.{format}"
+        }
+    )
+
+
+@router.get("/api/audit-logs/writer-metrics")
+async def api_audit_writer_metrics(
+    admin: AdminUser = Depends(get_current_admin)
+):
+    """Метрики записи аудита: глубина очереди и время сброса пачек"""
+    return audit_writer.get_metrics()
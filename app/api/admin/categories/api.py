@@ -6,9 +6,11 @@ from slugify import slugify
 from typing import Optional
 
 from app.database import get_db
-from app.models import Category, Dish, AdminUser
+from app.models import Category, AdminUser
 from app.services.auth import get_current_admin
 from app.services.audit import AuditService, model_to_dict
+from app.services.search import search_index
+from app.services.dashboard_stats import DashboardStatsService
 from app.schemas.pagination import (
     PaginatedResponse, SortOrder, CategoryListItem, InlineEditResponse
 )
@@ -56,17 +58,6 @@ async def api_categories_list(
     result = await db.execute(query)
     categories = result.scalars().all()
 
-    if categories:
-        category_ids = [c.id for c in categories]
-        dish_counts_result = await db.execute(
-            select(Dish.category_id, func.count(Dish.id).label('count'))
-            .where(Dish.category_id.in_(category_ids))
-            .group_by(Dish.category_id)
-        )
-        dish_counts = {row.category_id: row.count for row in dish_counts_result}
-    else:
-        dish_counts = {}
-
     items = [
         CategoryListItem(
             id=c.id,
@@ -75,7 +66,7 @@ async def api_categories_list(
             description=c.description,
             is_active=c.is_active,
             sort_order=c.sort_order,
-            dishes_count=dish_counts.get(c.id, 0)
+            dishes_count=c.dishes_total
         )
         for c in categories
     ]
@@ -116,8 +107,13 @@ async def api_category_inline_edit(
     category_name = category.name
     category_id = category.id
 
+    if 'is_active' in updated_fields:
+        await DashboardStatsService(db).categories_changed()
+
+    await db.commit()
+
     audit_service = AuditService(db)
-    audit_result = await audit_service.log_update(
+    await audit_service.log_update(
         admin_user_id=admin.id,
         entity_type='category',
         entity_id=category_id,
@@ -126,8 +122,8 @@ async def api_category_inline_edit(
         new_data=new_data
     )
 
-    if audit_result is None:
-        await db.commit()
+    if 'name' in updated_fields:
+        search_index.index_category(category)
 
     return InlineEditResponse(
         success=True,
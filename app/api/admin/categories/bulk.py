@@ -8,8 +8,11 @@ from sqlalchemy import select, delete, update
 from app.database import get_db
 from app.models import Category, Dish, AdminUser
 from app.services.auth import get_current_admin
-from app.services.audit import AuditService
+from app.services.audit import AuditService, audit_writer
+from app.services.menu_history import MenuHistory
 from app.services.data_exchange import DataExchangeService
+from app.services.search import search_index
+from app.services.dashboard_stats import DashboardStatsService
 from ..schemas import ReorderRequest, BulkActionRequest
 
 router = APIRouter()
@@ -27,6 +30,12 @@ async def categories_reorder(
             update(Category).where(Category.id == item.id).values(sort_order=item.sort_order)
         )
     await db.commit()
+
+    await AuditService(db).log_reorder(
+        admin_user_id=admin.id,
+        entity_type='category',
+        sort_orders={item.id: item.sort_order for item in request.items}
+    )
     return JSONResponse({"success": True})
 
 
@@ -37,6 +46,11 @@ async def categories_bulk(
     db: AsyncSession = Depends(get_db)
 ):
     """Bulk actions: delete, activate, deactivate."""
+    result = await db.execute(
+        select(Category.id, Category.name, Category.is_active).where(Category.id.in_(request.ids))
+    )
+    targets = result.all()
+
     if request.action == "delete":
         for cat_id in request.ids:
             result = await db.execute(select(Dish).where(Dish.category_id == cat_id))
@@ -54,7 +68,25 @@ async def categories_bulk(
     else:
         raise HTTPException(status_code=400, detail="Неизвестное действие")
 
+    await DashboardStatsService(db).categories_changed()
     await db.commit()
+    if request.action == "delete":
+        for cat_id in request.ids:
+            search_index.remove_category(cat_id)
+
+    if targets:
+        changed_ids = None
+        if request.action != "delete":
+            active = request.action == "activate"
+            changed_ids = [t.id for t in targets if bool(t.is_active) != active]
+        await AuditService(db).log_bulk_action(
+            admin_user_id=admin.id,
+            action=request.action,
+            entity_type='category',
+            entity_ids=[t.id for t in targets],
+            entity_names=[t.name for t in targets],
+            changed_ids=changed_ids
+        )
     return JSONResponse({"success": True, "affected": len(request.ids)})
 
 
@@ -119,6 +151,11 @@ async def api_categories_import(
         }
     )
 
+    # Imports cannot be replayed from the audit log: snapshot the menu now
+    await audit_writer.flush()
+    await MenuHistory(db).take_snapshot()
+    await db.commit()
+
     return {
         "success": True,
         "created": created,
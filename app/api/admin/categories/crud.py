@@ -8,6 +8,9 @@ from slugify import slugify
 from app.database import get_db
 from app.models import Category, Dish, AdminUser
 from app.services.auth import get_current_admin
+from app.services.audit import AuditService, model_to_dict
+from app.services.search import search_index
+from app.services.dashboard_stats import DashboardStatsService
 from ..dependencies import templates
 
 router = APIRouter()
@@ -57,7 +60,18 @@ async def category_create(
         is_active=is_active
     )
     db.add(category)
+    await DashboardStatsService(db).categories_changed()
     await db.commit()
+    search_index.index_category(category)
+
+    await db.refresh(category)
+    await AuditService(db).log_create(
+        admin_user_id=admin.id,
+        entity_type='category',
+        entity_id=category.id,
+        entity_name=category.name,
+        new_data=model_to_dict(category)
+    )
     return RedirectResponse(url="/admin/categories", status_code=302)
 
 
@@ -94,12 +108,25 @@ async def category_update(
     if not category:
         raise HTTPException(status_code=404)
 
+    old_data = model_to_dict(category)
     category.name = name
     category.slug = slugify(name, lowercase=True)
     category.description = description
     category.sort_order = sort_order
     category.is_active = is_active
+    await DashboardStatsService(db).categories_changed()
     await db.commit()
+    search_index.index_category(category)
+
+    await db.refresh(category)
+    await AuditService(db).log_update(
+        admin_user_id=admin.id,
+        entity_type='category',
+        entity_id=category.id,
+        entity_name=category.name,
+        old_data=old_data,
+        new_data=model_to_dict(category)
+    )
 
     return RedirectResponse(url="/admin/categories", status_code=302)
 
@@ -114,6 +141,21 @@ async def category_delete(
     if result.scalars().first():
         raise HTTPException(status_code=400, detail="Нельзя удалить категорию с блюдами")
 
+    result = await db.execute(select(Category).where(Category.id == cat_id))
+    category = result.scalar_one_or_none()
+    old_data = model_to_dict(category) if category else None
+
     await db.execute(delete(Category).where(Category.id == cat_id))
+    await DashboardStatsService(db).categories_changed()
     await db.commit()
+    search_index.remove_category(cat_id)
+
+    if old_data:
+        await AuditService(db).log_delete(
+            admin_user_id=admin.id,
+            entity_type='category',
+            entity_id=cat_id,
+            entity_name=old_data['name'],
+            old_data=old_data
+        )
     return RedirectResponse(url="/admin/categories", status_code=302)
@@ -1,69 +1,141 @@
 """API endpoints for dashboard - activity feed."""
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, Request, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.models import AdminUser, AuditLog
 from app.services.auth import get_current_admin
+from app.services.audit import AuditService, AuditRollups, audit_feed, admin_names
 from .constants import ACTION_DISPLAY, ENTITY_TYPE_DISPLAY
 
 router = APIRouter()
 
 
+# Longest long-poll wait, seconds
+MAX_WAIT = 30
+# Most events returned by one incremental request
+MAX_NEW_EVENTS = 50
+
+
+def _activity_item(log: AuditLog) -> dict:
+    """Serialize an audit event for the activity feed."""
+    # Format diff for update actions
+    diff_data = None
+    if log.action == "update" and log.new_data:
+        diff_data = {}
+        for key, value in log.new_data.items():
+            if isinstance(value, dict) and "old" in value and "new" in value:
+                diff_data[key] = {"old": value["old"], "new": value["new"]}
+
+    return {
+        "id": log.id,
+        "admin_username": log.admin_username or "Система",
+        "action": log.action,
+        "action_display": ACTION_DISPLAY.get(log.action, log.action),
+        "entity_type": log.entity_type,
+        "entity_type_display": ENTITY_TYPE_DISPLAY.get(log.entity_type, log.entity_type),
+        "entity_id": log.entity_id,
+        "entity_name": log.entity_name or "",
+        "diff": diff_data,
+        "created_at": log.created_at.isoformat() if log.created_at else None,
+    }
+
+
+async def _new_activity(db: AsyncSession, after_id: int, wait: float) -> list:
+    """
+    Events newer than after_id, newest first.
+
+    Waits up to `wait` seconds for the audit writer to publish new events,
+    then serves them from the in-process feed. The database is read only
+    when the feed cannot account for every new event (written by another
+    process or already evicted), including after a timeout.
+    """
+    if wait:
+        # Don't hold a pooled connection (checked out by get_current_admin)
+        # for the whole wait; the session reconnects if it reads afterwards
+        await db.close()
+    published = await audit_feed.wait(after_id, wait) if wait else audit_feed.last_id > after_id
+    events = audit_feed.since(after_id) if published else None
+
+    if events is None:
+        logs = await AuditService(db).get_logs_after(after_id, limit=MAX_NEW_EVENTS)
+        return [_activity_item(log) for log in logs]
+
+    columns = AuditLog.__table__.columns.keys()
+    logs = [
+        AuditLog(**{key: value for key, value in event.items() if key in columns})
+        for event in events[:MAX_NEW_EVENTS]
+    ]
+    await admin_names.attach(db, logs)
+    return [_activity_item(log) for log in logs]
+
+
 @router.get("/api/activity")
 async def get_activity(
     request: Request,
     period: str = Query("all", description="Period: today, week, month, all"),
+    cursor: Optional[str] = Query(None, description="Cursor of the next (older) page"),
+    after_id: Optional[int] = Query(None, ge=0, description="Only events newer than this id"),
+    wait: float = Query(0, ge=0, le=MAX_WAIT, description="Long-poll: seconds to wait for new events"),
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """API endpoint for AJAX loading activity history with filters."""
-    query = select(AuditLog).options(selectinload(AuditLog.admin_user))
+    """
+    API endpoint for AJAX loading activity history with filters.
+
+    With after_id returns only newer events (any period) and, with wait,
+    holds the request until one arrives or the timeout passes.
+    """
+    if after_id is not None:
+        items = await _new_activity(db, after_id, wait)
+        last_id = max([after_id] + [item["id"] for item in items])
+        return JSONResponse(content={"items": items, "last_id": last_id})
 
     # Period filter
     now = datetime.now()
+    since = None
     if period == "today":
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        query = query.where(AuditLog.created_at >= start_of_day)
+        since = now.replace(hour=0, minute=0, second=0, microsecond=0)
     elif period == "week":
-        week_ago = now - timedelta(days=7)
-        query = query.where(AuditLog.created_at >= week_ago)
+        since = now - timedelta(days=7)
     elif period == "month":
-        month_ago = now - timedelta(days=30)
-        query = query.where(AuditLog.created_at >= month_ago)
-
-    # Sort and limit
-    query = query.order_by(AuditLog.created_at.desc()).limit(15)
-
-    result = await db.execute(query)
-    logs = result.scalars().all()
-
-    # Build JSON response
-    items = []
-    for log in logs:
-        # Format diff for update actions
-        diff_data = None
-        if log.action == "update" and log.new_data:
-            diff_data = {}
-            for key, value in log.new_data.items():
-                if isinstance(value, dict) and "old" in value and "new" in value:
-                    diff_data[key] = {"old": value["old"], "new": value["new"]}
-
-        items.append({
-            "id": log.id,
-            "admin_username": log.admin_user.username if log.admin_user else "Система",
-            "action": log.action,
-            "action_display": ACTION_DISPLAY.get(log.action, log.action),
-            "entity_type": log.entity_type,
-            "entity_type_display": ENTITY_TYPE_DISPLAY.get(log.entity_type, log.entity_type),
-            "entity_id": log.entity_id,
-            "entity_name": log.entity_name or "",
-            "diff": diff_data,
-            "created_at": log.created_at.isoformat() if log.created_at else None,
-        })
-
-    return JSONResponse(content={"items": items})
+        since = now - timedelta(days=30)
+
+    # Keyset page of 15 newest events
+    try:
+        page = await AuditService(db).get_logs(limit=15, cursor=cursor, since=since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    items = [_activity_item(log) for log in page.logs]
+    return JSONResponse(content={"items": items, "next_cursor": page.next_cursor})
+
+
+@router.get("/api/activity/stats")
+async def get_activity_stats(
+    days: int = Query(14, ge=1, le=366, description="Number of days, today included"),
+    admin_user_id: Optional[int] = Query(None, description="Per-day counts of one admin"),
+    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Activity counts from the daily rollups: per day, admin, action and entity type."""
+    rollups = AuditRollups(db)
+    per_day = await rollups.per_day(days, admin_user_id)
+    by_action = await rollups.by_field("action", days)
+    by_entity_type = await rollups.by_field("entity_type", days)
+
+    return JSONResponse(content={
+        "per_day": [{"day": row["day"].isoformat(), "count": row["count"]} for row in per_day],
+        "by_admin": await rollups.by_admin(days),
+        "by_action": [
+            {**row, "action_display": ACTION_DISPLAY.get(row["action"], row["action"])}
+            for row in by_action
+        ],
+        "by_entity_type": [
+            {**row, "entity_type_display": ENTITY_TYPE_DISPLAY.get(row["entity_type"], row["entity_type"])}
+            for row in by_entity_type
+        ],
+    })
@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
 from app.database import get_db
-from app.models import Category, Dish, AdminUser
+from app.models import Category, AdminUser
 from app.services.auth import get_current_admin
 from .dependencies import templates
 
@@ -20,7 +20,7 @@ async def data_exchange_page(
 ):
     """Page for data import/export."""
     # Get counts
-    dishes_count = await db.scalar(select(func.count(Dish.id)))
+    dishes_count = await db.scalar(select(func.sum(Category.dishes_total)))
     categories_count = await db.scalar(select(func.count(Category.id)))
 
     return templates.TemplateResponse(
@@ -1,15 +1,19 @@
-"""REST API endpoints for dishes - paginated list, inline edit."""
+"""REST API endpoints for dishes - paginated list, inline edit, change history."""
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, or_
 from sqlalchemy.orm import selectinload
 from slugify import slugify
 from typing import Optional
+from datetime import date
 
 from app.database import get_db
 from app.models import Dish, AdminUser
 from app.services.auth import get_current_admin
-from app.services.audit import AuditService, model_to_dict
+from app.services.audit import AuditService, DishHistory, model_to_dict
+from app.services.search import search_index
+from app.services.category_counters import CategoryCounters
+from app.services.dashboard_stats import DashboardStatsService, dish_contribution
 from app.schemas.pagination import (
     PaginatedResponse, SortOrder, DishListItem, InlineEditResponse
 )
@@ -113,8 +117,19 @@ async def api_dish_inline_edit(
     dish_name = dish.name
     dish_id_val = dish.id
 
+    if 'is_available' in updated_fields:
+        await CategoryCounters(db).dish_changed(
+            dish.category_id, old_data['is_available'], dish.category_id, new_data['is_available']
+        )
+    if updated_fields.keys() & {'price', 'calories', 'is_available'}:
+        await DashboardStatsService(db).dishes_changed(
+            dish_contribution(old_data), dish_contribution(new_data)
+        )
+
+    await db.commit()
+
     audit_service = AuditService(db)
-    audit_result = await audit_service.log_update(
+    await audit_service.log_update(
         admin_user_id=admin.id,
         entity_type='dish',
         entity_id=dish_id_val,
@@ -123,8 +138,8 @@ async def api_dish_inline_edit(
         new_data=new_data
     )
 
-    if audit_result is None:
-        await db.commit()
+    if 'name' in updated_fields:
+        search_index.index_dish(dish)
 
     return InlineEditResponse(
         success=True,
@@ -132,3 +147,38 @@ async def api_dish_inline_edit(
         value=list(updated_fields.values())[0] if len(updated_fields) == 1 else updated_fields,
         message="Сохранено"
     )
+
+
+@router.get("/api/dishes/{dish_id}/history")
+async def api_dish_history(
+    dish_id: int,
+    field: str = Query("price", pattern="^(price|is_available)$"),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    bucket: str = Query("change", pattern="^(change|day)$"),
+    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    History of a dish's price or availability.
+
+    bucket=change returns every change; bucket=day one point per day with
+    open/close/min/max values. start_value is the value in effect at
+    date_from.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="Дата начала позже даты окончания")
+
+    history = DishHistory(db)
+    if bucket == "day":
+        points = await history.daily(dish_id, field, date_from, date_to)
+    else:
+        points = await history.changes(dish_id, field, date_from, date_to)
+
+    return {
+        "dish_id": dish_id,
+        "field": field,
+        "bucket": bucket,
+        "start_value": await history.value_before(dish_id, field, date_from) if date_from else None,
+        "points": points,
+    }
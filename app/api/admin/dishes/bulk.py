@@ -8,7 +8,13 @@ from slugify import slugify
 from app.database import get_db
 from app.models import Dish, AdminUser
 from app.services.auth import get_current_admin
+from app.services.audit import AuditService, model_to_dict
 from app.services.image_processor import ImageProcessor
+from app.services.image_pool import image_pool, ImagePoolBusy
+from app.services.image_store import ImageStore
+from app.services.search import search_index
+from app.services.category_counters import CategoryCounters
+from app.services.dashboard_stats import DashboardStatsService, dish_contribution
 from ..schemas import ReorderRequest, BulkActionRequest
 
 router = APIRouter()
@@ -26,6 +32,12 @@ async def dishes_reorder(
             update(Dish).where(Dish.id == item.id).values(sort_order=item.sort_order)
         )
     await db.commit()
+
+    await AuditService(db).log_reorder(
+        admin_user_id=admin.id,
+        entity_type='dish',
+        sort_orders={item.id: item.sort_order for item in request.items}
+    )
     return JSONResponse({"success": True})
 
 
@@ -36,22 +48,53 @@ async def dishes_bulk(
     db: AsyncSession = Depends(get_db)
 ):
     """Bulk actions: delete, activate, deactivate."""
+    counters = CategoryCounters(db)
+    stats = DashboardStatsService(db)
+    if request.action not in ("delete", "activate", "deactivate"):
+        raise HTTPException(status_code=400, detail="Неизвестное действие")
+
+    result = await db.execute(
+        select(Dish.id, Dish.name, Dish.is_available).where(Dish.id.in_(request.ids))
+    )
+    targets = result.all()
+
+    old_stats = await stats.dishes_contribution(request.ids)
     if request.action == "delete":
         for dish_id in request.ids:
             ImageProcessor.delete_images(dish_id)
+        await ImageStore(db).release_dishes(request.ids)
+        await counters.dishes_removed(request.ids)
         await db.execute(delete(Dish).where(Dish.id.in_(request.ids)))
     elif request.action == "activate":
+        await counters.dishes_availability_set(request.ids, True)
         await db.execute(
             update(Dish).where(Dish.id.in_(request.ids)).values(is_available=True)
         )
     elif request.action == "deactivate":
+        await counters.dishes_availability_set(request.ids, False)
         await db.execute(
             update(Dish).where(Dish.id.in_(request.ids)).values(is_available=False)
         )
-    else:
-        raise HTTPException(status_code=400, detail="Неизвестное действие")
+    await stats.dishes_changed(old_stats, await stats.dishes_contribution(request.ids))
 
     await db.commit()
+    if request.action == "delete":
+        for dish_id in request.ids:
+            search_index.remove_dish(dish_id)
+
+    if targets:
+        changed_ids = None
+        if request.action != "delete":
+            available = request.action == "activate"
+            changed_ids = [t.id for t in targets if bool(t.is_available) != available]
+        await AuditService(db).log_bulk_action(
+            admin_user_id=admin.id,
+            action=request.action,
+            entity_type='dish',
+            entity_ids=[t.id for t in targets],
+            entity_names=[t.name for t in targets],
+            changed_ids=changed_ids
+        )
     return JSONResponse({"success": True, "affected": len(request.ids)})
 
 
@@ -62,9 +105,28 @@ async def dish_delete(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a single dish."""
+    result = await db.execute(select(Dish).where(Dish.id == dish_id))
+    dish = result.scalar_one_or_none()
+    old_data = model_to_dict(dish) if dish else None
+
     ImageProcessor.delete_images(dish_id)
+    await ImageStore(db).release_dishes([dish_id])
+    stats = DashboardStatsService(db)
+    old_stats = await stats.dishes_contribution([dish_id])
+    await CategoryCounters(db).dishes_removed([dish_id])
     await db.execute(delete(Dish).where(Dish.id == dish_id))
+    await stats.dishes_changed(old_stats, None)
     await db.commit()
+    search_index.remove_dish(dish_id)
+
+    if old_data:
+        await AuditService(db).log_delete(
+            admin_user_id=admin.id,
+            entity_type='dish',
+            entity_id=dish_id,
+            entity_name=old_data['name'],
+            old_data=old_data
+        )
     return RedirectResponse(url="/admin/dishes", status_code=302)
 
 
@@ -93,14 +155,32 @@ async def dish_duplicate(
     )
     db.add(new_dish)
     await db.flush()
+    await CategoryCounters(db).dish_added(new_dish.category_id, new_dish.is_available)
 
-    if original.image_thumbnail:
-        paths = ImageProcessor.copy_images(original.id, new_dish.id)
+    if original.image_hash:
+        # Shared renditions: only a reference is taken
+        await ImageStore(db).assign(new_dish, original.image_hash)
+    elif original.image_thumbnail:
+        try:
+            paths = await image_pool.copy_images(original.id, new_dish.id)
+        except ImagePoolBusy:
+            raise HTTPException(status_code=503, detail="Сервер занят обработкой изображений, попробуйте позже")
         if paths:
             new_dish.image_thumbnail = paths.get("thumbnail")
             new_dish.image_small = paths.get("small")
             new_dish.image_medium = paths.get("medium")
             new_dish.image_large = paths.get("large")
 
+    await DashboardStatsService(db).dishes_changed(None, dish_contribution(new_dish))
     await db.commit()
+    search_index.index_dish(new_dish)
+
+    await db.refresh(new_dish)
+    await AuditService(db).log_create(
+        admin_user_id=admin.id,
+        entity_type='dish',
+        entity_id=new_dish.id,
+        entity_name=new_dish.name,
+        new_data=model_to_dict(new_dish)
+    )
     return RedirectResponse(url=f"/admin/dishes/{new_dish.id}/edit", status_code=302)
@@ -9,12 +9,29 @@ from slugify import slugify
 from app.database import get_db
 from app.models import Category, Dish, AdminUser
 from app.services.auth import get_current_admin
-from app.services.image_processor import ImageProcessor
-from ..dependencies import templates, settings
+from app.services.audit import AuditService, model_to_dict
+from app.services.image_jobs import ImageJobQueue, image_job_runner
+from app.services.image_processor import InvalidImage
+from app.services.category_counters import CategoryCounters
+from app.services.dashboard_stats import DashboardStatsService, dish_contribution
+from app.services.search import search_index
+from ..dependencies import templates
 
 router = APIRouter()
 
 
+async def _enqueue_upload(db: AsyncSession, dish: Dish, image: UploadFile, admin_id: int) -> bool:
+    """
+    Store an uploaded image and queue its renditions unless they exist.
+    Until they are ready the dish shows the placeholder.
+    """
+    try:
+        job = await ImageJobQueue(db).enqueue(dish, image, admin_id)
+    except InvalidImage as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job is not None
+
+
 @router.get("/dishes", response_class=HTMLResponse)
 async def dishes_list(
     request: Request,
@@ -28,9 +45,11 @@ async def dishes_list(
     dishes = result.scalars().all()
     cat_result = await db.execute(select(Category).order_by(Category.sort_order))
     categories = cat_result.scalars().all()
+    image_jobs_active = await ImageJobQueue(db).active_dish_ids()
     return templates.TemplateResponse(
         "admin/dishes.html",
-        {"request": request, "admin": admin, "dishes": dishes, "categories": categories}
+        {"request": request, "admin": admin, "dishes": dishes, "categories": categories,
+         "image_jobs_active": image_jobs_active}
     )
 
 
@@ -56,6 +75,7 @@ async def dish_create(
     sort_order: int = Form(0), image: UploadFile = File(None),
     admin: AdminUser = Depends(get_current_admin), db: AsyncSession = Depends(get_db)
 ):
+    queued = False
     dish = Dish(
         name=name, slug=slugify(name, lowercase=True), category_id=category_id,
         description=description, price=price, weight=weight,
@@ -64,23 +84,23 @@ async def dish_create(
     )
     db.add(dish)
     await db.flush()
+    await CategoryCounters(db).dish_added(dish.category_id, dish.is_available)
     if image and image.filename:
-        content = await image.read()
-        if len(content) > settings.max_image_size:
-            raise HTTPException(status_code=400, detail="Изображение слишком большое (макс 5MB)")
-        paths = ImageProcessor.process_and_save(content, dish.id, image.filename)
-        dish.image_thumbnail = paths["thumbnail"]
-        dish.image_small = paths["small"]
-        dish.image_medium = paths["medium"]
-        dish.image_large = paths["large"]
-        # Progressive loading optimization
-        dish.image_tiny_base64 = paths.get("tiny_base64")
-        dish.image_dominant_color = paths.get("dominant_color")
-        # AVIF versions
-        dish.image_small_avif = paths.get("small_avif")
-        dish.image_medium_avif = paths.get("medium_avif")
-        dish.image_large_avif = paths.get("large_avif")
+        queued = await _enqueue_upload(db, dish, image, admin.id)
+    await DashboardStatsService(db).dishes_changed(None, dish_contribution(dish))
     await db.commit()
+    search_index.index_dish(dish)
+    if queued:
+        image_job_runner.notify()
+
+    await db.refresh(dish)
+    await AuditService(db).log_create(
+        admin_user_id=admin.id,
+        entity_type='dish',
+        entity_id=dish.id,
+        entity_name=dish.name,
+        new_data=model_to_dict(dish)
+    )
     return RedirectResponse(url="/admin/dishes", status_code=302)
 
 
@@ -95,9 +115,11 @@ async def dish_edit(
         raise HTTPException(status_code=404)
     cat_result = await db.execute(select(Category).where(Category.is_active == True))
     categories = cat_result.scalars().all()
+    image_job = await ImageJobQueue(db).newest_for_dish(dish.id)
     return templates.TemplateResponse(
         "admin/dish_form.html",
-        {"request": request, "admin": admin, "dish": dish, "categories": categories}
+        {"request": request, "admin": admin, "dish": dish, "categories": categories,
+         "image_job": image_job}
     )
 
 
@@ -113,6 +135,10 @@ async def dish_update(
     dish = result.scalar_one_or_none()
     if not dish:
         raise HTTPException(status_code=404)
+    old_data = model_to_dict(dish)
+    old_category_id, old_available = dish.category_id, dish.is_available
+    old_stats = dish_contribution(dish)
+    queued = False
     dish.name = name
     dish.slug = slugify(name, lowercase=True)
     dish.category_id = category_id
@@ -122,22 +148,24 @@ async def dish_update(
     dish.calories = int(calories) if calories else None
     dish.is_available = is_available
     dish.sort_order = sort_order
+    await CategoryCounters(db).dish_changed(
+        old_category_id, old_available, dish.category_id, dish.is_available
+    )
     if image and image.filename:
-        content = await image.read()
-        if len(content) > settings.max_image_size:
-            raise HTTPException(status_code=400, detail="Изображение слишком большое")
-        ImageProcessor.delete_images(dish.id)
-        paths = ImageProcessor.process_and_save(content, dish.id, image.filename)
-        dish.image_thumbnail = paths["thumbnail"]
-        dish.image_small = paths["small"]
-        dish.image_medium = paths["medium"]
-        dish.image_large = paths["large"]
-        # Progressive loading optimization
-        dish.image_tiny_base64 = paths.get("tiny_base64")
-        dish.image_dominant_color = paths.get("dominant_color")
-        # AVIF versions
-        dish.image_small_avif = paths.get("small_avif")
-        dish.image_medium_avif = paths.get("medium_avif")
-        dish.image_large_avif = paths.get("large_avif")
+        queued = await _enqueue_upload(db, dish, image, admin.id)
+    await DashboardStatsService(db).dishes_changed(old_stats, dish_contribution(dish))
     await db.commit()
+    search_index.index_dish(dish)
+    if queued:
+        image_job_runner.notify()
+
+    await db.refresh(dish)
+    await AuditService(db).log_update(
+        admin_user_id=admin.id,
+        entity_type='dish',
+        entity_id=dish.id,
+        entity_name=dish.name,
+        old_data=old_data,
+        new_data=model_to_dict(dish)
+    )
     return RedirectResponse(url="/admin/dishes", status_code=302)
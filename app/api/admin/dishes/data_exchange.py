@@ -7,7 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models import AdminUser
 from app.services.auth import get_current_admin
-from app.services.audit import AuditService
+from app.services.audit import AuditService, audit_writer
+from app.services.menu_history import MenuHistory
 from app.services.data_exchange import DataExchangeService
 
 router = APIRouter()
@@ -57,9 +58,9 @@ async def api_dishes_import(
     service = DataExchangeService(db)
 
     if file.filename.endswith('.xlsx'):
-        created, updated, errors = await service.import_dishes_excel(content)
+        created, updated, errors = await service.import_dishes_excel(content, admin.id)
     elif file.filename.endswith('.csv'):
-        created, updated, errors = await service.import_dishes_csv(content)
+        created, updated, errors = await service.import_dishes_csv(content, admin.id)
     else:
         raise HTTPException(status_code=400, detail="Поддерживаются только CSV и XLSX файлы")
 
@@ -76,6 +77,11 @@ async def api_dishes_import(
         }
     )
 
+    # Imports cannot be replayed from the audit log: snapshot the menu now
+    await audit_writer.flush()
+    await MenuHistory(db).take_snapshot()
+    await db.commit()
+
     return {
         "success": True,
         "created": created,
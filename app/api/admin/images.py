@@ -0,0 +1,88 @@
+"""Image rendition job routes for admin panel."""
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models import AdminUser
+from app.services.auth import get_current_admin
+from app.services.image_jobs import ImageJobQueue, image_job_runner
+from app.services.image_cache import image_cache
+from app.services.image_pool import image_pool
+from app.services.image_store import ImageStore
+
+router = APIRouter()
+
+
+@router.get("/api/images/jobs")
+async def api_image_jobs(
+    dish_id: List[int] = Query(..., description="Блюда (последнее задание каждого)"),
+    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Статусы обработки изображений нескольких блюд (для списка блюд)"""
+    queue = ImageJobQueue(db)
+    jobs = await queue.newest_for_dishes(dish_id[:200])
+    return {"jobs": [await queue.to_dict(job, dish_id) for dish_id, job in jobs.items()]}
+
+
+@router.get("/api/images/jobs/{job_id}")
+async def api_image_job(
+    job_id: int,
+    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Статус задания обработки изображения"""
+    queue = ImageJobQueue(db)
+    job = await queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задание не найдено")
+    return await queue.to_dict(job)
+
+
+@router.get("/api/dishes/{dish_id}/image-job")
+async def api_dish_image_job(
+    dish_id: int,
+    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Последнее задание обработки изображения блюда (null - не загружалось)"""
+    queue = ImageJobQueue(db)
+    job = await queue.newest_for_dish(dish_id)
+    return {"job": await queue.to_dict(job, dish_id) if job else None}
+
+
+@router.post("/api/images/jobs/{job_id}/retry")
+async def api_image_job_retry(
+    job_id: int,
+    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Повторить задание, завершившееся ошибкой"""
+    queue = ImageJobQueue(db)
+    job = await queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задание не найдено")
+    if job.status != 'failed':
+        raise HTTPException(status_code=400, detail="Повторить можно только задание с ошибкой")
+    newest = await queue.newest_for_hash(job.source_hash)
+    blob = await ImageStore(db).get(job.source_hash)
+    if newest.id != job.id or blob is None or blob.ref_count <= 0:
+        raise HTTPException(status_code=400, detail="Изображение уже не используется блюдами")
+    queue.retry(job)
+    await db.commit()
+    image_job_runner.notify()
+    return await queue.to_dict(job)
+
+
+@router.get("/api/images/stats")
+async def api_image_stats(
+    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Состояние пула обработки изображений, кеша /img и итоги проходов кодирования"""
+    return {
+        **image_pool.stats(),
+        "cache": image_cache.stats(),
+        "passes": await ImageJobQueue(db).pass_stats(),
+    }
@@ -0,0 +1,39 @@
+"""Point-in-time menu routes for admin panel."""
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models import AdminUser
+from app.services.auth import get_current_admin
+from app.services.menu_history import MenuHistory
+
+router = APIRouter()
+
+
+@router.get("/api/menu/as-of")
+async def api_menu_as_of(
+    at: datetime = Query(..., description="Момент времени (ISO 8601; без часового пояса - UTC)"),
+    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Меню (категории и блюда) по состоянию на момент времени.
+    Восстанавливается от ближайшего снимка с применением событий журнала.
+    """
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    result = await MenuHistory(db).as_of(at)
+    return JSONResponse(content=result)
+
+
+@router.post("/api/menu/snapshots")
+async def api_menu_snapshot(
+    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Снимок текущего меню (помимо периодических)"""
+    info = await MenuHistory(db).take_snapshot()
+    await db.commit()
+    return {"success": True, **info, "taken_at": info["taken_at"].isoformat()}
@@ -1,12 +1,13 @@
 """Global search routes for admin panel."""
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.models import Category, Dish, AdminUser
 from app.services.auth import get_current_admin
+from app.services.search import search_index
 
 router = APIRouter()
 
@@ -18,46 +19,50 @@ async def api_global_search(
     db: AsyncSession = Depends(get_db)
 ):
     """Глобальный поиск по блюдам и категориям"""
-    search_term = f"%{q}%"
-
-    # Поиск блюд
-    dishes_result = await db.execute(
-        select(Dish)
-        .options(selectinload(Dish.category))
-        .where(
-            or_(
-                Dish.name.ilike(search_term),
-                Dish.description.ilike(search_term)
-            )
-        )
-        .limit(10)
-    )
-    dishes = dishes_result.scalars().all()
-
-    # Поиск категорий
-    categories_result = await db.execute(
-        select(Category)
-        .where(
-            or_(
-                Category.name.ilike(search_term),
-                Category.description.ilike(search_term)
-            )
-        )
-        .limit(5)
-    )
-    categories = categories_result.scalars().all()
+    # Названия ищем по in-memory индексу (раскладка, транслит, опечатки)
+    dishes = [
+        {
+            "id": entry.id,
+            "name": entry.name,
+            "category": search_index.category_name(entry.category_id)
+        }
+        for entry in search_index.search(q, 'dish', limit=10)
+    ]
+    categories = [
+        {"id": entry.id, "name": entry.name}
+        for entry in search_index.search(q, 'category', limit=5)
+    ]
 
-    return {
-        "dishes": [
+    # Если по названиям ничего нет - ищем по описаниям в БД
+    if not dishes and not categories:
+        search_term = f"%{q}%"
+
+        dishes_result = await db.execute(
+            select(Dish)
+            .options(selectinload(Dish.category))
+            .where(Dish.description.ilike(search_term))
+            .limit(10)
+        )
+        dishes = [
             {
                 "id": d.id,
                 "name": d.name,
                 "category": d.category.name if d.category else ""
             }
-            for d in dishes
-        ],
-        "categories": [
+            for d in dishes_result.scalars().all()
+        ]
+
+        categories_result = await db.execute(
+            select(Category)
+            .where(Category.description.ilike(search_term))
+            .limit(5)
+        )
+        categories = [
             {"id": c.id, "name": c.name}
-            for c in categories
+            for c in categories_result.scalars().all()
         ]
+
+    return {
+        "dishes": dishes,
+        "categories": categories
     }
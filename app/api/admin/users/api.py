@@ -8,6 +8,7 @@ from typing import Optional
 from app.database import get_db
 from app.models import AdminUser
 from app.services.auth import get_current_admin
+from app.services.dashboard_stats import DashboardStatsService
 from app.schemas.pagination import PaginatedResponse, AdminUserListItem
 
 router = APIRouter()
@@ -29,6 +30,7 @@ async def user_toggle_active(
         raise HTTPException(status_code=400, detail="Нельзя деактивировать свой аккаунт")
 
     user.is_active = not user.is_active
+    await DashboardStatsService(db).admins_changed()
     await db.commit()
     return RedirectResponse(url="/admin/users", status_code=302)
 
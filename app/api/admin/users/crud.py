@@ -7,6 +7,8 @@ from sqlalchemy import select
 from app.database import get_db
 from app.models import AdminUser
 from app.services.auth import get_current_admin, get_password_hash
+from app.services.dashboard_stats import DashboardStatsService
+from app.services.audit import admin_names
 from ..dependencies import templates
 
 router = APIRouter()
@@ -56,6 +58,7 @@ async def user_create(
         is_active=is_active
     )
     db.add(user)
+    await DashboardStatsService(db).admins_changed()
     await db.commit()
     return RedirectResponse(url="/admin/users", status_code=302)
 
@@ -101,6 +104,8 @@ async def user_update(
     if password:
         user.password_hash = get_password_hash(password)
     user.is_active = is_active
+    await DashboardStatsService(db).admins_changed()
 
     await db.commit()
+    admin_names.invalidate(user.id)
     return RedirectResponse(url="/admin/users", status_code=302)
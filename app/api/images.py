@@ -0,0 +1,50 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.database import get_db
+from app.models import Dish
+from app.services.image_cache import FORMATS, dish_image_source, image_cache
+from app.services.image_pool import image_pool, ImagePoolBusy
+from app.services.image_processor import ImageProcessor
+
+router = APIRouter()
+settings = get_settings()
+
+
+@router.get("/img/{dish_id}/{width}.{fmt}")
+async def dish_image(
+    dish_id: int,
+    width: int,
+    fmt: str,
+    v: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Изображение блюда заданной ширины (создаётся из оригинала при первом запросе).
+    С актуальной версией в ?v= (dish_image_url) кешируется навсегда.
+    """
+    if width not in settings.image_dynamic_widths or fmt not in FORMATS:
+        raise HTTPException(status_code=404)
+    dish = await db.get(Dish, dish_id)
+    source = await dish_image_source(db, dish) if dish else None
+    if source is None:
+        raise HTTPException(status_code=404, detail="Изображение не найдено")
+    version, source_path = source
+    pil_format, media_type = FORMATS[fmt]
+
+    async def render(target):
+        await image_pool.run(ImageProcessor.render_width, source_path, width, pil_format, str(target))
+
+    try:
+        path = await image_cache.get(f"{version[:2]}/{version}/{width}.{fmt}", render)
+    except ImagePoolBusy:
+        raise HTTPException(status_code=503, detail="Сервер занят обработкой изображений, попробуйте позже")
+
+    # Адрес без версии (или со старой) отдаёт текущее изображение: кешируется ненадолго
+    if v == version[:16]:
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        cache_control = "public, max-age=300"
+    return FileResponse(path, media_type=media_type, headers={"Cache-Control": cache_control})
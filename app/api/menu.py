@@ -4,11 +4,33 @@ from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
+from app.config import get_settings
 from app.database import get_db
 from app.models import Category, Dish
+from app.services.image_cache import dish_image_url
+from app.services.serializers import ModelSerializer
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+# {{ dish_image_url(dish, 480, 'avif') }} - любая ширина из image_dynamic_widths
+templates.env.globals["dish_image_url"] = dish_image_url
+# Режим inline-плейсхолдера изображений: "webp" или "thumbhash"
+templates.env.globals["image_placeholder"] = get_settings().image_placeholder
+
+# Поля JSON API (ключ ответа -> колонка модели)
+menu_category = ModelSerializer(Category, fields={"id": "id", "name": "name", "slug": "slug"})
+menu_dish = ModelSerializer(Dish, fields={
+    "id": "id", "name": "name", "slug": "slug", "price": "price",
+    "img": "image_small", "available": "is_available",
+})
+dish_detail_fields = ModelSerializer(Dish, fields={
+    "id": "id", "name": "name", "slug": "slug", "description": "description",
+    "price": "price", "weight": "weight", "calories": "calories",
+})
+dish_images = ModelSerializer(Dish, fields={
+    "thumbnail": "image_thumbnail", "small": "image_small",
+    "medium": "image_medium", "large": "image_large",
+})
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -77,20 +99,9 @@ async def api_menu(db: AsyncSession = Depends(get_db)):
     return {
         "categories": [
             {
-                "id": cat.id,
-                "name": cat.name,
-                "slug": cat.slug,
-                "dishes": [
-                    {
-                        "id": d.id,
-                        "name": d.name,
-                        "slug": d.slug,
-                        "price": float(d.price),
-                        "img": d.image_small,
-                        "available": d.is_available
-                    }
-                    for d in cat.dishes  # Показываем все блюда, включая недоступные
-                ]
+                **menu_category(cat),
+                # Показываем все блюда, включая недоступные
+                "dishes": menu_dish.many(cat.dishes)
             }
             for cat in categories
         ]
@@ -111,22 +122,7 @@ async def api_dish(dish_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404)
 
     return {
-        "id": dish.id,
-        "name": dish.name,
-        "slug": dish.slug,
-        "description": dish.description,
-        "price": float(dish.price),
-        "weight": dish.weight,
-        "calories": dish.calories,
-        "images": {
-            "thumbnail": dish.image_thumbnail,
-            "small": dish.image_small,
-            "medium": dish.image_medium,
-            "large": dish.image_large
-        },
-        "category": {
-            "id": dish.category.id,
-            "name": dish.category.name,
-            "slug": dish.category.slug
-        }
+        **dish_detail_fields(dish),
+        "images": dish_images(dish),
+        "category": menu_category(dish.category)
     }
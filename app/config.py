@@ -30,9 +30,57 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24  # 24 hours
 
+    # Audit tables live in their own database: audit writes don't contend
+    # with menu edits for the main database write lock
+    audit_database_url: str = "sqlite+aiosqlite:///./data/audit.db"
+    audit_journal_mode: str = "WAL"  # SQLite journal mode of the audit database
+    # Audit log writer: events are inserted in batches by a background task
+    audit_batch_size: int = 100
+    audit_flush_interval: float = 1.0  # seconds
+    audit_sync_writes: bool = False  # write every event immediately (tests)
+    # Events that failed to write audit_writer max_attempts times (JSONL)
+    audit_dead_letter_path: str = "data/audit_dead_letter.jsonl"
+    # Audit retention: older events are moved to gzip JSONL files by day
+    audit_retention_days: int = 90
+    audit_archive_dir: str = "data/audit_archive"
+    # Menu snapshots for point-in-time reconstruction (audit events are
+    # replayed from the nearest snapshot)
+    menu_snapshot_interval_hours: float = 24.0
+    menu_snapshot_keep_days: int = 400
+    menu_snapshot_dir: str = ""  # gzip JSON files here; empty - menu_snapshots table
+
     # Image processing
     upload_dir: str = "static/uploads/dishes"
-    max_image_size: int = 500 * 1024 * 1024  # 500MB - no practical limit
+    max_image_size: int = 500 * 1024 * 1024  # bytes of an uploaded image file (streamed to disk)
+    image_max_pixels: int = 64_000_000  # width x height of an uploaded / decoded image
+    upload_spool_size: int = 1024 * 1024  # larger multipart files are buffered on disk
+    upload_chunk_size: int = 1024 * 1024  # uploads are copied in chunks of this size
+    # Uploads are processed in worker processes, off the event loop
+    image_workers: int = 2  # 0 - in a thread of the app process
+    image_max_pending: int = 4  # jobs running or queued; further uploads wait
+    image_queue_timeout: float = 30.0  # seconds to wait for a slot, then 503
+    # Inline placeholder of dish images in pages: "webp" - tiny base64 WebP
+    # (~300 bytes), "thumbhash" - ~33 byte hash decoded by progressive-image.js
+    image_placeholder: str = "webp"
+    image_encode_threads: int = 4  # sizes/formats of one image encoded at once (1 - one by one)
+    # Rendition jobs: uploads store the original and enqueue a job
+    image_originals_dir: str = "data/image_originals"
+    # Fast low-effort first encode of an upload, then a background
+    # max-effort re-encode swaps in the smaller files
+    image_two_pass: bool = True
+    # Content-addressed renditions shared by dishes with the same original
+    image_store_dir: str = "static/uploads/images"
+    image_blob_grace_hours: float = 24.0  # unreferenced renditions are kept this long
+    # On-demand widths (/img/{dish_id}/{width}.{fmt}), rendered from the
+    # original on first request and kept in an LRU disk cache
+    image_dynamic_widths: list[int] = [160, 320, 480, 640, 800, 960, 1280, 1600, 2000]
+    image_cache_dir: str = "data/image_cache"
+    image_cache_max_bytes: int = 512 * 1024 * 1024
+    image_job_concurrency: int = 2  # jobs a runner processes at once
+    image_job_poll_interval: float = 2.0  # seconds between queue checks
+    image_job_max_attempts: int = 3
+    image_job_retry_delay: float = 10.0  # seconds, doubled on every retry
+    image_job_lease_seconds: int = 600  # running job is retried after this
     image_sizes: dict = {
         "thumbnail": (50, 50),
         "small": (200, 200),
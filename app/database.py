@@ -1,3 +1,4 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.config import get_settings
@@ -9,15 +10,47 @@ engine = create_async_engine(
     echo=settings.debug,
 )
 
+# Audit log, its rollups and derived histories: a separate database with its
+# own write lock, journaling and retention
+audit_engine = create_async_engine(
+    settings.audit_database_url,
+    echo=settings.debug,
+)
+
+if audit_engine.dialect.name == "sqlite" and settings.audit_journal_mode:
+    @event.listens_for(audit_engine.sync_engine, "connect")
+    def _audit_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings.audit_journal_mode}")
+        # WAL is durable across application crashes with NORMAL sync
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class AuditBase(DeclarativeBase):
+    """Base of the tables stored in the audit database."""
+    pass
+
+
+# Sessions route audit models to the audit database, everything else
+# (including text() statements) to the main one
 async_session = async_sessionmaker(
     engine,
+    binds={AuditBase: audit_engine},
     class_=AsyncSession,
     expire_on_commit=False
 )
 
-
-class Base(DeclarativeBase):
-    pass
+# Audit database only (audit writer, audit maintenance scripts)
+audit_session = async_sessionmaker(
+    audit_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
 
 
 async def get_db():
@@ -31,3 +64,5 @@ async def get_db():
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    async with audit_engine.begin() as conn:
+        await conn.run_sync(AuditBase.metadata.create_all)
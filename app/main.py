@@ -16,14 +16,20 @@ from datetime import datetime
 from app.config import get_settings
 from app.database import init_db, async_session
 from app.api.menu import router as menu_router
+from app.api.images import router as images_router
 from app.api.admin import router as admin_router
 from app.models.dish import Dish
+from app.services.search import search_index
+from app.services.audit import audit_writer
+from app.services.menu_history import menu_snapshotter
+from app.services.image_pool import image_pool
+from app.services.image_jobs import image_job_runner
 from sqlalchemy import select
 
 settings = get_settings()
 
-# Increase multipart form size limit (default is 1MB, we need unlimited for large images)
-MultiPartParser.max_file_size = 1024 * 1024 * 1024  # 1GB
+# Multipart files above this size are buffered in a temp file, not in memory
+MultiPartParser.spool_max_size = settings.upload_spool_size
 
 
 # Cache headers middleware
@@ -34,7 +40,8 @@ class CacheMiddleware(BaseHTTPMiddleware):
 
         # Статические файлы - долгий кеш
         if path.startswith("/static/"):
-            if path.endswith((".css", ".js")):
+            if path.endswith((".css", ".js")) or path.startswith(f"/{settings.image_store_dir}/"):
+                # Хранилище изображений по хешу: файл по адресу не меняется
                 response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
             elif path.endswith((".webp", ".jpg", ".png", ".avif")):
                 response.headers["Cache-Control"] = "public, max-age=2592000"
@@ -50,8 +57,17 @@ class CacheMiddleware(BaseHTTPMiddleware):
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    async with async_session() as session:
+        await search_index.rebuild(session)
+    await audit_writer.start()
+    await menu_snapshotter.start()
+    await image_job_runner.start()
     yield
-    # Shutdown
+    # Shutdown: write buffered audit events
+    await menu_snapshotter.stop()
+    await image_job_runner.stop()
+    await image_pool.stop()
+    await audit_writer.stop()
 
 
 app = FastAPI(
@@ -73,6 +89,7 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Routers
 app.include_router(menu_router)
+app.include_router(images_router)
 app.include_router(admin_router)
 
 
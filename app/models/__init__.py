@@ -2,5 +2,11 @@ from app.models.category import Category
 from app.models.dish import Dish
 from app.models.admin_user import AdminUser
 from app.models.audit_log import AuditLog
+from app.models.dashboard_stats import DashboardStats
+from app.models.audit_daily_stat import AuditDailyStat
+from app.models.dish_field_change import DishFieldChange
+from app.models.menu_snapshot import MenuSnapshot
+from app.models.image_job import ImageJob
+from app.models.image_blob import ImageBlob
 
-__all__ = ["Category", "Dish", "AdminUser", "AuditLog"]
+__all__ = ["Category", "Dish", "AdminUser", "AuditLog", "DashboardStats", "AuditDailyStat", "DishFieldChange", "MenuSnapshot", "ImageJob", "ImageBlob"]
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Date
+from app.database import AuditBase
+
+
+class AuditDailyStat(AuditBase):
+    """
+    Daily rollup of audit events: count per (day, admin, action, entity type).
+
+    Maintained by the audit writer in the same transaction as the events;
+    rebuilt by scripts/backfill_audit_rollups.py. Rows are kept when raw
+    events are archived (a rebuild only recounts archived days when asked
+    to), so reports do not depend on the log volume.
+    """
+    __tablename__ = "audit_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    # 0 for system events without an admin
+    admin_user_id = Column(Integer, primary_key=True, default=0)
+    action = Column(String(50), primary_key=True)
+    entity_type = Column(String(50), primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AuditDailyStat {self.day} {self.admin_user_id} {self.action} {self.entity_type}: {self.count}>"
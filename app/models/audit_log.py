@@ -1,18 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import AuditBase
+from app.models.types import CompressedJSON
 
 
-class AuditLog(Base):
+class AuditLog(AuditBase):
     """Модель для хранения истории изменений в админ-панели"""
     __tablename__ = "audit_logs"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
-    # Кто сделал изменение
-    admin_user_id = Column(Integer, ForeignKey("admin_users.id", ondelete="SET NULL"), nullable=True, index=True)
-    admin_user = relationship("AdminUser", backref="audit_logs")
+    # Кто сделал изменение. Без внешнего ключа: журнал хранится в отдельной
+    # БД, имя администратора подставляет кэш admin_names
+    admin_user_id = Column(Integer, nullable=True, index=True)
 
     # Тип действия: create, update, delete, login, logout
     action = Column(String(50), nullable=False, index=True)
@@ -26,9 +26,10 @@ class AuditLog(Base):
     # Название сущности (для отображения в логах, даже после удаления)
     entity_name = Column(String(200), nullable=True)
 
-    # Старые и новые данные в JSON формате
-    old_data = Column(JSON, nullable=True)
-    new_data = Column(JSON, nullable=True)
+    # Старые и новые данные: сжатый JSON.
+    # Для update хранится только diff {поле: {'old': ..., 'new': ...}} в new_data
+    old_data = Column(CompressedJSON, nullable=True)
+    new_data = Column(CompressedJSON, nullable=True)
 
     # Дополнительная информация (IP, User-Agent и т.д.)
     details = Column(Text, nullable=True)
@@ -36,6 +37,9 @@ class AuditLog(Base):
     # Временные метки
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
+    # Имя администратора (не колонка): заполняется сервисом аудита
+    admin_username = None
+
     def __repr__(self):
         return f"<AuditLog {self.action} {self.entity_type}:{self.entity_id}>"
 
@@ -13,10 +13,15 @@ class Category(Base):
     description = Column(Text, nullable=True)
     sort_order = Column(Integer, default=0)
     is_active = Column(Boolean, default=True)
+
+    # Denormalized dish counters, maintained by CategoryCounters on dish writes
+    dishes_total = Column(Integer, nullable=False, default=0, server_default="0")
+    dishes_available = Column(Integer, nullable=False, default=0, server_default="0")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    dishes = relationship("Dish", back_populates="category", lazy="selectin")
+    dishes = relationship("Dish", back_populates="category")
 
     def __repr__(self):
         return f"<Category {self.name}>"
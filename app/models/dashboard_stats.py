@@ -0,0 +1,69 @@
+from sqlalchemy import Column, Integer, DateTime, Numeric
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class DashboardStats(Base):
+    """
+    Materialized dashboard statistics (single row, id=1).
+
+    Maintained incrementally by DashboardStatsService on dish, category and
+    admin writes; recomputed from scratch on demand.
+    """
+    __tablename__ = "dashboard_stats"
+
+    id = Column(Integer, primary_key=True)
+
+    categories_total = Column(Integer, nullable=False, default=0)
+    categories_active = Column(Integer, nullable=False, default=0)
+
+    dishes_total = Column(Integer, nullable=False, default=0)
+    dishes_available = Column(Integer, nullable=False, default=0)
+    dishes_without_images = Column(Integer, nullable=False, default=0)
+    dishes_without_description = Column(Integer, nullable=False, default=0)
+    dishes_without_calories = Column(Integer, nullable=False, default=0)
+
+    price_min = Column(Numeric(10, 2), nullable=True)
+    price_max = Column(Numeric(10, 2), nullable=True)
+    price_sum = Column(Numeric(14, 2), nullable=False, default=0)
+    calories_sum = Column(Integer, nullable=False, default=0)
+    calories_count = Column(Integer, nullable=False, default=0)
+
+    admins_total = Column(Integer, nullable=False, default=0)
+    admins_active = Column(Integer, nullable=False, default=0)
+
+    # "Stats as of": last incremental change or recompute
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    recomputed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<DashboardStats dishes={self.dishes_total}>"
+
+    @property
+    def dishes_unavailable(self) -> int:
+        return self.dishes_total - self.dishes_available
+
+    @property
+    def categories_inactive(self) -> int:
+        return self.categories_total - self.categories_active
+
+    @property
+    def price_avg(self) -> float:
+        return float(self.price_sum) / self.dishes_total if self.dishes_total else 0
+
+    @property
+    def calories_avg(self):
+        return self.calories_sum / self.calories_count if self.calories_count else None
+
+    @property
+    def data_completeness(self) -> int:
+        """Share of filled image/description/calories fields, %."""
+        if not self.dishes_total:
+            return 100
+        problems_count = (
+            self.dishes_without_images
+            + self.dishes_without_description
+            + self.dishes_without_calories
+        )
+        max_problems = self.dishes_total * 3
+        return max(0, min(100, int(100 - (problems_count / max_problems * 100))))
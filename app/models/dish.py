@@ -26,15 +26,21 @@ class Dish(Base):
 
     # Progressive loading optimization
     image_tiny_base64 = Column(Text, nullable=True)  # Inline base64 LQIP (~200 bytes)
+    image_thumbhash = Column(String(64), nullable=True)  # ThumbHash base64 (~33 bytes), see thumbhash.py
     image_dominant_color = Column(String(10), nullable=True)  # #RRGGBB
+    image_palette = Column(String(64), nullable=True)  # #RRGGBB,... most frequent first
 
     # AVIF versions (better compression)
     image_small_avif = Column(String(500), nullable=True)
     image_medium_avif = Column(String(500), nullable=True)
     image_large_avif = Column(String(500), nullable=True)
 
+    # sha256 of the original image (ImageBlob); renditions above are shared
+    # with every dish of the same hash. None - legacy per-dish files or no image
+    image_hash = Column(String(64), nullable=True, index=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     category = relationship("Category", back_populates="dishes")
 
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, Index, UniqueConstraint
+from app.database import AuditBase
+
+
+class DishFieldChange(AuditBase):
+    """
+    Time series of dish price and availability changes.
+
+    Derived from audit events by the audit writer (and by
+    scripts/backfill_dish_history.py for older events). No foreign key to
+    dishes: history outlives deleted dishes. is_available is stored as 0/1.
+    """
+    __tablename__ = "dish_field_changes"
+    __table_args__ = (
+        Index("ix_dish_field_changes_dish_field_time", "dish_id", "field", "changed_at"),
+        UniqueConstraint("audit_log_id", "dish_id", "field", name="uq_dish_field_changes_event"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    dish_id = Column(Integer, nullable=False)
+    # price, is_available
+    field = Column(String(30), nullable=False)
+    old_value = Column(Numeric(10, 2), nullable=True)
+    new_value = Column(Numeric(10, 2), nullable=True)
+
+    changed_at = Column(DateTime(timezone=True), nullable=False)
+    admin_user_id = Column(Integer, nullable=True)
+    # Source audit event
+    audit_log_id = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<DishFieldChange dish:{self.dish_id} {self.field} {self.old_value} -> {self.new_value}>"
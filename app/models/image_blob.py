@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ImageBlob(Base):
+    """
+    Renditions of one original image, addressed by its sha256.
+
+    Files live in image_store_dir/<sha256[:2]>/<sha256>/ and are shared by
+    every dish with Dish.image_hash == sha256 (ref_count of them). Statuses:
+    pending (renditions are being made), ready.
+    """
+    __tablename__ = "image_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    source_path = Column(String(500), nullable=True)  # stored original
+    status = Column(String(20), nullable=False, default="pending")
+    # ImageProcessor result: rendition key -> URL, tiny_base64, dominant_color
+    renditions = Column(JSON, nullable=True)
+    # Size -> ImageProcessor.pipeline_versions() the files were made with
+    pipeline = Column(JSON, nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    # Last moment ref_count dropped to 0 (collected after a grace period)
+    released_at = Column(DateTime, nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ImageBlob {self.sha256[:12]} refs={self.ref_count} {self.status}>"
@@ -0,0 +1,59 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, Boolean
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ImageJob(Base):
+    """
+    Job generating the renditions of an uploaded dish image.
+
+    The uploaded original is stored under image_originals_dir; the job queue
+    (app/services/image_jobs.py) renders it in the image pool into its
+    ImageBlob and applies the result to the dishes referencing it. dish_id
+    is the dish the original was uploaded for. Statuses: pending, running,
+    done, failed, cancelled (the blob was collected, no dish uses it).
+
+    With image_two_pass an upload is rendered twice: a fast job makes the
+    dish visible, then a background max-effort job replaces its files.
+    Background jobs (that and scripts/rerender_images.py) don't change
+    whether a dish has an image, so dish statuses ignore them and uploads
+    are claimed first.
+    """
+    __tablename__ = "image_jobs"
+    __table_args__ = (
+        Index("ix_image_jobs_claim", "status", "run_after"),
+        Index("ix_image_jobs_dish", "dish_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    dish_id = Column(Integer, nullable=False)
+    # Original file and its sha256 (ImageBlob of the renditions)
+    source_path = Column(String(500), nullable=False)
+    source_hash = Column(String(64), nullable=False)
+    admin_user_id = Column(Integer, nullable=True)
+    # Comma-separated sizes to re-render (None - all, as for an upload)
+    sizes = Column(String(100), nullable=True)
+    # Encoder effort (ImageProcessor.ENCODE_EFFORT): fast, max
+    effort = Column(String(10), nullable=False, default="max")
+    background = Column(Boolean, nullable=False, default=False)
+    # Bytes of the files the job wrote; saved against the files of the same
+    # renditions it replaced (None - the blob had none)
+    output_bytes = Column(Integer, nullable=True)
+    saved_bytes = Column(Integer, nullable=True)
+
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    last_error = Column(Text, nullable=True)
+
+    # Not claimed before this moment (retry backoff)
+    run_after = Column(DateTime, nullable=False)
+    # A running job is claimed again after this moment (its runner died)
+    locked_until = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ImageJob {self.id} dish={self.dish_id} {self.status}>"
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, DateTime
+from app.database import AuditBase
+from app.models.types import CompressedJSON
+
+
+class MenuSnapshot(AuditBase):
+    """
+    Periodic snapshot of the whole menu (categories and dishes).
+
+    Point-in-time reconstruction starts from the nearest snapshot and
+    replays audit events with id > last_audit_log_id.
+    """
+    __tablename__ = "menu_snapshots"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    taken_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    # Newest audit event already reflected in the snapshot
+    last_audit_log_id = Column(Integer, nullable=False, default=0)
+
+    categories_count = Column(Integer, nullable=False, default=0)
+    dishes_count = Column(Integer, nullable=False, default=0)
+    # {"categories": {id: row}, "dishes": {id: row}}
+    data = Column(CompressedJSON(level=9), nullable=False)
+
+    def __repr__(self):
+        return f"<MenuSnapshot {self.taken_at} @{self.last_audit_log_id}>"
@@ -0,0 +1,59 @@
+"""
+Custom column types.
+"""
+import json
+import zlib
+from typing import Any, Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON stored as a compact binary blob.
+
+    Values are serialized without whitespace; payloads of at least
+    compress_min_bytes are zlib-compressed. The first byte tells the format:
+    b'J' plain JSON, b'Z' zlib-compressed JSON. Legacy values stored as JSON
+    text by the plain JSON type are still read.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    PLAIN = b'J'
+    COMPRESSED = b'Z'
+
+    def __init__(self, compress_min_bytes: int = 128, level: int = 6):
+        super().__init__()
+        self.compress_min_bytes = compress_min_bytes
+        self.level = level
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        raw = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if len(raw) >= self.compress_min_bytes:
+            packed = zlib.compress(raw, self.level)
+            if len(packed) < len(raw):
+                return self.COMPRESSED + packed
+        return self.PLAIN + raw
+
+    def process_result_value(self, value: Any, dialect) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # Row written before the column became compressed
+            return json.loads(value)
+        value = bytes(value)
+        if value[:1] == self.COMPRESSED:
+            return json.loads(zlib.decompress(value[1:]))
+        if value[:1] == self.PLAIN:
+            return json.loads(value[1:])
+        return json.loads(value)
+
+    def result_processor(self, dialect, coltype):
+        # Skip the LargeBinary processor: legacy rows come back as str
+        def process(value):
+            return self.process_result_value(value, dialect)
+        return process
@@ -4,6 +4,7 @@ Schemas module for API data structures.
 # Pagination
 from app.schemas.pagination_new import (
     PaginatedResponse,
+    CursorPaginatedResponse,
     PaginationParams,
     SortOrder,
 )
@@ -32,6 +33,7 @@ from app.schemas.requests import (
 __all__ = [
     # Pagination
     "PaginatedResponse",
+    "CursorPaginatedResponse",
     "PaginationParams",
     "SortOrder",
     # List items
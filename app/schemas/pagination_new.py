@@ -48,3 +48,34 @@ class PaginatedResponse(BaseModel, Generic[T]):
             has_next=page < pages,
             has_prev=page > 1
         )
+
+
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    """Keyset-paginated response with opaque cursors."""
+    items: List[T] = Field(description="List of items")
+    per_page: int = Field(description="Items per page")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next (older) page")
+    prev_cursor: Optional[str] = Field(default=None, description="Cursor of the previous (newer) page")
+    has_next: bool = Field(description="Has next page")
+    has_prev: bool = Field(description="Has previous page")
+    total: Optional[int] = Field(default=None, description="Total number of items, if requested")
+
+    @classmethod
+    def create(
+        cls,
+        items: List[T],
+        per_page: int,
+        next_cursor: Optional[str],
+        prev_cursor: Optional[str],
+        total: Optional[int] = None
+    ) -> "CursorPaginatedResponse[T]":
+        """Factory method for creating response."""
+        return cls(
+            items=items,
+            per_page=per_page,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+            has_next=next_cursor is not None,
+            has_prev=prev_cursor is not None,
+            total=total
+        )
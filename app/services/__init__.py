@@ -1,19 +1,38 @@
 """Services module."""
 from .audit import AuditService, model_to_dict
 from .data_exchange import DataExchangeService
+from .category_counters import CategoryCounters
+from .dashboard_stats import DashboardStatsService
 from .auth import authenticate_admin, create_access_token, get_password_hash, verify_password, get_current_admin
 from .image_processor import ImageProcessor
+from .image_pool import ImagePool, ImagePoolBusy, image_pool
+from .image_store import ImageStore
+from .image_jobs import ImageJobQueue, ImageJobRunner, image_job_runner
 from .rate_limiter import login_limiter
+from .search import search_index
+from .serializers import ModelSerializer, serializer_for
 
 __all__ = [
     'AuditService',
     'model_to_dict',
     'DataExchangeService',
+    'CategoryCounters',
+    'DashboardStatsService',
     'authenticate_admin',
     'create_access_token',
     'get_password_hash',
     'verify_password',
     'get_current_admin',
     'ImageProcessor',
+    'ImagePool',
+    'ImagePoolBusy',
+    'image_pool',
+    'ImageStore',
+    'ImageJobQueue',
+    'ImageJobRunner',
+    'image_job_runner',
     'login_limiter',
+    'search_index',
+    'ModelSerializer',
+    'serializer_for',
 ]
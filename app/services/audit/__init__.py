@@ -2,10 +2,33 @@
 Audit module for logging admin panel actions.
 """
 from .service import AuditService
-from .helpers import model_to_dict, compute_changes
+from .helpers import model_to_dict, compute_changes, compact_changes, compact_snapshot, compact_event
+from .writer import AuditWriter, audit_writer
+from .archive import AuditArchive, AuditArchiver, audit_archive
+from .rollups import AuditRollups
+from .dish_history import DishHistory
+from .feed import AuditFeed, audit_feed
+from .export import AuditExporter, EXPORT_FORMATS
+from .admin_names import AdminNames, admin_names
 
 __all__ = [
     'AuditService',
     'model_to_dict',
     'compute_changes',
+    'compact_changes',
+    'compact_snapshot',
+    'compact_event',
+    'AuditWriter',
+    'audit_writer',
+    'AuditArchive',
+    'AuditArchiver',
+    'audit_archive',
+    'AuditRollups',
+    'DishHistory',
+    'AuditFeed',
+    'audit_feed',
+    'AuditExporter',
+    'EXPORT_FORMATS',
+    'AdminNames',
+    'admin_names',
 ]
@@ -0,0 +1,69 @@
+"""
+Admin username lookup for audit views.
+
+Audit events live in the audit database and keep only admin_user_id, so
+names cannot be joined in. They are resolved through this process-wide
+cache instead: one IN query for the ids not seen recently, none for the
+usual handful of admins. Entries expire after a TTL (other processes may
+rename admins) and are dropped when an admin is renamed or deleted here.
+"""
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import AdminUser
+
+
+class AdminNames:
+    """TTL cache of admin_user_id -> username."""
+
+    def __init__(self, ttl_seconds: float = 300.0):
+        self.ttl = ttl_seconds
+        # id -> (username or None for a deleted admin, loaded at)
+        self._names: Dict[int, Tuple[Optional[str], float]] = {}
+
+    async def get_many(self, db: AsyncSession, admin_ids: Iterable[Optional[int]]) -> Dict[int, Optional[str]]:
+        """
+        Usernames by id; deleted admins map to None.
+
+        Args:
+            db: Session of the main database
+            admin_ids: Ids to resolve (None and 0 are skipped)
+        """
+        now = time.monotonic()
+        ids = {admin_id for admin_id in admin_ids if admin_id}
+        missing = [
+            admin_id for admin_id in ids
+            if admin_id not in self._names or now - self._names[admin_id][1] > self.ttl
+        ]
+        if missing:
+            result = await db.execute(
+                select(AdminUser.id, AdminUser.username).where(AdminUser.id.in_(missing))
+            )
+            found = dict(result.all())
+            for admin_id in missing:
+                self._names[admin_id] = (found.get(admin_id), now)
+        return {admin_id: self._names[admin_id][0] for admin_id in ids}
+
+    async def get(self, db: AsyncSession, admin_id: Optional[int]) -> Optional[str]:
+        return (await self.get_many(db, [admin_id])).get(admin_id)
+
+    async def attach(self, db: AsyncSession, logs: Iterable) -> None:
+        """Set admin_username on AuditLog objects that don't have it yet."""
+        logs = [log for log in logs if log.admin_username is None]
+        names = await self.get_many(db, (log.admin_user_id for log in logs))
+        for log in logs:
+            log.admin_username = names.get(log.admin_user_id)
+
+    def invalidate(self, admin_id: Optional[int] = None) -> None:
+        """Forget one admin (renamed or deleted) or everything."""
+        if admin_id is None:
+            self._names.clear()
+        else:
+            self._names.pop(admin_id, None)
+
+
+# Global instance shared by the audit service, API and dashboard
+admin_names = AdminNames()
@@ -0,0 +1,288 @@
+"""
+Archive of old audit log events.
+
+Events older than the retention period are moved out of the audit_logs table
+into gzip-compressed JSONL files, one file per day:
+
+    <archive_dir>/2025/03/audit-2025-03-14.jsonl.gz
+
+Files are written atomically (temp file + rename) and merged by event id, so
+an archival run interrupted between writing files and deleting rows can
+simply be repeated. The reader scans only the day files of the requested
+range and returns transient AuditLog objects, so archived history can be
+shown with the same code as live rows.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+
+from app.config import get_settings
+from app.models import AuditLog
+from app.services.serializers import serializer_for
+from .admin_names import admin_names
+from .pagination import LogPage, build_page, decode_cursor
+
+
+FILE_PREFIX = "audit-"
+FILE_SUFFIX = ".jsonl.gz"
+
+
+def log_to_record(log: AuditLog) -> Dict[str, Any]:
+    """Serialize an audit log row for the archive."""
+    record = serializer_for(AuditLog)(log)
+    record['admin_username'] = log.admin_username
+    return record
+
+
+def record_to_log(record: Dict[str, Any]) -> AuditLog:
+    """Build a transient (never added to a session) AuditLog from a record."""
+    log = AuditLog(
+        id=record['id'],
+        created_at=datetime.fromisoformat(record['created_at']) if record.get('created_at') else None,
+        admin_user_id=record.get('admin_user_id'),
+        action=record['action'],
+        entity_type=record['entity_type'],
+        entity_id=record.get('entity_id'),
+        entity_name=record.get('entity_name'),
+        old_data=record.get('old_data'),
+        new_data=record.get('new_data'),
+        details=record.get('details'),
+    )
+    log.admin_username = record.get('admin_username')
+    return log
+
+
+class AuditArchive:
+    """Date-partitioned gzip JSONL storage of audit events."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def day_path(self, day: date) -> Path:
+        return self.directory / f"{day:%Y}" / f"{day:%m}" / f"{FILE_PREFIX}{day.isoformat()}{FILE_SUFFIX}"
+
+    def days(self) -> List[date]:
+        """Archived days, oldest first."""
+        if not self.directory.exists():
+            return []
+        days = []
+        for path in self.directory.glob(f"*/*/{FILE_PREFIX}*{FILE_SUFFIX}"):
+            day_str = path.name[len(FILE_PREFIX):-len(FILE_SUFFIX)]
+            try:
+                days.append(date.fromisoformat(day_str))
+            except ValueError:
+                continue
+        return sorted(days)
+
+    # ==================== WRITE ====================
+
+    def read_day(self, day: date) -> List[Dict[str, Any]]:
+        path = self.day_path(day)
+        if not path.exists():
+            return []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def write_day(self, day: date, records: List[Dict[str, Any]]) -> int:
+        """
+        Merge records into the day file.
+
+        Returns:
+            Number of records in the file after the merge
+        """
+        merged = {r['id']: r for r in self.read_day(day)}
+        merged.update((r['id'], r) for r in records)
+        ordered = sorted(merged.values(), key=lambda r: (r['created_at'] or '', r['id']))
+
+        path = self.day_path(day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as gz:
+                for record in ordered:
+                    gz.write(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+                    gz.write(b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+        return len(ordered)
+
+    # ==================== READ ====================
+
+    def iter_records(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        newest_first: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate records of the archived days within [date_from, date_to]."""
+        days = self.days_between(date_from, date_to)
+        if newest_first:
+            days.reverse()
+        for day in days:
+            records = self.read_day(day)
+            if newest_first:
+                records.reverse()
+            yield from records
+
+    def days_between(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> List[date]:
+        """Archived days within [date_from, date_to], oldest first."""
+        return [
+            d for d in self.days()
+            if (date_from is None or d >= date_from) and (date_to is None or d <= date_to)
+        ]
+
+    @staticmethod
+    def matches(record: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        """Check a record against field filters; empty filter values are ignored."""
+        return all(record.get(key) == value for key, value in filters.items() if value)
+
+    def _matching(
+        self,
+        filters: Dict[str, Any],
+        date_from: Optional[date],
+        date_to: Optional[date],
+        newest_first: bool
+    ) -> Iterator[Dict[str, Any]]:
+        for record in self.iter_records(date_from, date_to, newest_first):
+            if self.matches(record, filters):
+                yield record
+
+    def query(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        direction: str = 'next',
+        entity_type: Optional[str] = None,
+        admin_user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        with_total: bool = False
+    ) -> LogPage:
+        """
+        Get a page of archived events, newest first.
+
+        Same contract as AuditService.get_logs(); logs are transient
+        AuditLog objects.
+
+        Raises:
+            ValueError: Malformed cursor
+        """
+        filters = {
+            'entity_type': entity_type,
+            'admin_user_id': admin_user_id,
+            'action': action,
+            'entity_id': entity_id,
+        }
+        newest_first = direction == 'next'
+        position = None
+        if cursor:
+            position = decode_cursor(cursor)
+            # Skip the day files on the other side of the cursor
+            cursor_day = date.fromisoformat(position[0][:10])
+            if newest_first and not with_total:
+                date_to = min(date_to, cursor_day) if date_to else cursor_day
+            elif not newest_first and not with_total:
+                date_from = max(date_from, cursor_day) if date_from else cursor_day
+
+        rows = []
+        total = 0
+        for record in self._matching(filters, date_from, date_to, newest_first):
+            total += 1
+            key = (record['created_at'] or '', record['id'])
+            if position is not None and not (key < position if newest_first else key > position):
+                continue
+            if len(rows) <= limit:
+                rows.append((key[0], key[1], record))
+            elif not with_total:
+                break
+
+        page = build_page(rows, limit, cursor, direction, total if with_total else None)
+        return page._replace(logs=[record_to_log(r) for r in page.logs])
+
+    def history(
+        self,
+        entity_type: str,
+        entity_id: int,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> List[AuditLog]:
+        """All archived events of an entity, newest first."""
+        filters = {'entity_type': entity_type, 'entity_id': entity_id}
+        return [
+            record_to_log(record)
+            for record in self._matching(filters, date_from, date_to, newest_first=True)
+        ]
+
+
+class AuditArchiver:
+    """Move audit events past the retention period into the archive."""
+
+    def __init__(self, db: AsyncSession, archive: AuditArchive, batch_size: int = 5000):
+        self.db = db
+        self.archive = archive
+        self.batch_size = batch_size
+
+    @staticmethod
+    def cutoff(retention_days: int) -> datetime:
+        """Start of the oldest day kept in the table (whole days are archived)."""
+        start_of_today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        return start_of_today - timedelta(days=retention_days)
+
+    async def count_expired(self, retention_days: int) -> int:
+        result = await self.db.execute(
+            select(func.count(AuditLog.id)).where(AuditLog.created_at < self.cutoff(retention_days))
+        )
+        return result.scalar() or 0
+
+    async def run(self, retention_days: int) -> Dict[str, int]:
+        """
+        Archive and delete events older than the retention period.
+        Commits after every batch.
+
+        Returns:
+            {'archived': rows moved, 'days': day files written}
+        """
+        cutoff = self.cutoff(retention_days)
+        archived = 0
+        days_written = set()
+
+        while True:
+            result = await self.db.execute(
+                select(AuditLog)
+                .where(AuditLog.created_at < cutoff)
+                .order_by(AuditLog.id)
+                .limit(self.batch_size)
+            )
+            logs = result.scalars().all()
+            if not logs:
+                break
+            # Names are archived with the events: admins may be deleted later
+            await admin_names.attach(self.db, logs)
+
+            by_day: Dict[date, List[Dict[str, Any]]] = {}
+            for log in logs:
+                by_day.setdefault(log.created_at.date(), []).append(log_to_record(log))
+            for day, records in by_day.items():
+                self.archive.write_day(day, records)
+                days_written.add(day)
+
+            # Rows are deleted only after their files are on disk
+            await self.db.execute(delete(AuditLog).where(AuditLog.id.in_([log.id for log in logs])))
+            await self.db.commit()
+            self.db.expunge_all()
+            archived += len(logs)
+
+        return {'archived': archived, 'days': len(days_written)}
+
+
+# Global instance used by the audit API and the archival script
+audit_archive = AuditArchive(get_settings().audit_archive_dir)
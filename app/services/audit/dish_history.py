@@ -0,0 +1,204 @@
+"""
+Price and availability history of dishes.
+
+dish_field_changes is a narrow time series derived from audit events: one
+row per changed tracked field. The audit writer extracts the rows from every
+written batch in the same transaction; older events are indexed by
+scripts/backfill_dish_history.py. Queries go through the
+(dish_id, field, changed_at) index instead of scanning audit JSON.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import DishFieldChange
+
+TRACKED_FIELDS = ('price', 'is_available')
+
+BULK_AVAILABILITY = {'bulk_activate': 1, 'bulk_deactivate': 0}
+
+
+def _number(value: Any) -> Optional[float]:
+    """Stored form of a tracked value: float, booleans as 0/1."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 1 if value else 0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_changes(event: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Tracked field changes of one audit event.
+
+    Args:
+        event: AuditLog column values (or an archive record) with 'id'
+
+    Returns:
+        dish_field_changes rows, possibly empty
+    """
+    if event.get('entity_type') != 'dish':
+        return []
+    action = event.get('action')
+    new_data = event.get('new_data')
+    if not isinstance(new_data, dict):
+        return []
+
+    changed_at = event.get('created_at') or datetime.utcnow()
+    if isinstance(changed_at, str):
+        changed_at = datetime.fromisoformat(changed_at)
+    base = {
+        'changed_at': changed_at,
+        'admin_user_id': event.get('admin_user_id'),
+        'audit_log_id': event.get('id'),
+    }
+
+    rows = []
+    if action in ('create', 'update'):
+        for field in TRACKED_FIELDS:
+            if field not in new_data:
+                continue
+            if action == 'create':
+                old, new = None, _number(new_data[field])
+            else:
+                change = new_data[field]
+                if not isinstance(change, dict) or 'new' not in change:
+                    continue
+                old, new = _number(change.get('old')), _number(change['new'])
+                if old == new:
+                    continue
+            rows.append({**base, 'dish_id': event['entity_id'], 'field': field,
+                         'old_value': old, 'new_value': new})
+    elif action in BULK_AVAILABILITY:
+        new = BULK_AVAILABILITY[action]
+        for dish_id in new_data.get('changed_ids', new_data.get('ids', [])):
+            rows.append({**base, 'dish_id': dish_id, 'field': 'is_available',
+                         'old_value': 1 - new, 'new_value': new})
+    return rows
+
+
+async def apply_changes(session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Insert change rows, skipping ones already indexed; the caller commits."""
+    if not rows:
+        return
+    stmt = sqlite_insert(DishFieldChange).values(rows).on_conflict_do_nothing(
+        index_elements=['audit_log_id', 'dish_id', 'field']
+    )
+    await session.execute(stmt)
+
+
+class DishHistory:
+    """Range queries over dish price/availability changes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _value(field: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if field == 'is_available':
+            return bool(value)
+        return float(value) if isinstance(value, Decimal) else value
+
+    @staticmethod
+    def _range(query, date_from: Optional[date], date_to: Optional[date]):
+        if date_from:
+            query = query.where(DishFieldChange.changed_at >= datetime.combine(date_from, time.min))
+        if date_to:
+            query = query.where(
+                DishFieldChange.changed_at < datetime.combine(date_to + timedelta(days=1), time.min)
+            )
+        return query
+
+    async def value_before(self, dish_id: int, field: str, moment: date) -> Any:
+        """Value in effect at the start of a day (last change before it)."""
+        result = await self.db.execute(
+            select(DishFieldChange.new_value)
+            .where(DishFieldChange.dish_id == dish_id, DishFieldChange.field == field)
+            .where(DishFieldChange.changed_at < datetime.combine(moment, time.min))
+            .order_by(DishFieldChange.changed_at.desc(), DishFieldChange.id.desc())
+            .limit(1)
+        )
+        return self._value(field, result.scalar())
+
+    async def changes(
+        self,
+        dish_id: int,
+        field: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Individual changes in the range, oldest first."""
+        query = self._range(
+            select(DishFieldChange)
+            .where(DishFieldChange.dish_id == dish_id, DishFieldChange.field == field),
+            date_from, date_to
+        ).order_by(DishFieldChange.changed_at, DishFieldChange.id).limit(limit)
+        result = await self.db.execute(query)
+        return [
+            {
+                'changed_at': change.changed_at.isoformat(),
+                'old': self._value(field, change.old_value),
+                'new': self._value(field, change.new_value),
+                'admin_user_id': change.admin_user_id,
+            }
+            for change in result.scalars().all()
+        ]
+
+    async def daily(
+        self,
+        dish_id: int,
+        field: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Changes downsampled to one point per day with changes, oldest first:
+        value at the start (open) and end (close) of the day, min/max of the
+        values set during the day and the number of changes.
+        """
+        day = func.date(DishFieldChange.changed_at)
+        query = self._range(
+            select(
+                day,
+                func.count(DishFieldChange.id),
+                func.min(DishFieldChange.new_value),
+                func.max(DishFieldChange.new_value),
+                func.min(DishFieldChange.id),
+                func.max(DishFieldChange.id),
+            )
+            .where(DishFieldChange.dish_id == dish_id, DishFieldChange.field == field),
+            date_from, date_to
+        ).group_by(day).order_by(day)
+        buckets = (await self.db.execute(query)).all()
+        if not buckets:
+            return []
+
+        # First and last change of each day give open and close
+        edge_ids = {row[4] for row in buckets} | {row[5] for row in buckets}
+        result = await self.db.execute(
+            select(DishFieldChange.id, DishFieldChange.old_value, DishFieldChange.new_value)
+            .where(DishFieldChange.id.in_(edge_ids))
+        )
+        edges = {row.id: row for row in result.all()}
+
+        return [
+            {
+                'day': day_str,
+                'open': self._value(field, edges[first_id].old_value),
+                'close': self._value(field, edges[last_id].new_value),
+                'min': self._value(field, min_value),
+                'max': self._value(field, max_value),
+                'changes': count,
+            }
+            for day_str, count, min_value, max_value, first_id, last_id in buckets
+        ]
@@ -0,0 +1,76 @@
+"""
+In-process notification of newly written audit events.
+
+The audit writer publishes every written batch (with assigned ids) here.
+Long-poll requests of the dashboard activity feed wait on the feed instead
+of re-querying the table, and new events are served from a small ring
+buffer. When the buffer cannot prove it holds every event after the
+requested id (events written by another process, or too old), the caller
+falls back to the database.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class AuditFeed:
+    """Ring buffer of recent audit events with waiters for new ones."""
+
+    def __init__(self, capacity: int = 200):
+        self._events: deque = deque(maxlen=capacity)
+        self._changed: Optional[asyncio.Event] = None
+        self.last_id = 0
+
+    def publish(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Add written events and wake up waiters.
+
+        Args:
+            events: AuditLog column values including 'id'
+        """
+        events = sorted((e for e in events if e.get('id')), key=lambda e: e['id'])
+        if not events:
+            return
+        self._events.extend(events)
+        self.last_id = max(self.last_id, events[-1]['id'])
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    async def wait(self, after_id: int, timeout: float) -> bool:
+        """
+        Wait until an event newer than after_id is published.
+
+        Returns:
+            False if the timeout passed without new events
+        """
+        if self.last_id > after_id:
+            return True
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def since(self, after_id: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Buffered events newer than after_id, newest first.
+
+        Returns:
+            None if the buffer may be missing some of them (gap in ids)
+        """
+        newer = [e for e in self._events if e['id'] > after_id]
+        expected = after_id + 1
+        for event in newer:
+            if event['id'] != expected:
+                return None
+            expected += 1
+        newer.reverse()
+        return newer
+
+
+# Global instance fed by the audit writer
+audit_feed = AuditFeed()
@@ -1,14 +1,24 @@
 """
 Helper utilities for audit operations.
 """
+import hashlib
 from typing import Optional, Any, Dict, List
-from decimal import Decimal
+
+from app.services.serializers import serializer_for
+
+
+# Large derived fields kept in audit payloads only as a fingerprint:
+# enough to see that the value changed, without storing it again
+FINGERPRINT_FIELDS = frozenset({'image_tiny_base64'})
 
 
 def model_to_dict(model, exclude: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Convert SQLAlchemy model to dictionary.
 
+    Uses the shared precompiled serializer of the model class
+    (password_hash is never included).
+
     Args:
         model: SQLAlchemy model instance
         exclude: List of field names to exclude
@@ -16,23 +26,7 @@ def model_to_dict(model, exclude: Optional[List[str]] = None) -> Dict[str, Any]:
     Returns:
         Dictionary with model data
     """
-    exclude = exclude or []
-    # Add standard exclusions
-    exclude.extend(['password_hash', '_sa_instance_state'])
-
-    data = {}
-    for column in model.__table__.columns:
-        if column.name not in exclude:
-            value = getattr(model, column.name)
-            # Convert datetime to string
-            if hasattr(value, 'isoformat'):
-                value = value.isoformat()
-            # Convert Decimal to float for JSON serialization
-            elif isinstance(value, Decimal):
-                value = float(value)
-            data[column.name] = value
-
-    return data
+    return serializer_for(type(model), exclude or ())(model)
 
 
 def compute_changes(old_data: Dict[str, Any], new_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -52,3 +46,55 @@ def compute_changes(old_data: Dict[str, Any], new_data: Dict[str, Any]) -> Dict[
         if old_value != new_value:
             changes[key] = {'old': old_value, 'new': new_value}
     return changes
+
+
+def fingerprint(value: Any) -> Any:
+    """Replace a large string with 'sha1:<hash>:<length>'."""
+    if not isinstance(value, str) or value.startswith('sha1:'):
+        return value
+    digest = hashlib.sha1(value.encode('utf-8')).hexdigest()[:12]
+    return f"sha1:{digest}:{len(value)}"
+
+
+def compact_snapshot(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Compact a full row snapshot (create/delete) for the audit log.
+
+    Fingerprint fields are replaced by their fingerprints.
+    """
+    if not isinstance(data, dict):
+        return data
+    return {
+        key: fingerprint(value) if key in FINGERPRINT_FIELDS else value
+        for key, value in data.items()
+    }
+
+
+def compact_changes(changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact a compute_changes() diff: fingerprint fields keep only fingerprints."""
+    compacted = {}
+    for key, change in changes.items():
+        if key in FINGERPRINT_FIELDS:
+            change = {'old': fingerprint(change['old']), 'new': fingerprint(change['new'])}
+        compacted[key] = change
+    return compacted
+
+
+def compact_event(action: str, old_data: Any, new_data: Any) -> tuple:
+    """
+    Convert stored payloads of an event to the compact format.
+
+    Used to migrate rows written before compaction: updates drop the full
+    old row (the diff already holds old values), snapshots get fingerprints.
+
+    Returns:
+        (old_data, new_data)
+    """
+    if action == 'update' and isinstance(new_data, dict) and all(
+        isinstance(change, dict) and set(change) == {'old', 'new'}
+        for change in new_data.values()
+    ):
+        return None, compact_changes(new_data)
+    if action in ('create', 'delete'):
+        return compact_snapshot(old_data), compact_snapshot(new_data)
+    return old_data, new_data
@@ -0,0 +1,87 @@
+"""
+Keyset (cursor) pagination over audit events.
+
+Events are ordered newest first by (created_at, id). A cursor is an opaque
+token holding the position of an edge event of a page; "next" pages go to
+older events, "prev" pages to newer ones. The created_at part is kept exactly
+as stored, so comparisons match the ORDER BY whatever the timestamp format.
+"""
+import base64
+import json
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.models import AuditLog
+
+
+DIRECTIONS = ('next', 'prev')
+
+
+class LogPage(NamedTuple):
+    """One page of audit events, newest first."""
+    logs: List[AuditLog]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+    total: Optional[int] = None
+
+
+def encode_cursor(created_at: str, log_id: int) -> str:
+    raw = json.dumps([created_at, log_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor.
+
+    Raises:
+        ValueError: Malformed cursor
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, log_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(created_at, str) or not isinstance(log_id, int):
+        raise ValueError("Invalid cursor")
+    return created_at, log_id
+
+
+def build_page(
+    rows: Sequence[Tuple[str, int, Any]],
+    limit: int,
+    cursor: Optional[str],
+    direction: str,
+    total: Optional[int] = None
+) -> LogPage:
+    """
+    Turn fetched rows into a page with cursors.
+
+    Args:
+        rows: Up to limit + 1 (created_at, id, log) in fetch order: newest
+            first for "next", oldest first for "prev"
+        limit: Page size
+        cursor: Cursor the page was requested with
+        direction: 'next' or 'prev'
+        total: Optional total count
+    """
+    has_more = len(rows) > limit
+    rows = list(rows[:limit])
+    if direction == 'prev':
+        rows.reverse()
+
+    if not rows:
+        # Past either end: allow going back the way we came
+        back = cursor if cursor else None
+        if direction == 'next':
+            return LogPage([], None, back, total)
+        return LogPage([], back, None, total)
+
+    first = encode_cursor(rows[0][0], rows[0][1])
+    last = encode_cursor(rows[-1][0], rows[-1][1])
+    if direction == 'next':
+        next_cursor = last if has_more else None
+        prev_cursor = first if cursor else None
+    else:
+        next_cursor = last
+        prev_cursor = first if has_more else None
+    return LogPage([row[2] for row in rows], next_cursor, prev_cursor, total)
@@ -0,0 +1,180 @@
+"""
+Daily rollups of audit events.
+
+audit_daily_stats holds event counts per (day, admin, action, entity type).
+The audit writer adds every written batch to it in the same transaction, so
+charts and reports read a handful of rows per day instead of scanning
+audit_logs. Days are UTC, like created_at.
+"""
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, delete, distinct, func, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import AuditDailyStat, AuditLog
+from .admin_names import admin_names
+
+RollupKey = Tuple[date, int, str, str]
+
+# Ids per IN (...) lookup, below SQLite's bound parameter limit
+ID_BATCH = 500
+
+
+def _event_day(created_at: Any) -> date:
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return (created_at or datetime.utcnow()).date()
+
+
+def rollup_counts(events: Iterable[Dict[str, Any]]) -> Counter:
+    """Count events (AuditLog column values or archive records) per rollup key."""
+    return Counter(
+        (
+            _event_day(event.get('created_at')),
+            event.get('admin_user_id') or 0,
+            event['action'],
+            event['entity_type'],
+        )
+        for event in events
+    )
+
+
+async def apply_rollups(session: AsyncSession, counts: Dict[RollupKey, int]) -> None:
+    """Add counts to the rollup table (upsert); the caller commits."""
+    if not counts:
+        return
+    stmt = sqlite_insert(AuditDailyStat).values([
+        {'day': day, 'admin_user_id': admin_id, 'action': action, 'entity_type': entity_type, 'count': count}
+        for (day, admin_id, action, entity_type), count in counts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['day', 'admin_user_id', 'action', 'entity_type'],
+        set_={'count': AuditDailyStat.count + stmt.excluded.count}
+    )
+    await session.execute(stmt)
+
+
+class AuditRollups:
+    """Read and rebuild daily audit rollups."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ==================== REBUILD ====================
+
+    async def rebuild(self, archive=None) -> int:
+        """
+        Recount the rollups from audit_logs (and archived days, if given).
+
+        Only days with events in audit_logs (and the archived days, if given)
+        are recounted: rows of days already moved to the archive are kept.
+
+        Returns:
+            Number of rollup rows
+        """
+        await self.db.execute(
+            delete(AuditDailyStat).where(
+                AuditDailyStat.day.in_(select(distinct(func.date(AuditLog.created_at))))
+            )
+        )
+        archived_days = archive.days() if archive is not None else []
+        for start in range(0, len(archived_days), ID_BATCH):
+            await self.db.execute(
+                delete(AuditDailyStat).where(AuditDailyStat.day.in_(archived_days[start:start + ID_BATCH]))
+            )
+        await self.db.execute(
+            sqlite_insert(AuditDailyStat).from_select(
+                ['day', 'admin_user_id', 'action', 'entity_type', 'count'],
+                select(
+                    func.date(AuditLog.created_at),
+                    func.coalesce(AuditLog.admin_user_id, literal(0)),
+                    AuditLog.action,
+                    AuditLog.entity_type,
+                    func.count(AuditLog.id),
+                ).group_by(
+                    func.date(AuditLog.created_at),
+                    func.coalesce(AuditLog.admin_user_id, literal(0)),
+                    AuditLog.action,
+                    AuditLog.entity_type,
+                )
+            )
+        )
+        for day in archived_days:
+            records = archive.read_day(day)
+            # Rows of an interrupted archival run are still in the table
+            ids = [r['id'] for r in records]
+            in_table = set()
+            for start in range(0, len(ids), ID_BATCH):
+                result = await self.db.execute(
+                    select(AuditLog.id).where(AuditLog.id.in_(ids[start:start + ID_BATCH]))
+                )
+                in_table.update(result.scalars().all())
+            await apply_rollups(
+                self.db, rollup_counts(r for r in records if r['id'] not in in_table)
+            )
+
+        result = await self.db.execute(select(func.count()).select_from(AuditDailyStat))
+        return result.scalar() or 0
+
+    # ==================== READ ====================
+
+    @staticmethod
+    def period(days: int) -> Tuple[date, date]:
+        """First and last day of the last `days` days, today included."""
+        today = datetime.utcnow().date()
+        return today - timedelta(days=days - 1), today
+
+    async def per_day(self, days: int = 14, admin_user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Events per day, oldest first, days without events included."""
+        first, last = self.period(days)
+        query = (
+            select(AuditDailyStat.day, func.sum(AuditDailyStat.count))
+            .where(AuditDailyStat.day >= first)
+            .group_by(AuditDailyStat.day)
+        )
+        if admin_user_id is not None:
+            query = query.where(AuditDailyStat.admin_user_id == admin_user_id)
+        result = await self.db.execute(query)
+        counts = dict(result.all())
+        return [
+            {'day': first + timedelta(days=i), 'count': counts.get(first + timedelta(days=i), 0)}
+            for i in range((last - first).days + 1)
+        ]
+
+    async def by_admin(self, days: int = 14) -> List[Dict[str, Any]]:
+        """Events per admin, most active first."""
+        first, _ = self.period(days)
+        total = func.sum(AuditDailyStat.count)
+        result = await self.db.execute(
+            select(AuditDailyStat.admin_user_id, total)
+            .where(AuditDailyStat.day >= first)
+            .group_by(AuditDailyStat.admin_user_id)
+            .order_by(total.desc())
+        )
+        rows = result.all()
+        names = await admin_names.get_many(self.db, (admin_id for admin_id, _ in rows))
+        return [
+            {'admin_user_id': admin_id or None, 'username': names.get(admin_id), 'count': count}
+            for admin_id, count in rows
+        ]
+
+    async def by_field(self, field: str, days: int = 14) -> List[Dict[str, Any]]:
+        """
+        Events per action or entity type, most frequent first.
+
+        Args:
+            field: 'action' or 'entity_type'
+        """
+        column = getattr(AuditDailyStat, field)
+        first, _ = self.period(days)
+        total = func.sum(AuditDailyStat.count)
+        result = await self.db.execute(
+            select(column, total)
+            .where(AuditDailyStat.day >= first)
+            .group_by(column)
+            .order_by(total.desc())
+        )
+        return [{field: value, 'count': count} for value, count in result.all()]
@@ -1,14 +1,18 @@
 """
 Audit service for logging admin panel actions.
 """
+from datetime import date, datetime, time, timedelta
 from typing import Optional, Any, Dict, List
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, desc, func, or_, and_, literal, type_coerce, String
 
 from app.models import AuditLog
-from .helpers import compute_changes
+from .helpers import compute_changes, compact_changes, compact_snapshot
+from .writer import audit_writer
+from .archive import audit_archive
+from .admin_names import admin_names
+from .pagination import LogPage, build_page, decode_cursor
 
 
 class AuditService:
@@ -31,6 +35,9 @@ class AuditService:
         """
         Record an event in the audit log.
 
+        The event is handed to the batched audit writer and written in its
+        own transaction; the caller commits its changes itself.
+
         Args:
             admin_user_id: Admin user ID
             action: Action type (create, update, delete, login, logout, etc.)
@@ -40,23 +47,22 @@ class AuditService:
             old_data: Previous data (for update/delete)
             new_data: New data (for create/update)
             details: Additional information
-        """
-        log_entry = AuditLog(
-            admin_user_id=admin_user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            entity_name=entity_name,
-            old_data=old_data,
-            new_data=new_data,
-            details=details
-        )
 
-        self.db.add(log_entry)
-        await self.db.commit()
-        await self.db.refresh(log_entry)
-
-        return log_entry
+        Returns:
+            Unsaved AuditLog with the event data (id is assigned on flush)
+        """
+        event = {
+            'admin_user_id': admin_user_id,
+            'action': action,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'entity_name': entity_name,
+            'old_data': old_data,
+            'new_data': new_data,
+            'details': details,
+        }
+        await audit_writer.submit(event)
+        return AuditLog(**event)
 
     async def log_create(
         self,
@@ -73,7 +79,7 @@ class AuditService:
             entity_type=entity_type,
             entity_id=entity_id,
             entity_name=entity_name,
-            new_data=new_data
+            new_data=compact_snapshot(new_data)
         )
 
     async def log_update(
@@ -85,7 +91,12 @@ class AuditService:
         old_data: Dict[str, Any],
         new_data: Dict[str, Any]
     ) -> AuditLog:
-        """Log entity update."""
+        """
+        Log entity update.
+
+        Only the diff of changed columns is stored (in new_data, with both
+        old and new values); unchanged columns are not repeated.
+        """
         changes = compute_changes(old_data, new_data)
 
         if not changes:
@@ -97,8 +108,7 @@ class AuditService:
             entity_type=entity_type,
             entity_id=entity_id,
             entity_name=entity_name,
-            old_data=old_data,
-            new_data=changes  # Save only diff
+            new_data=compact_changes(changes)
         )
 
     async def log_delete(
@@ -116,7 +126,7 @@ class AuditService:
             entity_type=entity_type,
             entity_id=entity_id,
             entity_name=entity_name,
-            old_data=old_data
+            old_data=compact_snapshot(old_data)
         )
 
     async def log_login(
@@ -155,91 +165,205 @@ class AuditService:
         action: str,
         entity_type: str,
         entity_ids: List[int],
-        entity_names: List[str]
+        entity_names: List[str],
+        changed_ids: Optional[List[int]] = None
     ) -> AuditLog:
-        """Log bulk action."""
+        """
+        Log bulk action.
+
+        Args:
+            changed_ids: Entities actually changed by the action (e.g. not
+                already active on activation), when known
+        """
+        new_data = {
+            'ids': entity_ids,
+            'names': entity_names
+        }
+        if changed_ids is not None:
+            new_data['changed_ids'] = changed_ids
         return await self.log(
             admin_user_id=admin_user_id,
             action=f'bulk_{action}',
             entity_type=entity_type,
             entity_name=f'{len(entity_ids)} элементов',
-            new_data={
-                'ids': entity_ids,
-                'names': entity_names
-            }
+            new_data=new_data
+        )
+
+    async def log_reorder(
+        self,
+        admin_user_id: int,
+        entity_type: str,
+        sort_orders: Dict[int, int]
+    ) -> AuditLog:
+        """Log reorder: new sort_order per entity id."""
+        return await self.log(
+            admin_user_id=admin_user_id,
+            action='reorder',
+            entity_type=entity_type,
+            entity_name=f'{len(sort_orders)} элементов',
+            new_data={'sort_order': {str(entity_id): order for entity_id, order in sort_orders.items()}}
         )
 
+    @staticmethod
+    def _filters(
+        entity_type: Optional[str] = None,
+        admin_user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        since: Optional[datetime] = None
+    ) -> list:
+        """Build WHERE conditions for log queries."""
+        conditions = []
+        if entity_type:
+            conditions.append(AuditLog.entity_type == entity_type)
+        if admin_user_id:
+            conditions.append(AuditLog.admin_user_id == admin_user_id)
+        if action:
+            conditions.append(AuditLog.action == action)
+        if entity_id:
+            conditions.append(AuditLog.entity_id == entity_id)
+        if date_from:
+            conditions.append(AuditLog.created_at >= datetime.combine(date_from, time.min))
+        if date_to:
+            conditions.append(AuditLog.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+        if since:
+            conditions.append(AuditLog.created_at >= since)
+        return conditions
+
     async def get_logs(
         self,
-        page: int = 1,
-        per_page: int = 50,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        direction: str = 'next',
         entity_type: Optional[str] = None,
         admin_user_id: Optional[int] = None,
         action: Optional[str] = None,
-        entity_id: Optional[int] = None
-    ) -> tuple[List[AuditLog], int]:
+        entity_id: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        since: Optional[datetime] = None,
+        with_total: bool = False
+    ) -> LogPage:
         """
-        Get logs with filtering and pagination.
+        Get a page of logs with filtering, newest first.
+
+        Uses keyset pagination on (created_at, id), so every page costs the
+        same however deep it is. Only the hot table is queried; archived
+        events are read with audit_archive.query().
+
+        Args:
+            limit: Page size
+            cursor: Cursor from a previous page (None for the newest page)
+            direction: 'next' for older events, 'prev' for newer ones
+            since: Only events at or after this moment
+            with_total: Also count all matching events (full scan)
 
         Returns:
-            Tuple of (log list, total count)
+            LogPage with logs and next/prev cursors
+
+        Raises:
+            ValueError: Malformed cursor
         """
-        query = select(AuditLog).options(selectinload(AuditLog.admin_user))
+        conditions = self._filters(
+            entity_type, admin_user_id, action, entity_id, date_from, date_to, since
+        )
 
-        # Apply filters
-        if entity_type:
-            query = query.where(AuditLog.entity_type == entity_type)
-        if admin_user_id:
-            query = query.where(AuditLog.admin_user_id == admin_user_id)
-        if action:
-            query = query.where(AuditLog.action == action)
-        if entity_id:
-            query = query.where(AuditLog.entity_id == entity_id)
+        # Raw stored value: cursor comparisons must match the ORDER BY exactly
+        created_raw = type_coerce(AuditLog.created_at, String)
+        query = (
+            select(created_raw, AuditLog.id, AuditLog)
+            .where(*conditions)
+        )
 
-        # Sort by date (newest first)
-        query = query.order_by(desc(AuditLog.created_at))
+        if cursor:
+            cursor_created, cursor_id = decode_cursor(cursor)
+            cursor_created = literal(cursor_created, String)
+            if direction == 'next':
+                query = query.where(or_(
+                    AuditLog.created_at < cursor_created,
+                    and_(AuditLog.created_at == cursor_created, AuditLog.id < cursor_id)
+                ))
+            else:
+                query = query.where(or_(
+                    AuditLog.created_at > cursor_created,
+                    and_(AuditLog.created_at == cursor_created, AuditLog.id > cursor_id)
+                ))
 
-        # Get total count
-        count_query = select(AuditLog)
-        if entity_type:
-            count_query = count_query.where(AuditLog.entity_type == entity_type)
-        if admin_user_id:
-            count_query = count_query.where(AuditLog.admin_user_id == admin_user_id)
-        if action:
-            count_query = count_query.where(AuditLog.action == action)
-        if entity_id:
-            count_query = count_query.where(AuditLog.entity_id == entity_id)
+        if direction == 'next':
+            query = query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+        else:
+            query = query.order_by(AuditLog.created_at.asc(), AuditLog.id.asc())
 
-        total_result = await self.db.execute(
-            select(func.count()).select_from(count_query.subquery())
-        )
-        total = total_result.scalar()
+        result = await self.db.execute(query.limit(limit + 1))
+        rows = [tuple(row) for row in result.all()]
 
-        # Pagination
-        offset = (page - 1) * per_page
-        query = query.offset(offset).limit(per_page)
+        total = None
+        if with_total:
+            total_result = await self.db.execute(
+                select(func.count(AuditLog.id)).where(*conditions)
+            )
+            total = total_result.scalar()
 
-        result = await self.db.execute(query)
-        logs = result.scalars().all()
+        page = build_page(rows, limit, cursor, direction, total)
+        await admin_names.attach(self.db, page.logs)
+        return page
 
-        return list(logs), total
+    async def get_logs_after(self, after_id: int, limit: int = 50) -> List[AuditLog]:
+        """
+        Get events with id greater than after_id, newest first.
+
+        Args:
+            after_id: Last event id the caller has seen
+            limit: Maximum number of events (the newest are kept)
+        """
+        query = (
+            select(AuditLog)
+            .where(AuditLog.id > after_id)
+            .order_by(AuditLog.id.desc())
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        logs = list(result.scalars().all())
+        await admin_names.attach(self.db, logs)
+        return logs
 
     async def get_entity_history(
         self,
         entity_type: str,
-        entity_id: int
+        entity_id: int,
+        include_archive: bool = False,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
     ) -> List[AuditLog]:
-        """Get change history for specific entity."""
+        """
+        Get change history for specific entity.
+
+        Args:
+            entity_type: Entity type
+            entity_id: Entity ID
+            include_archive: Also read archived events (slow, on demand)
+            date_from: First archived day to read
+            date_to: Last archived day to read
+
+        Returns:
+            Logs newest first; archived ones are transient AuditLog objects
+        """
         query = (
             select(AuditLog)
-            .options(selectinload(AuditLog.admin_user))
             .where(AuditLog.entity_type == entity_type)
             .where(AuditLog.entity_id == entity_id)
             .order_by(desc(AuditLog.created_at))
         )
 
         result = await self.db.execute(query)
-        return list(result.scalars().all())
+        logs = list(result.scalars().all())
+
+        if include_archive:
+            logs.extend(audit_archive.history(entity_type, entity_id, date_from, date_to))
+        await admin_names.attach(self.db, logs)
+        return logs
 
     async def get_admin_activity(
         self,
@@ -255,4 +379,6 @@ class AuditService:
         )
 
         result = await self.db.execute(query)
-        return list(result.scalars().all())
+        logs = list(result.scalars().all())
+        await admin_names.attach(self.db, logs)
+        return logs
@@ -0,0 +1,296 @@
+"""
+Batched writer for audit log events.
+
+AuditService hands events to the writer instead of committing them in the
+caller's transaction. While the writer runs (started in the app lifespan),
+events are buffered in memory and written by a background task in batches
+with one multi-row INSERT in its own session: when the buffer reaches
+batch_size or every flush_interval seconds. stop() flushes whatever is left,
+so a graceful shutdown loses nothing.
+
+When the writer is not running (scripts, tests) or sync mode is on, every
+event is written immediately. Each batch also updates the daily rollups and
+the dish price/availability history in the same transaction. Written
+events, with their ids, are published to the audit feed for the dashboard
+activity long-poll.
+
+A failed batch is retried event by event, so one bad event doesn't hold
+back the others. Events still failing after max_attempts flushes (or that
+would grow the buffer past max_queue while writes fail) are appended to
+the dead-letter JSONL file and dropped.
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+
+from app.config import get_settings
+from app.database import audit_session
+from app.models import AuditLog
+from .feed import audit_feed
+from .rollups import apply_rollups, rollup_counts
+from .dish_history import apply_changes, extract_changes
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriterMetrics:
+    """Counters and timings of the audit writer."""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def record_flush(self, batch_size: int, elapsed_ms: float) -> None:
+        self.flushes += 1
+        self.written += batch_size
+        self.last_batch_size = batch_size
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'dropped': self.dropped,
+            'last_batch_size': self.last_batch_size,
+            'last_flush_ms': round(self.last_flush_ms, 2),
+            'avg_flush_ms': round(self.total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+            'max_flush_ms': round(self.max_flush_ms, 2),
+        }
+
+
+class AuditWriter:
+    """Buffer audit events and insert them in batches."""
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        sync: bool = False,
+        max_attempts: int = 3,
+        dead_letter_path: Optional[str] = None,
+        session_factory=audit_session
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.sync = sync
+        self.max_attempts = max_attempts
+        self.dead_letter_path = Path(dead_letter_path) if dead_letter_path else None
+        self.session_factory = session_factory
+        self.metrics = AuditWriterMetrics()
+
+        self._buffer: List[Dict[str, Any]] = []
+        # id(event) -> failed writes, for buffered events that failed
+        self._attempts: Dict[int, int] = {}
+        # Monotonic time of the last failed flush (backpressure doesn't retry before flush_interval)
+        self._failed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._buffer)
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self) -> None:
+        """Start the background flush task (no-op in sync mode)."""
+        if self.sync or self.running:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and flush the remaining events."""
+        if not self.running:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        for _ in range(self.max_attempts):
+            await self.flush()
+            if not self._buffer:
+                return
+        logger.error("Audit writer stopped with %d unwritten events", len(self._buffer))
+        events, self._buffer = self._buffer, []
+        await self._dead_letter(events, "writer stopped")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    # ==================== WRITE ====================
+
+    async def submit(self, event: Dict[str, Any]) -> None:
+        """
+        Queue an event for writing.
+
+        Args:
+            event: AuditLog column values
+        """
+        event.setdefault('created_at', datetime.utcnow())
+        self.metrics.enqueued += 1
+
+        if not self.running:
+            await self._write([event])
+            return
+
+        self._buffer.append(event)
+        if len(self._buffer) >= self.max_queue:
+            if self._failed_at is not None and time.monotonic() - self._failed_at < self.flush_interval:
+                # Writes are failing: don't make every caller wait for another failure
+                overflow = self._buffer[:len(self._buffer) - self.max_queue + 1]
+                del self._buffer[:len(overflow)]
+                await self._dead_letter(overflow, "queue full while writes fail")
+                return
+            # Backpressure: the caller waits for the flush instead of growing the queue
+            await self.flush()
+        elif len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """
+        Write all buffered events. A failed batch is retried event by event;
+        failed events stay queued until they have failed max_attempts times.
+        """
+        if not self._buffer:
+            return
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:len(batch)]
+                try:
+                    await self._write(batch)
+                except asyncio.CancelledError:
+                    self._buffer[:0] = batch
+                    raise
+                except Exception:
+                    logger.exception("Audit writer failed to write %d events", len(batch))
+                    failed = await self._write_each(batch)
+                    if failed:
+                        self._failed_at = time.monotonic()
+                        self._buffer[:0] = failed
+                        return
+                for event in batch:
+                    self._attempts.pop(id(event), None)
+            self._failed_at = None
+
+    async def _write_each(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write events one by one; returns the ones to retry later."""
+        retry, dead = [], []
+        for index, event in enumerate(events):
+            try:
+                await self._write([event])
+            except asyncio.CancelledError:
+                self._buffer[:0] = retry + events[index:]
+                raise
+            except Exception as e:
+                attempts = self._attempts.pop(id(event), 0) + 1
+                if attempts >= self.max_attempts:
+                    dead.append((event, e))
+                else:
+                    self._attempts[id(event)] = attempts
+                    retry.append(event)
+            else:
+                self._attempts.pop(id(event), None)
+        for event, error in dead:
+            await self._dead_letter([event], f"{type(error).__name__}: {error}")
+        return retry
+
+    async def _dead_letter(self, events: List[Dict[str, Any]], reason: str) -> None:
+        """Drop events, appending them to the dead-letter file if one is set."""
+        for event in events:
+            self._attempts.pop(id(event), None)
+        self.metrics.dropped += len(events)
+        logger.error("Audit writer dropped %d events (%s): %s", len(events), reason,
+                     [(event.get('action'), event.get('entity_type'), event.get('entity_id')) for event in events])
+        if self.dead_letter_path is None:
+            return
+        records = [json.dumps({**event, '_error': reason}, ensure_ascii=False, default=str) for event in events]
+        try:
+            await run_in_threadpool(self._append, self.dead_letter_path, records)
+        except OSError:
+            logger.exception("Audit writer failed to write the dead-letter file %s", self.dead_letter_path)
+
+    @staticmethod
+    def _append(path: Path, records: List[str]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open('a', encoding='utf-8') as f:
+            for record in records:
+                f.write(record + '\n')
+
+    async def _write(self, events: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    insert(AuditLog).returning(AuditLog.id, sort_by_parameter_order=True),
+                    events
+                )
+                written = [dict(event, id=log_id) for event, log_id in zip(events, result.scalars().all())]
+                await apply_rollups(session, rollup_counts(written))
+                await apply_changes(session, [row for event in written for row in extract_changes(event)])
+                await session.commit()
+        except Exception:
+            self.metrics.failed_flushes += 1
+            raise
+        self.metrics.record_flush(len(events), (time.perf_counter() - started) * 1000)
+        audit_feed.publish(written)
+
+    # ==================== METRICS ====================
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, throughput counters and flush latency."""
+        return {
+            'running': self.running,
+            'sync': self.sync,
+            'queue_depth': self.queue_depth,
+            'batch_size': self.batch_size,
+            'flush_interval': self.flush_interval,
+            'dead_letter_path': str(self.dead_letter_path) if self.dead_letter_path else None,
+            **self.metrics.to_dict(),
+        }
+
+
+_settings = get_settings()
+
+# Global instance used by AuditService
+audit_writer = AuditWriter(
+    batch_size=_settings.audit_batch_size,
+    flush_interval=_settings.audit_flush_interval,
+    sync=_settings.audit_sync_writes,
+    dead_letter_path=_settings.audit_dead_letter_path
+)
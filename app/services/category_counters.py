@@ -0,0 +1,145 @@
+"""
+Denormalized per-category dish counters.
+
+Category.dishes_total and Category.dishes_available are adjusted by the dish
+write paths inside the caller's transaction (no commit here), so list views
+and the dashboard read counts without scanning dishes. check()/repair()
+recompute the counters from the dishes table.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, case
+
+from app.models import Category, Dish
+
+
+class CategoryCounters:
+    """Maintain Category.dishes_total / dishes_available."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _apply(self, deltas: Dict[int, List[int]]) -> None:
+        """Apply {category_id: [total_delta, available_delta]}."""
+        for category_id, (total, available) in deltas.items():
+            if not total and not available:
+                continue
+            await self.db.execute(
+                update(Category)
+                .where(Category.id == category_id)
+                .values(
+                    dishes_total=Category.dishes_total + total,
+                    dishes_available=Category.dishes_available + available,
+                    # Counter changes are not category edits
+                    updated_at=Category.updated_at
+                )
+            )
+
+    async def dish_changed(
+        self,
+        old_category_id: Optional[int],
+        old_available: bool,
+        new_category_id: Optional[int],
+        new_available: bool
+    ) -> None:
+        """
+        Account for a single dish write.
+
+        Pass None as old_category_id for a created dish and as
+        new_category_id for a deleted one.
+        """
+        deltas: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+        if old_category_id is not None:
+            deltas[old_category_id][0] -= 1
+            deltas[old_category_id][1] -= int(bool(old_available))
+        if new_category_id is not None:
+            deltas[new_category_id][0] += 1
+            deltas[new_category_id][1] += int(bool(new_available))
+        await self._apply(deltas)
+
+    async def dish_added(self, category_id: int, is_available: bool) -> None:
+        await self.dish_changed(None, False, category_id, is_available)
+
+    async def dishes_removed(self, dish_ids: Iterable[int]) -> None:
+        """Account for deleting dishes. Call before the DELETE."""
+        result = await self.db.execute(
+            select(
+                Dish.category_id,
+                func.count(Dish.id),
+                func.sum(case((Dish.is_available == True, 1), else_=0))
+            )
+            .where(Dish.id.in_(list(dish_ids)))
+            .group_by(Dish.category_id)
+        )
+        await self._apply({
+            category_id: [-total, -(available or 0)]
+            for category_id, total, available in result.all()
+        })
+
+    async def dishes_availability_set(self, dish_ids: Iterable[int], is_available: bool) -> None:
+        """Account for a bulk availability change. Call before the UPDATE."""
+        result = await self.db.execute(
+            select(Dish.category_id, func.count(Dish.id))
+            .where(Dish.id.in_(list(dish_ids)))
+            .where(Dish.is_available == (not is_available))
+            .group_by(Dish.category_id)
+        )
+        sign = 1 if is_available else -1
+        await self._apply({
+            category_id: [0, sign * flipped]
+            for category_id, flipped in result.all()
+        })
+
+    # ==================== CONSISTENCY ====================
+
+    async def check(self) -> List[Dict[str, Any]]:
+        """
+        Compare stored counters with actual dish counts.
+
+        Returns:
+            List of mismatches with stored and actual values
+        """
+        actual_result = await self.db.execute(
+            select(
+                Dish.category_id,
+                func.count(Dish.id),
+                func.sum(case((Dish.is_available == True, 1), else_=0))
+            ).group_by(Dish.category_id)
+        )
+        actual = {
+            category_id: (total, available or 0)
+            for category_id, total, available in actual_result.all()
+        }
+
+        stored_result = await self.db.execute(
+            select(Category.id, Category.name, Category.dishes_total, Category.dishes_available)
+        )
+        mismatches = []
+        for category_id, name, total, available in stored_result.all():
+            actual_total, actual_available = actual.get(category_id, (0, 0))
+            if (total, available) != (actual_total, actual_available):
+                mismatches.append({
+                    'category_id': category_id,
+                    'name': name,
+                    'stored': (total, available),
+                    'actual': (actual_total, actual_available),
+                })
+        return mismatches
+
+    async def repair(self) -> List[Dict[str, Any]]:
+        """Fix mismatched counters (no commit). Returns the fixed mismatches."""
+        mismatches = await self.check()
+        for mismatch in mismatches:
+            total, available = mismatch['actual']
+            await self.db.execute(
+                update(Category)
+                .where(Category.id == mismatch['category_id'])
+                .values(
+                    dishes_total=total,
+                    dishes_available=available,
+                    updated_at=Category.updated_at
+                )
+            )
+        return mismatches
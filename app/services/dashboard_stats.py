@@ -0,0 +1,221 @@
+"""
+Materialized dashboard statistics.
+
+The single DashboardStats row is adjusted by the write paths inside the
+caller's transaction (no commit here): dish writes pass the contribution of
+the affected dishes before and after the change, category and admin writes
+recount their small tables. Price min/max are only rescanned when the
+removed dish held an extreme. recompute() rebuilds the row from scratch.
+"""
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, case, or_
+
+from app.models import Category, Dish, AdminUser, DashboardStats
+
+
+STATS_ID = 1
+
+# Additive fields of a dish contribution
+SUM_FIELDS = (
+    'dishes_total',
+    'dishes_available',
+    'dishes_without_images',
+    'dishes_without_description',
+    'dishes_without_calories',
+    'price_sum',
+    'calories_sum',
+    'calories_count',
+)
+
+
+def dish_contribution(dish: Any) -> Dict[str, Any]:
+    """
+    Get what a single dish adds to the statistics.
+
+    Args:
+        dish: Dish instance or dict of its columns (as from model_to_dict)
+    """
+    get = dish.get if isinstance(dish, dict) else lambda key: getattr(dish, key)
+    price = Decimal(str(get('price') or 0))
+    calories = get('calories')
+    return {
+        'dishes_total': 1,
+        'dishes_available': int(bool(get('is_available'))),
+        'dishes_without_images': int(get('image_small') is None),
+        'dishes_without_description': int(not get('description')),
+        'dishes_without_calories': int(calories is None),
+        'price_sum': price,
+        'calories_sum': calories or 0,
+        'calories_count': int(calories is not None),
+        'price_min': price,
+        'price_max': price,
+    }
+
+
+def merge_contributions(a: Optional[Dict[str, Any]], b: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Combine two contributions (None means no dishes)."""
+    if a is None or b is None:
+        return a if b is None else b
+    merged = {field: a[field] + b[field] for field in SUM_FIELDS}
+    merged['price_min'] = min(a['price_min'], b['price_min'])
+    merged['price_max'] = max(a['price_max'], b['price_max'])
+    return merged
+
+
+class DashboardStatsService:
+    """Read and maintain the DashboardStats row."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self) -> DashboardStats:
+        """Get the stats row, computing it on first use (no commit)."""
+        stats = await self.db.get(DashboardStats, STATS_ID)
+        if stats is None:
+            stats = await self.recompute()
+        return stats
+
+    # ==================== DISHES ====================
+
+    async def dishes_contribution(self, dish_ids: Iterable[int]) -> Optional[Dict[str, Any]]:
+        """Aggregate contribution of the given dishes as currently stored."""
+        result = await self.db.execute(
+            self._dish_aggregates().where(Dish.id.in_(list(dish_ids)))
+        )
+        row = result.one()
+        if not row.dishes_total:
+            return None
+        return {
+            **{field: getattr(row, field) or 0 for field in SUM_FIELDS},
+            'price_min': row.price_min,
+            'price_max': row.price_max,
+        }
+
+    async def dishes_changed(
+        self,
+        removed: Optional[Dict[str, Any]],
+        added: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Replace the contribution of changed dishes. Call after the change.
+
+        Args:
+            removed: Contribution before the change (None for created dishes)
+            added: Contribution after the change (None for deleted dishes)
+        """
+        if removed is None and added is None:
+            return
+
+        values: Dict[str, Any] = {}
+        for field in SUM_FIELDS:
+            delta = (added or {}).get(field, 0) - (removed or {}).get(field, 0)
+            if delta:
+                column = getattr(DashboardStats, field)
+                values[field] = column + delta
+
+        # A removed extreme forces a rescan (the dishes table already has the
+        # new state); otherwise the added values can only widen the range.
+        price_min, price_max = DashboardStats.price_min, DashboardStats.price_max
+        min_whens, max_whens = [], []
+        if removed is not None:
+            min_whens.append((
+                price_min >= removed['price_min'],
+                select(func.min(Dish.price)).scalar_subquery()
+            ))
+            max_whens.append((
+                price_max <= removed['price_max'],
+                select(func.max(Dish.price)).scalar_subquery()
+            ))
+        if added is not None:
+            min_whens.append((or_(price_min.is_(None), price_min > added['price_min']), added['price_min']))
+            max_whens.append((or_(price_max.is_(None), price_max < added['price_max']), added['price_max']))
+        values['price_min'] = case(*min_whens, else_=price_min)
+        values['price_max'] = case(*max_whens, else_=price_max)
+        values['updated_at'] = func.now()
+
+        await self.db.execute(
+            update(DashboardStats).where(DashboardStats.id == STATS_ID).values(**values)
+        )
+
+    # ==================== CATEGORIES / ADMINS ====================
+
+    async def categories_changed(self) -> None:
+        """Recount categories after a category write."""
+        await self.db.execute(
+            update(DashboardStats)
+            .where(DashboardStats.id == STATS_ID)
+            .values(
+                categories_total=select(func.count(Category.id)).scalar_subquery(),
+                categories_active=select(func.count(Category.id))
+                .where(Category.is_active == True).scalar_subquery(),
+                updated_at=func.now()
+            )
+        )
+
+    async def admins_changed(self) -> None:
+        """Recount admin users after an admin write."""
+        await self.db.execute(
+            update(DashboardStats)
+            .where(DashboardStats.id == STATS_ID)
+            .values(
+                admins_total=select(func.count(AdminUser.id)).scalar_subquery(),
+                admins_active=select(func.count(AdminUser.id))
+                .where(AdminUser.is_active == True).scalar_subquery(),
+                updated_at=func.now()
+            )
+        )
+
+    # ==================== FULL RECOMPUTE ====================
+
+    @staticmethod
+    def _dish_aggregates():
+        return select(
+            func.count(Dish.id).label('dishes_total'),
+            func.sum(case((Dish.is_available == True, 1), else_=0)).label('dishes_available'),
+            func.sum(case((Dish.image_small.is_(None), 1), else_=0)).label('dishes_without_images'),
+            func.sum(case(
+                (or_(Dish.description.is_(None), Dish.description == ""), 1), else_=0
+            )).label('dishes_without_description'),
+            func.sum(case((Dish.calories.is_(None), 1), else_=0)).label('dishes_without_calories'),
+            func.sum(Dish.price).label('price_sum'),
+            func.sum(Dish.calories).label('calories_sum'),
+            func.count(Dish.calories).label('calories_count'),
+            func.min(Dish.price).label('price_min'),
+            func.max(Dish.price).label('price_max'),
+        )
+
+    async def recompute(self) -> DashboardStats:
+        """Rebuild the stats row from the source tables (no commit)."""
+        dishes = (await self.db.execute(self._dish_aggregates())).one()
+        categories = (await self.db.execute(
+            select(
+                func.count(Category.id),
+                func.sum(case((Category.is_active == True, 1), else_=0))
+            )
+        )).one()
+        admins = (await self.db.execute(
+            select(
+                func.count(AdminUser.id),
+                func.sum(case((AdminUser.is_active == True, 1), else_=0))
+            )
+        )).one()
+
+        stats = await self.db.get(DashboardStats, STATS_ID)
+        if stats is None:
+            stats = DashboardStats(id=STATS_ID)
+            self.db.add(stats)
+
+        for field in SUM_FIELDS:
+            setattr(stats, field, getattr(dishes, field) or 0)
+        stats.price_min = dishes.price_min
+        stats.price_max = dishes.price_max
+        stats.categories_total, stats.categories_active = categories[0], categories[1] or 0
+        stats.admins_total, stats.admins_active = admins[0], admins[1] or 0
+        stats.updated_at = stats.recomputed_at = func.now()
+
+        await self.db.flush()
+        await self.db.refresh(stats)
+        return stats
@@ -9,6 +9,10 @@ from sqlalchemy.orm import selectinload
 from slugify import slugify
 
 from app.models import Dish, Category
+from app.services.search import search_index
+from app.services.audit import AuditService, model_to_dict
+from app.services.category_counters import CategoryCounters
+from app.services.dashboard_stats import DashboardStatsService, dish_contribution, merge_contributions
 from .helpers import bool_to_str, str_to_bool, safe_int, safe_float
 from .excel import create_excel_workbook, read_excel_rows
 from .csv_handler import create_csv_content, read_csv_rows, create_csv_template
@@ -31,6 +35,13 @@ class DataExchangeService:
 
     def __init__(self, db: AsyncSession):
         self.db = db
+        # Entities created/updated by the current import, indexed after commit
+        self._touched: List[Any] = []
+        # Audit snapshots of dishes updated by the current import, by id
+        self._before: Dict[int, Dict[str, Any]] = {}
+        # Dashboard stats contribution of imported dishes before/after the import
+        self._stats_removed: Optional[Dict[str, Any]] = None
+        self._stats_added: Optional[Dict[str, Any]] = None
 
     # ==================== DATA PREPARATION ====================
 
@@ -107,16 +118,25 @@ class DataExchangeService:
 
     # ==================== IMPORT ====================
 
-    async def import_dishes_csv(self, content: bytes) -> Tuple[int, int, List[str]]:
+    async def import_dishes_csv(
+        self, content: bytes, admin_user_id: Optional[int] = None
+    ) -> Tuple[int, int, List[str]]:
         """Import dishes from CSV. Returns (created, updated, errors)."""
-        return await self._import_dishes(read_csv_rows(content))
+        return await self._import_dishes(read_csv_rows(content), admin_user_id)
 
-    async def import_dishes_excel(self, content: bytes) -> Tuple[int, int, List[str]]:
+    async def import_dishes_excel(
+        self, content: bytes, admin_user_id: Optional[int] = None
+    ) -> Tuple[int, int, List[str]]:
         """Import dishes from Excel. Returns (created, updated, errors)."""
-        return await self._import_dishes(read_excel_rows(content))
+        return await self._import_dishes(read_excel_rows(content), admin_user_id)
 
-    async def _import_dishes(self, rows_iter) -> Tuple[int, int, List[str]]:
-        """Import dishes from row iterator."""
+    async def _import_dishes(self, rows_iter, admin_user_id: Optional[int] = None) -> Tuple[int, int, List[str]]:
+        """
+        Import dishes from row iterator.
+
+        Every created or updated dish gets its own create/update audit event
+        (as edits in the form do), so price and availability history sees them.
+        """
         categories = await self._get_categories_map()
         errors = []
         created = updated = 0
@@ -134,12 +154,49 @@ class DataExchangeService:
                 except Exception as e:
                     errors.append(f"Строка {row_num}: {str(e)}")
 
+            await DashboardStatsService(self.db).dishes_changed(self._stats_removed, self._stats_added)
             await self.db.commit()
+            for dish in self._touched:
+                search_index.index_dish(dish)
+            await self._log_dishes(admin_user_id)
         except Exception as e:
             errors.append(f"Ошибка чтения файла: {str(e)}")
+        finally:
+            self._touched = []
+            self._before = {}
+            self._stats_removed = self._stats_added = None
 
         return created, updated, errors
 
+    async def _log_dishes(self, admin_user_id: Optional[int]) -> None:
+        """Audit events of the dishes created/updated by the import."""
+        audit = AuditService(self.db)
+        logged = set()
+        for dish in self._touched:
+            if dish.id in logged:
+                continue
+            logged.add(dish.id)
+            # updated_at is set by the database
+            await self.db.refresh(dish)
+            old_data = self._before.get(dish.id)
+            if old_data is None:
+                await audit.log_create(
+                    admin_user_id=admin_user_id,
+                    entity_type='dish',
+                    entity_id=dish.id,
+                    entity_name=dish.name,
+                    new_data=model_to_dict(dish)
+                )
+            else:
+                await audit.log_update(
+                    admin_user_id=admin_user_id,
+                    entity_type='dish',
+                    entity_id=dish.id,
+                    entity_name=dish.name,
+                    old_data=old_data,
+                    new_data=model_to_dict(dish)
+                )
+
     async def _import_dish_row(
         self, row: Dict[str, Any], row_num: int, categories: Dict[str, int]
     ) -> Optional[str]:
@@ -175,14 +232,26 @@ class DataExchangeService:
             result = await self.db.execute(select(Dish).where(Dish.id == dish_id))
             dish = result.scalar_one_or_none()
             if dish:
+                await CategoryCounters(self.db).dish_changed(
+                    dish.category_id, dish.is_available,
+                    dish_data['category_id'], dish_data['is_available']
+                )
+                self._stats_removed = merge_contributions(self._stats_removed, dish_contribution(dish))
+                # The first row of a dish repeated in the file holds the state before the import
+                self._before.setdefault(dish.id, model_to_dict(dish))
                 for key, value in dish_data.items():
                     setattr(dish, key, value)
+                self._stats_added = merge_contributions(self._stats_added, dish_contribution(dish))
+                self._touched.append(dish)
                 return 'updated'
             else:
                 return f"Строка {row_num}: Блюдо с ID {dish_id} не найдено"
         else:
             dish = Dish(**dish_data)
             self.db.add(dish)
+            await CategoryCounters(self.db).dish_added(dish_data['category_id'], dish_data['is_available'])
+            self._stats_added = merge_contributions(self._stats_added, dish_contribution(dish))
+            self._touched.append(dish)
             return 'created'
 
     async def import_categories_csv(self, content: bytes) -> Tuple[int, int, List[str]]:
@@ -207,9 +276,14 @@ class DataExchangeService:
                 except Exception as e:
                     errors.append(f"Строка {row_num}: {str(e)}")
 
+            await DashboardStatsService(self.db).categories_changed()
             await self.db.commit()
+            for cat in self._touched:
+                search_index.index_category(cat)
         except Exception as e:
             errors.append(f"Ошибка чтения файла: {str(e)}")
+        finally:
+            self._touched = []
 
         return created, updated, errors
 
@@ -235,12 +309,14 @@ class DataExchangeService:
             if cat:
                 for key, value in cat_data.items():
                     setattr(cat, key, value)
+                self._touched.append(cat)
                 return 'updated'
             else:
                 return f"Строка {row_num}: Категория с ID {cat_id} не найдена"
         else:
             cat = Category(**cat_data)
             self.db.add(cat)
+            self._touched.append(cat)
             return 'created'
 
     # ==================== TEMPLATES ====================
@@ -0,0 +1,200 @@
+"""
+On-demand image widths with a size-bounded LRU disk cache.
+
+/img/{dish_id}/{width}.{fmt} serves any width of image_dynamic_widths: the
+first request renders it from the dish's stored original in the image pool,
+later ones read the cached file. A new breakpoint is a config change, not a
+re-run over every dish.
+
+Cache files are named after the source (the original's sha256), so dishes
+sharing an image share the cache and a new upload never hits a stale file.
+Recency is kept in memory (loaded from file mtimes on first use, so it
+survives restarts) and the least recently used files are deleted once the
+cache exceeds image_cache_max_bytes. Concurrent requests for the same file
+wait for a single render (single flight); a render finishes even if the
+client that started it went away.
+"""
+import asyncio
+import os
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models import Dish
+from app.services.image_processor import AVIF_SUPPORTED
+from app.services.image_store import ImageStore
+
+# URL extension -> (Pillow format, media type)
+FORMATS = {'webp': ('WEBP', 'image/webp')}
+if AVIF_SUPPORTED:
+    FORMATS['avif'] = ('AVIF', 'image/avif')
+
+
+def image_version(dish: Dish) -> str:
+    """Identity of a dish's current image: names cache files, ?v= of its URLs."""
+    if dish.image_hash:
+        return dish.image_hash
+    return f"d{dish.id}-{Path(dish.image_large).stem}"
+
+
+async def dish_image_source(db: AsyncSession, dish: Dish) -> Optional[Tuple[str, str]]:
+    """
+    (version, source file) to render widths of a dish image from.
+
+    The stored original of the dish's blob; for images without one (legacy
+    per-dish files) the large rendition. None if the dish has no image.
+    """
+    if dish.image_hash:
+        blob = await ImageStore(db).get(dish.image_hash)
+        if blob is not None and blob.source_path and Path(blob.source_path).exists():
+            return dish.image_hash, blob.source_path
+    if dish.image_large:
+        path = Path(dish.image_large.lstrip('/'))
+        if path.exists():
+            return image_version(dish), str(path)
+    return None
+
+
+def dish_image_url(dish: Dish, width: int, fmt: str = 'webp') -> Optional[str]:
+    """URL of a dish image width (None if the dish has no image), for templates."""
+    if not dish.image_large:
+        return None
+    return f"/img/{dish.id}/{width}.{fmt}?v={image_version(dish)[:16]}"
+
+
+class ImageCache:
+    """Size-bounded LRU cache of rendered files with single-flight renders."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total = 0
+        self._loaded = False
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _scan(self) -> list:
+        files = []
+        if self.directory.exists():
+            for path in self.directory.rglob('*'):
+                if path.is_file() and not path.name.endswith('.part'):
+                    stat = path.stat()
+                    files.append((stat.st_mtime, path.relative_to(self.directory).as_posix(), stat.st_size))
+        return sorted(files)
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self._loaded:
+                return
+            for _, key, size in await run_in_threadpool(self._scan):
+                self._entries[key] = size
+                self._total += size
+            self._loaded = True
+            await self._evict()
+
+    async def get(self, key: str, render: Callable[[Path], Awaitable[None]]) -> Path:
+        """
+        Path of a cached file, rendering it on a miss.
+
+        Args:
+            key: Relative file path in the cache
+            render: Writes the file to the given (temporary) path
+
+        Raises:
+            Whatever render raises (nothing is cached then)
+        """
+        await self._ensure_loaded()
+        path = self.directory / key
+        if path.exists():
+            self._touch(key, path)
+            self.hits += 1
+            return path
+        # Evicted by another process
+        self._forget(key)
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._fill(key, path, render))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: a disconnected client doesn't cancel the render for others
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: str, path: Path, render: Callable[[Path], Awaitable[None]]) -> Path:
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        tmp_path = path.parent / f".{path.name}.{uuid.uuid4().hex}.part"
+        try:
+            await render(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._add(key, path.stat().st_size)
+        await self._evict()
+        return path
+
+    def _touch(self, key: str, path: Path) -> None:
+        if key not in self._entries:
+            # Rendered by another process
+            self._add(key, path.stat().st_size)
+        self._entries.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _add(self, key: str, size: int) -> None:
+        self._forget(key)
+        self._entries[key] = size
+        self._total += size
+
+    def _forget(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total -= size
+
+    async def _evict(self) -> None:
+        """Delete least recently used files until the cache fits max_bytes."""
+        evicted = []
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            evicted.append(self.directory / key)
+        if evicted:
+            self.evictions += len(evicted)
+            await run_in_threadpool(self._delete, evicted)
+
+    @staticmethod
+    def _delete(paths: List[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self._total,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'rendering': len(self._inflight),
+        }
+
+
+_settings = get_settings()
+
+# Global instance used by the /img route
+image_cache = ImageCache(directory=_settings.image_cache_dir, max_bytes=_settings.image_cache_max_bytes)
@@ -0,0 +1,540 @@
+"""
+Durable queue of image rendition jobs.
+
+An upload only stores the original (streamed to image_originals_dir and
+named by its sha256, see image_upload), points the dish at the original's
+blob (see image_store) and, unless the blob is ready or already queued,
+enqueues a job; the request returns right away and the dish shows the
+placeholder. ImageJobRunner renders the original in the image pool
+(WebP/AVIF sizes, LQIP, dominant color) into the blob and applies the
+result to every dish referencing it. Jobs live in the image_jobs table:
+
+    pending -> running -> done
+                  |-> pending (retry after a growing delay) ... -> failed
+
+Claiming is a single UPDATE ... RETURNING, so runners of several app
+processes (or scripts/image_worker.py) never take the same job; a running
+job whose lease expired (its runner died) is claimed again. Jobs are
+idempotent: rendition file names derive from the job id, so a rerun
+rewrites the same files. A job is cancelled if its blob was collected
+before it finished.
+
+With image_two_pass the upload job encodes at low effort (WebP only,
+ImageProcessor.ENCODE_EFFORT), so the dish shows its photo seconds after
+the upload. Completing it enqueues a background job re-encoding the blob
+at maximum effort; its files get new names and replace the first ones in
+one commit, after which the old files are deleted. Every job records the
+bytes it wrote and saved against the files it replaced; pass_stats()
+sums them per effort.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from PIL import UnidentifiedImageError
+from sqlalchemy import select, update, func, or_, and_, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import async_session
+from app.models import Dish, ImageBlob, ImageJob
+from app.services.audit import AuditService, model_to_dict
+from app.services.dashboard_stats import DashboardStatsService, dish_contribution
+from app.services.image_pool import ImagePool, ImagePoolBusy, image_pool
+from app.services.image_processor import ImageProcessor, InvalidImage
+from app.services.image_store import ImageStore, apply_renditions, delete_blob_files, rendition_bytes
+from app.services.image_upload import store_upload
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('pending', 'running')
+
+# Jobs that decide whether a dish has its image (not re-encodes / re-renders)
+FOREGROUND = ImageJob.background.is_(False)
+
+
+def _saved_bytes(previous: Dict[str, str], paths: Dict[str, str]) -> int:
+    """Bytes saved by the new files of renditions both results have."""
+    keys = [key for key in paths if key in previous and previous[key] != paths[key]]
+    return rendition_bytes(previous[key] for key in keys) - rendition_bytes(paths[key] for key in keys)
+
+
+# Errors a retry cannot fix
+PERMANENT_ERRORS = (FileNotFoundError, InvalidImage, UnidentifiedImageError)
+
+
+class ImageJobQueue:
+    """Enqueue, claim and finish image jobs."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.settings = get_settings()
+
+    # ==================== ENQUEUE ====================
+
+    async def enqueue(
+        self,
+        dish: Dish,
+        upload: UploadFile,
+        admin_user_id: Optional[int] = None
+    ) -> Optional[ImageJob]:
+        """
+        Store an uploaded original, point the dish at its blob and add a job
+        if the renditions are neither ready nor queued; the caller commits.
+
+        Returns:
+            The new job, or None when the dish reuses existing renditions
+            (it already has them, or gets them from the queued job)
+
+        Raises:
+            InvalidImage: The upload is not an acceptable image
+        """
+        stored = await store_upload(upload, Path(self.settings.image_originals_dir))
+        store = ImageStore(self.db)
+        blob = await store.add(stored.sha256, stored.path)
+        await store.assign(dish, stored.sha256)
+        if blob.status == 'ready' or await self.active_for_hash(stored.sha256) is not None:
+            return None
+
+        job = ImageJob(
+            dish_id=dish.id,
+            source_path=blob.source_path,
+            source_hash=stored.sha256,
+            admin_user_id=admin_user_id,
+            effort='fast' if self.settings.image_two_pass else 'max',
+            background=False,
+            status='pending',
+            max_attempts=self.settings.image_job_max_attempts,
+            run_after=datetime.utcnow(),
+        )
+        self.db.add(job)
+        await self.db.flush()
+        return job
+
+    def _enqueue_final(self, job: ImageJob) -> ImageJob:
+        """Add the background max-effort pass after a fast one; the caller commits."""
+        final = ImageJob(
+            dish_id=job.dish_id,
+            source_path=job.source_path,
+            source_hash=job.source_hash,
+            admin_user_id=job.admin_user_id,
+            effort='max',
+            background=True,
+            status='pending',
+            max_attempts=self.settings.image_job_max_attempts,
+            run_after=datetime.utcnow(),
+        )
+        self.db.add(final)
+        return final
+
+    async def enqueue_rerender(self, blob: ImageBlob, sizes: Optional[List[str]] = None) -> ImageJob:
+        """
+        Add a job re-rendering a ready blob (scripts/rerender_images.py);
+        the caller commits. sizes - only these sizes (None - all).
+        """
+        result = await self.db.execute(
+            select(func.min(Dish.id)).where(Dish.image_hash == blob.sha256)
+        )
+        job = ImageJob(
+            dish_id=result.scalar() or 0,
+            source_path=blob.source_path,
+            source_hash=blob.sha256,
+            sizes=",".join(sizes) if sizes else None,
+            effort='max',
+            background=True,
+            status='pending',
+            max_attempts=self.settings.image_job_max_attempts,
+            run_after=datetime.utcnow(),
+        )
+        self.db.add(job)
+        await self.db.flush()
+        return job
+
+    def retry(self, job: ImageJob) -> None:
+        """Put a failed job back in the queue; the caller commits."""
+        job.status = 'pending'
+        job.attempts = 0
+        job.last_error = None
+        job.run_after = datetime.utcnow()
+        job.finished_at = None
+
+    # ==================== READ ====================
+
+    async def get(self, job_id: int) -> Optional[ImageJob]:
+        return await self.db.get(ImageJob, job_id)
+
+    async def active_for_hash(self, sha256: str) -> Optional[ImageJob]:
+        result = await self.db.execute(
+            select(ImageJob)
+            .where(ImageJob.source_hash == sha256, ImageJob.status.in_(ACTIVE_STATUSES))
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def newest_for_hash(self, sha256: str) -> Optional[ImageJob]:
+        result = await self.db.execute(
+            select(ImageJob).where(ImageJob.source_hash == sha256).order_by(ImageJob.id.desc()).limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def newest_for_dish(self, dish_id: int) -> Optional[ImageJob]:
+        """Newest job for the dish's current image (None - legacy image or reused as is)."""
+        result = await self.db.execute(
+            select(ImageJob)
+            .join(Dish, Dish.image_hash == ImageJob.source_hash)
+            .where(Dish.id == dish_id, FOREGROUND)
+            .order_by(ImageJob.id.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def newest_for_dishes(self, dish_ids: List[int]) -> Dict[int, ImageJob]:
+        newest = (
+            select(Dish.id, func.max(ImageJob.id).label('job_id'))
+            .join(ImageJob, ImageJob.source_hash == Dish.image_hash)
+            .where(Dish.id.in_(dish_ids), FOREGROUND)
+            .group_by(Dish.id)
+        )
+        rows = (await self.db.execute(newest)).all()
+        result = await self.db.execute(select(ImageJob).where(ImageJob.id.in_([row.job_id for row in rows])))
+        jobs = {job.id: job for job in result.scalars().all()}
+        return {row.id: jobs[row.job_id] for row in rows}
+
+    async def active_dish_ids(self) -> Set[int]:
+        result = await self.db.execute(
+            select(Dish.id)
+            .join(ImageJob, ImageJob.source_hash == Dish.image_hash)
+            .where(ImageJob.status.in_(ACTIVE_STATUSES), FOREGROUND)
+            .distinct()
+        )
+        return set(result.scalars().all())
+
+    async def position(self, job: ImageJob) -> Optional[int]:
+        """Pending jobs ahead of a pending job (0 - next), None otherwise."""
+        if job.status != 'pending':
+            return None
+        # Uploads are claimed before background jobs
+        ahead = ImageJob.id < job.id
+        if job.background:
+            ahead = or_(FOREGROUND, ahead)
+        else:
+            ahead = and_(FOREGROUND, ahead)
+        result = await self.db.execute(
+            select(func.count(ImageJob.id))
+            .where(ImageJob.status == 'pending', ahead)
+        )
+        return result.scalar() or 0
+
+    async def to_dict(self, job: ImageJob, dish_id: Optional[int] = None) -> Dict[str, Any]:
+        """Job status for the admin API (dish_id - a dish sharing the image, not the uploader)."""
+        data = {
+            'id': job.id,
+            'dish_id': dish_id or job.dish_id,
+            'status': job.status,
+            'effort': job.effort,
+            'attempts': job.attempts,
+            'max_attempts': job.max_attempts,
+            'error': job.last_error,
+            'position': await self.position(job),
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
+        if job.status == 'done':
+            blob = await ImageStore(self.db).get(job.source_hash)
+            if blob is not None and blob.renditions:
+                data['image_thumbnail'] = blob.renditions.get('thumbnail')
+                data['image_medium'] = blob.renditions.get('medium')
+        return data
+
+    # ==================== RUN ====================
+
+    async def claim(self) -> Optional[ImageJob]:
+        """Take the oldest runnable job, uploads before background jobs (commits)."""
+        now = datetime.utcnow()
+        candidate = (
+            select(ImageJob.id)
+            .where(or_(
+                and_(ImageJob.status == 'pending', ImageJob.run_after <= now),
+                and_(ImageJob.status == 'running', ImageJob.locked_until < now),
+            ))
+            .order_by(ImageJob.background, ImageJob.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            update(ImageJob)
+            .where(ImageJob.id == candidate)
+            .values(
+                status='running',
+                attempts=ImageJob.attempts + 1,
+                started_at=now,
+                locked_until=now + timedelta(seconds=self.settings.image_job_lease_seconds),
+            )
+            .returning(ImageJob.id)
+        )
+        job_id = result.scalar()
+        await self.db.commit()
+        if job_id is None:
+            return None
+        return await self.db.get(ImageJob, job_id, populate_existing=True)
+
+    async def release(self, job: ImageJob, delay: float = 1.0) -> None:
+        """Return a claimed job to the queue without counting the attempt."""
+        job.status = 'pending'
+        job.attempts = max(0, job.attempts - 1)
+        job.locked_until = None
+        job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+        await self.db.commit()
+
+    async def fail(self, job: ImageJob, error: BaseException) -> None:
+        """Schedule a retry, or mark the job failed after the last attempt."""
+        job.last_error = f"{type(error).__name__}: {error}"[:2000]
+        job.locked_until = None
+        if isinstance(error, PERMANENT_ERRORS) or job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = datetime.utcnow()
+        else:
+            job.status = 'pending'
+            delay = self.settings.image_job_retry_delay * 2 ** (job.attempts - 1)
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+        await self.db.commit()
+
+    async def complete(self, job: ImageJob, paths: Dict[str, str]) -> bool:
+        """
+        Store renditions in the job's blob and apply them to every dish
+        referencing it; a fast pass enqueues the max-effort one.
+
+        Returns:
+            True if applied, False if the job was cancelled (blob collected)
+        """
+        store = ImageStore(self.db)
+        blob = await store.get(job.source_hash)
+        job.locked_until = None
+        job.finished_at = datetime.utcnow()
+
+        if blob is None:
+            job.status = 'cancelled'
+            await self.db.commit()
+            await run_in_threadpool(delete_blob_files, job.source_hash, None)
+            return False
+
+        previous = blob.renditions or {}
+        sizes = job.sizes.split(',') if job.sizes else None
+        job.output_bytes = await run_in_threadpool(rendition_bytes, paths.values())
+        if sizes:
+            # Other sizes keep their files
+            kept = {key: value for key, value in previous.items()
+                    if key.removesuffix('_avif') not in sizes}
+            paths = {**kept, **paths}
+        job.saved_bytes = await run_in_threadpool(_saved_bytes, previous, paths) if previous else None
+        dishes = await store.mark_ready(job.source_hash, paths, sizes, job.effort)
+        changes = []
+        stats = DashboardStatsService(self.db)
+        for dish in dishes:
+            old_data = model_to_dict(dish)
+            old_stats = dish_contribution(dish)
+            apply_renditions(dish, paths)
+            await stats.dishes_changed(old_stats, dish_contribution(dish))
+            changes.append((dish, old_data))
+        job.status = 'done'
+        if job.effort == 'fast':
+            self._enqueue_final(job)
+        await self.db.commit()
+        if job.saved_bytes is not None:
+            logger.info("Image job %s (%s): %s bytes written, %s saved", job.id, job.effort,
+                        job.output_bytes, job.saved_bytes)
+
+        # Files of an earlier rendering of the blob are no longer referenced
+        await run_in_threadpool(delete_blob_files, job.source_hash, blob.source_path, paths.values())
+
+        audit = AuditService(self.db)
+        for dish, old_data in changes:
+            await self.db.refresh(dish)
+            await audit.log_update(
+                admin_user_id=job.admin_user_id,
+                entity_type='dish',
+                entity_id=dish.id,
+                entity_name=dish.name,
+                old_data=old_data,
+                new_data=model_to_dict(dish)
+            )
+        return True
+
+    async def pass_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Done jobs (not yet pruned) per encoder effort: count, bytes written
+        and bytes saved against the files they replaced.
+        """
+        result = await self.db.execute(
+            select(
+                ImageJob.effort,
+                func.count(ImageJob.id),
+                func.coalesce(func.sum(ImageJob.output_bytes), 0),
+                func.coalesce(func.sum(ImageJob.saved_bytes), 0),
+            )
+            .where(ImageJob.status == 'done')
+            .group_by(ImageJob.effort)
+        )
+        return {
+            effort: {'jobs': jobs, 'output_bytes': output, 'saved_bytes': saved}
+            for effort, jobs, output, saved in result.all()
+        }
+
+    async def prune(self, older_than_days: int = 7) -> int:
+        """Delete finished jobs older than the given number of days (commits)."""
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        result = await self.db.execute(
+            delete(ImageJob)
+            .where(ImageJob.status.in_(('done', 'cancelled', 'failed')))
+            .where(ImageJob.finished_at < cutoff)
+        )
+        await self.db.commit()
+        return result.rowcount or 0
+
+
+class ImageJobRunner:
+    """Background task processing image jobs in the image pool."""
+
+    PRUNE_INTERVAL = timedelta(hours=1)
+
+    def __init__(
+        self,
+        pool: ImagePool,
+        concurrency: int,
+        poll_interval: float,
+        session_factory=async_session
+    ):
+        self.pool = pool
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._jobs: Set[asyncio.Task] = set()
+        self._last_prune: Optional[datetime] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop claiming jobs; wait for running ones, cancel them after timeout."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._jobs:
+            _, pending = await asyncio.wait(self._jobs, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def notify(self) -> None:
+        """Wake the runner up: a job was enqueued."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run_once(self) -> int:
+        """Claim jobs while there are free slots; returns jobs started."""
+        started = 0
+        while len(self._jobs) < self.concurrency:
+            async with self.session_factory() as session:
+                job = await ImageJobQueue(session).claim()
+            if job is None:
+                break
+            task = asyncio.create_task(self._process(job))
+            self._jobs.add(task)
+            task.add_done_callback(self._job_done)
+            started += 1
+        return started
+
+    def _job_done(self, task: asyncio.Task) -> None:
+        self._jobs.discard(task)
+        self.notify()
+
+    async def _process(self, job: ImageJob) -> None:
+        """Render one claimed job and record the outcome."""
+        async with self.session_factory() as session:
+            queue = ImageJobQueue(session)
+            job = await session.merge(job, load=False)
+            try:
+                paths = await self.pool.run(
+                    ImageProcessor.render_blob, job.source_path, job.source_hash, str(job.id),
+                    job.sizes.split(',') if job.sizes else None, job.effort
+                )
+            except ImagePoolBusy:
+                await queue.release(job)
+                return
+            except asyncio.CancelledError:
+                # Stopped: the job is claimed again right after restart
+                await asyncio.shield(self._release(job.id))
+                raise
+            except Exception as e:
+                logger.warning("Image job %s failed (attempt %s): %s", job.id, job.attempts, e)
+                await queue.fail(job, e)
+                return
+            job_id = job.id
+            try:
+                await queue.complete(job, paths)
+            except Exception as e:
+                # E.g. "database is locked": retried like a failed render, not left running until the lease
+                logger.warning("Image job %s failed to complete: %s", job_id, e)
+                await session.rollback()
+                await self._fail(job_id, e)
+
+    async def _fail(self, job_id: int, error: BaseException) -> None:
+        """Record the error of a job whose session failed, in a new session."""
+        try:
+            async with self.session_factory() as session:
+                job = await session.get(ImageJob, job_id)
+                if job is not None and job.status == 'running':
+                    await ImageJobQueue(session).fail(job, error)
+        except Exception:
+            logger.exception("Image job %s: failed to record the error, retried after its lease", job_id)
+
+    async def _release(self, job_id: int) -> None:
+        async with self.session_factory() as session:
+            job = await session.get(ImageJob, job_id)
+            if job is not None and job.status == 'running':
+                await ImageJobQueue(session).release(job, delay=0)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+                await self._maybe_prune()
+            except Exception:
+                logger.exception("Image job runner iteration failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _maybe_prune(self) -> None:
+        now = datetime.utcnow()
+        if self._last_prune and now - self._last_prune < self.PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        async with self.session_factory() as session:
+            await ImageJobQueue(session).prune()
+            await ImageStore(session).collect()
+
+
+_settings = get_settings()
+
+# Global instance started in the app lifespan
+image_job_runner = ImageJobRunner(
+    pool=image_pool,
+    concurrency=_settings.image_job_concurrency,
+    poll_interval=_settings.image_job_poll_interval
+)
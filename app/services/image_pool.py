@@ -0,0 +1,151 @@
+"""
+Process pool for image processing.
+
+Decoding, resizing and encoding an upload takes seconds of CPU; run in a
+request handler it would block the event loop and every other request of
+the worker. Image jobs run in a ProcessPoolExecutor instead. A job is a
+module-level function taking bytes, ids and paths and returning a plain
+dict, so nothing but bytes and strings crosses the process boundary.
+
+At most max_pending jobs are in flight (running or queued in the pool).
+Further callers wait up to queue_timeout seconds for a slot and then get
+ImagePoolBusy: a burst of uploads cannot pile up unbounded work and memory.
+A slot is released when the job finishes, even if its caller went away.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.services.image_processor import ImageProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class ImagePoolBusy(Exception):
+    """No free image processing slot within the queue timeout."""
+
+
+class ImagePool:
+    """Bounded pool of image worker processes."""
+
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int,
+        queue_timeout: float,
+        max_tasks_per_child: int = 50
+    ):
+        """
+        Args:
+            workers: Worker processes (0 - run jobs in a thread of this process)
+            max_pending: Jobs running or queued at once
+            queue_timeout: Seconds to wait for a free slot
+            max_tasks_per_child: Jobs after which a worker is replaced
+                (returns memory fragmented by large decodes)
+        """
+        self.workers = workers
+        self.max_pending = max(1, max_pending)
+        self.queue_timeout = queue_timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _executor_or_none(self) -> Optional[ProcessPoolExecutor]:
+        if self._executor is None and self.workers > 0:
+            # spawn: workers don't inherit the event loop, DB connections
+            # and threads of the app process
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+        return self._executor
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    async def stop(self) -> None:
+        """Wait for running jobs, drop queued ones and stop the workers."""
+        executor, self._executor = self._executor, None
+        self._slots = None
+        if executor is not None:
+            await run_in_threadpool(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run func(*args) in a worker process.
+
+        Raises:
+            ImagePoolBusy: No free slot within queue_timeout
+            BrokenProcessPool: A worker died; the next job gets a fresh pool
+        """
+        slots = self._semaphore()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ImagePoolBusy(f"No image processing slot in {self.queue_timeout:.0f}s")
+
+        self.running += 1
+        loop = asyncio.get_running_loop()
+        executor = self._executor_or_none()
+        if executor is None:
+            future = asyncio.ensure_future(run_in_threadpool(func, *args))
+        else:
+            future = loop.run_in_executor(executor, func, *args)
+        future.add_done_callback(lambda f: self._finished(slots, f))
+        try:
+            # The job runs to completion even if the request is cancelled
+            return await asyncio.shield(future)
+        except BrokenProcessPool:
+            logger.exception("Image worker died, restarting the pool")
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def _finished(self, slots: asyncio.Semaphore, future: asyncio.Future) -> None:
+        self.running -= 1
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+        slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+        }
+
+    # ==================== JOBS ====================
+
+    async def copy_images(self, source_dish_id: int, target_dish_id: int) -> Optional[Dict[str, str]]:
+        """Copy a dish's images to another dish (ImageProcessor.copy_images)."""
+        return await self.run(ImageProcessor.copy_images, source_dish_id, target_dish_id)
+
+
+_settings = get_settings()
+
+# Global instance stopped in the app lifespan
+image_pool = ImagePool(
+    workers=_settings.image_workers,
+    max_pending=_settings.image_max_pending,
+    queue_timeout=_settings.image_queue_timeout
+)
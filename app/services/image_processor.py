@@ -1,11 +1,15 @@
 import os
 import time
 import base64
+import hashlib
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterable
 from PIL import Image, ImageFilter
 from io import BytesIO
 from app.config import get_settings
+from app.services.thumbhash import THUMBHASH_SIDE, encode_thumbhash
 
 settings = get_settings()
 
@@ -18,6 +22,10 @@ except ImportError:
     warnings.warn("pillow-avif-plugin not installed, AVIF generation disabled")
 
 
+class InvalidImage(ValueError):
+    """Файл не является допустимым изображением (сообщение показывается админу)"""
+
+
 class ImageProcessor:
     """Обработка изображений для оптимизации под медленный интернет"""
 
@@ -45,10 +53,46 @@ class ImageProcessor:
         "large": 85,
     }
 
+    # Увеличивается при изменении кода обработки (см. pipeline_versions)
+    PIPELINE_REVISION = 1
+
+    # Усилие кодировщиков: fast - первый проход загрузки (WebP method=0 в
+    # ~5 раз быстрее method=6, AVIF не создаётся: с быстрым speed он больше
+    # WebP), max - итоговые файлы (фоновое перекодирование, см. image_jobs).
+    # AVIF speed=4 на ~5% меньше speed=6 по умолчанию и медленнее в ~7 раз.
+    ENCODE_EFFORT = {
+        "fast": {"webp_method": 0, "avif_speed": None},
+        "max": {"webp_method": 6, "avif_speed": 4},
+    }
+
+    # Цветов в палитре блюда (image_palette)
+    PALETTE_COLORS = 5
+
+    # Во сколько раз декодированный JPEG может быть больше самого крупного
+    # размера (draft); дальше - reduce() и LANCZOS
+    DRAFT_GAP = 1.0
+
     @staticmethod
-    def _prepare_image(file_content: bytes) -> Image.Image:
-        """Открывает и конвертирует изображение в RGB"""
-        img = Image.open(BytesIO(file_content))
+    def _prepare_image(source: bytes | str | Path, fit: tuple[int, int] | None = None) -> Image.Image:
+        """
+        Открывает и конвертирует изображение в RGB.
+        source - содержимое файла или путь (файл читается при декодировании).
+        fit - самый крупный нужный размер: JPEG сразу декодируется уменьшенным
+        в 2/4/8 раз (draft), но не меньше fit.
+        Изображения больше image_max_pixels (после draft) не декодируются.
+        """
+        img = Image.open(BytesIO(source) if isinstance(source, bytes) else source)
+
+        if fit and img.format in ('JPEG', 'MPO'):
+            width, height = ImageProcessor._fit_size(img.size, fit)
+            img.draft(None, (int(width * ImageProcessor.DRAFT_GAP), int(height * ImageProcessor.DRAFT_GAP)))
+
+        if img.width * img.height > settings.image_max_pixels:
+            img.close()
+            raise InvalidImage(
+                f"Изображение слишком большое: {img.width}x{img.height} "
+                f"(макс {settings.image_max_pixels / 1e6:.0f} Мп)"
+            )
 
         # Конвертируем в RGB если нужно (для PNG с альфа-каналом)
         if img.mode in ('RGBA', 'LA', 'P'):
@@ -79,97 +123,263 @@ class ImageProcessor:
         return f"data:image/webp;base64,{b64_data}"
 
     @staticmethod
-    def extract_dominant_color(img: Image.Image) -> str:
+    def generate_thumbhash(img: Image.Image) -> str:
         """
-        Извлекает доминантный цвет изображения.
-        Возвращает hex-код (#RRGGBB).
+        ThumbHash-плейсхолдер (~33 символа base64) - компактная альтернатива
+        tiny_base64, декодируется в браузере (image_placeholder = "thumbhash").
         """
-        # Уменьшаем до маленького размера для быстрого анализа
-        small = img.copy()
-        small.thumbnail((50, 50), Image.Resampling.LANCZOS)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        size = ImageProcessor._fit_size(img.size, (THUMBHASH_SIDE, THUMBHASH_SIDE))
+        if size != img.size:
+            img = img.resize(size, Image.Resampling.BOX)
+        return encode_thumbhash(img.width, img.height, img.tobytes())
 
-        # Получаем все пиксели
-        pixels = list(small.getdata())
+    @staticmethod
+    def extract_dominant_color(img: Image.Image) -> str:
+        """
+        Средний цвет изображения (#RRGGBB).
+        Усреднение - BOX-масштабирование до 1x1 в C, без обхода пикселей в Python.
+        """
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        r, g, b = img.resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+        return f"#{r:02x}{g:02x}{b:02x}"
 
-        # Вычисляем средний цвет (простой подход)
-        r_total = g_total = b_total = 0
-        count = len(pixels)
+    @staticmethod
+    def extract_palette(img: Image.Image, colors: int = PALETTE_COLORS) -> list[str]:
+        """
+        Палитра изображения (#RRGGBB) по убыванию доли пикселей: начальные
+        цвета max coverage, уточнённые k-means (quantize, в C). Первый цвет - самый частый,
+        в отличие от среднего он не «грязный» у пёстрых фото.
+        Время растёт с числом пикселей: изображение уменьшается до размера tiny.
+        """
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        size = ImageProcessor._fit_size(img.size, ImageProcessor.SIZES["tiny"])
+        if size != img.size:
+            img = img.resize(size, Image.Resampling.BOX)
+        # kmeans - предел итераций, обычно сходится раньше
+        quantized = img.quantize(colors=colors, method=Image.Quantize.MAXCOVERAGE, kmeans=10)
+        palette = quantized.getpalette()
+        return [
+            "#{:02x}{:02x}{:02x}".format(*palette[index * 3:index * 3 + 3])
+            for _, index in sorted(quantized.getcolors(), reverse=True)
+        ]
 
-        for pixel in pixels:
-            r_total += pixel[0]
-            g_total += pixel[1]
-            b_total += pixel[2]
+    @staticmethod
+    def _fit_size(size: tuple[int, int], dimensions: tuple[int, int]) -> tuple[int, int]:
+        """Размер, вписанный в dimensions с сохранением пропорций (без увеличения)"""
+        width, height = size
+        if width <= dimensions[0] and height <= dimensions[1]:
+            return size
+        scale = min(dimensions[0] / width, dimensions[1] / height)
+        return max(1, round(width * scale)), max(1, round(height * scale))
 
-        r_avg = r_total // count
-        g_avg = g_total // count
-        b_avg = b_total // count
+    @staticmethod
+    def _cascade(img: Image.Image) -> dict[str, Image.Image]:
+        """
+        Все размеры SIZES, от большего к меньшему: каждый масштабируется из
+        предыдущего, полное разрешение обрабатывается один раз. Итоговые
+        размеры считаются от оригинала, как при масштабировании напрямую.
+        """
+        resized = {}
+        source = img
+        for size_name, dimensions in sorted(ImageProcessor.SIZES.items(), key=lambda item: -item[1][0]):
+            size = ImageProcessor._fit_size(img.size, dimensions)
+            if size == source.size:
+                source = source.copy()
+            else:
+                # reducing_gap: крупные уменьшения сначала через reduce()
+                source = source.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            resized[size_name] = source
+        return resized
 
-        return f"#{r_avg:02x}{g_avg:02x}{b_avg:02x}"
+    @staticmethod
+    def rendition_plan(version: str, effort: str = "max") -> list[tuple[str, str, str, int, str]]:
+        """
+        Список файлов изображения в порядке результата:
+        (ключ, размер, формат, качество, имя файла).
+        """
+        with_avif = AVIF_SUPPORTED and ImageProcessor.ENCODE_EFFORT[effort]["avif_speed"] is not None
+        plan = []
+        for size_name in ImageProcessor.SIZES:
+            # tiny - только как base64
+            if size_name == "tiny":
+                continue
+            plan.append((size_name, size_name, "WEBP", ImageProcessor.WEBP_QUALITY[size_name],
+                         f"{size_name}_{version}.webp"))
+            if with_avif and size_name in ImageProcessor.AVIF_QUALITY:
+                plan.append((f"{size_name}_avif", size_name, "AVIF", ImageProcessor.AVIF_QUALITY[size_name],
+                             f"{size_name}_{version}.avif"))
+        return plan
 
     @staticmethod
     def process_and_save(
-        file_content: bytes,
+        source: bytes | str | Path,
         dish_id: int,
-        filename: str
+        filename: str,
+        version: str | None = None,
+        threads: int | None = None,
+        effort: str = "max"
     ) -> dict[str, str]:
         """
         Обрабатывает загруженное изображение и создает все размеры.
         Возвращает словарь с путями к файлам и данными для progressive loading.
+        source - содержимое файла или путь к нему.
+        version - суффикс имён файлов (по умолчанию timestamp).
+        effort - усилие кодирования (ENCODE_EFFORT).
+
+        JPEG декодируется сразу уменьшенным (draft), размеры получаются
+        каскадом (large -> medium -> small -> thumbnail -> tiny). Кодирование
+        размеров и форматов независимо и идёт параллельно в threads потоках
+        (по умолчанию image_encode_threads): libwebp и libavif отпускают GIL.
+        Порядок ключей и имена файлов не зависят от порядка завершения.
         """
         dish_dir = Path(settings.upload_dir) / str(dish_id)
-        dish_dir.mkdir(parents=True, exist_ok=True)
-
-        # Уникальный timestamp для cache-busting
-        version = int(time.time())
-
-        # Открываем исходное изображение
-        img = ImageProcessor._prepare_image(file_content)
+        return ImageProcessor._render(
+            source, dish_dir, f"/{settings.upload_dir}/{dish_id}", version, threads, effort=effort
+        )
 
-        paths = {}
-
-        # Генерируем tiny base64 и dominant color
-        paths["tiny_base64"] = ImageProcessor.generate_tiny_base64(img)
-        paths["dominant_color"] = ImageProcessor.extract_dominant_color(img)
+    @staticmethod
+    def blob_dir(sha256: str) -> Path:
+        """Папка размеров оригинала в хранилище по хешу"""
+        return Path(settings.image_store_dir) / sha256[:2] / sha256
 
-        # Генерируем все размеры WebP
+    @staticmethod
+    def pipeline_versions(effort: str = "max") -> dict[str, str]:
+        """
+        Версия обработки каждого размера: меняется вместе с его параметрами
+        (размер, качество, AVIF, усилие кодирования) или PIPELINE_REVISION.
+        По ней массовая перегенерация (scripts/rerender_images.py) пропускает
+        актуальные размеры. tiny - плейсхолдеры и цвета, они пересчитываются
+        при любой обработке и от усилия не зависят.
+        """
+        encoder = ImageProcessor.ENCODE_EFFORT[effort]
+        versions = {}
         for size_name, dimensions in ImageProcessor.SIZES.items():
-            # Пропускаем tiny - он уже как base64
+            params = [
+                ImageProcessor.PIPELINE_REVISION, size_name, dimensions,
+                ImageProcessor.WEBP_QUALITY.get(size_name),
+                ImageProcessor.AVIF_QUALITY.get(size_name) if AVIF_SUPPORTED else None,
+            ]
             if size_name == "tiny":
-                continue
-
-            # Создаем копию и масштабируем
-            img_copy = img.copy()
-            img_copy.thumbnail(dimensions, Image.Resampling.LANCZOS)
+                params += [ImageProcessor.PALETTE_COLORS, THUMBHASH_SIDE]
+            else:
+                params += [encoder["webp_method"], encoder["avif_speed"] if AVIF_SUPPORTED else None]
+            versions[size_name] = hashlib.sha256(repr(params).encode()).hexdigest()[:12]
+        return versions
 
-            # Путь для сохранения WebP
-            webp_path = dish_dir / f"{size_name}_{version}.webp"
-            relative_webp = f"/{settings.upload_dir}/{dish_id}/{size_name}_{version}.webp"
+    @staticmethod
+    def render_blob(
+        source_path: str,
+        sha256: str,
+        version: str | None = None,
+        sizes: list[str] | None = None,
+        effort: str = "max"
+    ) -> dict[str, str]:
+        """
+        Создает размеры сохранённого оригинала в хранилище по хешу
+        (задание очереди). Файл декодируется с диска, не читаясь в память целиком.
+        sizes - только эти размеры (None - все); плейсхолдеры и цвета - всегда.
+        effort - усилие кодирования (ENCODE_EFFORT).
+        """
+        directory = ImageProcessor.blob_dir(sha256)
+        return ImageProcessor._render(
+            source_path, directory, f"/{settings.image_store_dir}/{sha256[:2]}/{sha256}", version,
+            sizes=sizes, effort=effort
+        )
 
-            # Сохраняем WebP
-            img_copy.save(
-                webp_path,
-                "WEBP",
-                quality=ImageProcessor.WEBP_QUALITY[size_name],
-                method=6  # Максимальное сжатие
-            )
-            paths[size_name] = relative_webp
+    @staticmethod
+    def _render(
+        source: bytes | str | Path,
+        directory: Path,
+        url_prefix: str,
+        version: str | None = None,
+        threads: int | None = None,
+        sizes: list[str] | None = None,
+        effort: str = "max"
+    ) -> dict[str, str]:
+        """Размеры изображения в directory (sizes, None - все); пути в результате - url_prefix/имя"""
+        directory.mkdir(parents=True, exist_ok=True)
+
+        # Уникальный суффикс для cache-busting
+        version = version or int(time.time())
+        threads = max(1, threads or settings.image_encode_threads)
+
+        # Открываем исходное изображение и масштабируем до запуска потоков
+        largest = max(ImageProcessor.SIZES.values(), key=lambda dimensions: dimensions[0])
+        img = ImageProcessor._prepare_image(source, fit=largest)
+        resized = ImageProcessor._cascade(img)
+        del img
+
+        plan = [item for item in ImageProcessor.rendition_plan(version, effort) if sizes is None or item[1] in sizes]
+        encoder = ImageProcessor.ENCODE_EFFORT[effort]
+        # libavif сам распараллеливает кодирование; делим ядра между потоками
+        avif_threads = max(1, (os.cpu_count() or 1) // threads)
+
+        def encode(item: tuple[str, str, str, int, str], resized: Image.Image) -> str | None:
+            key, size_name, fmt, quality, name = item
+            # Каждый save - на своём объекте: Pillow хранит параметры в im.encoderinfo
+            image = resized.copy() if fmt == "AVIF" else resized
+            try:
+                if fmt == "WEBP":
+                    image.save(directory / name, "WEBP", quality=quality, method=encoder["webp_method"])
+                else:
+                    image.save(directory / name, "AVIF", quality=quality, speed=encoder["avif_speed"],
+                               max_threads=avif_threads)
+            except Exception as e:
+                if fmt == "WEBP":
+                    raise
+                warnings.warn(f"Failed to save AVIF for {size_name}: {e}")
+                return None
+            return f"{url_prefix}/{name}"
+
+        palette = ImageProcessor.extract_palette(resized["tiny"])
+        paths = {
+            "tiny_base64": ImageProcessor.generate_tiny_base64(resized["tiny"]),
+            "thumbhash": ImageProcessor.generate_thumbhash(resized["thumbnail"]),
+            "dominant_color": palette[0],
+            "palette": ",".join(palette),
+        }
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            encoded = list(executor.map(lambda item: encode(item, resized[item[1]]), plan))
+        for (key, *_), path in zip(plan, encoded):
+            if path is not None:
+                paths[key] = path
 
-            # Генерируем AVIF для small, medium, large
-            if AVIF_SUPPORTED and size_name in ImageProcessor.AVIF_QUALITY:
-                avif_path = dish_dir / f"{size_name}_{version}.avif"
-                relative_avif = f"/{settings.upload_dir}/{dish_id}/{size_name}_{version}.avif"
+        return paths
 
-                try:
-                    img_copy.save(
-                        avif_path,
-                        "AVIF",
-                        quality=ImageProcessor.AVIF_QUALITY[size_name],
-                    )
-                    paths[f"{size_name}_avif"] = relative_avif
-                except Exception as e:
-                    warnings.warn(f"Failed to save AVIF for {size_name}: {e}")
+    @staticmethod
+    def _quality(width: int, fmt: str) -> int:
+        """Качество для произвольной ширины - как у ближайшего размера SIZES не меньше неё"""
+        qualities = ImageProcessor.WEBP_QUALITY if fmt == "WEBP" else ImageProcessor.AVIF_QUALITY
+        sizes = sorted(
+            (dimensions[0], size_name) for size_name, dimensions in ImageProcessor.SIZES.items()
+            if size_name in qualities
+        )
+        for size_width, size_name in sizes:
+            if size_width >= width:
+                return qualities[size_name]
+        return qualities[sizes[-1][1]]
 
-        return paths
+    @staticmethod
+    def render_width(source: str | Path, width: int, fmt: str, target: str | Path) -> None:
+        """
+        Создает изображение заданной ширины (без увеличения) в target
+        (запрос /img/...). fmt - "WEBP" или "AVIF".
+        """
+        # Высота не ограничена: вписываем только по ширине
+        fit = (width, 1 << 30)
+        img = ImageProcessor._prepare_image(source, fit=fit)
+        size = ImageProcessor._fit_size(img.size, fit)
+        if size != img.size:
+            img = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        quality = ImageProcessor._quality(width, fmt)
+        if fmt == "WEBP":
+            img.save(target, "WEBP", quality=quality, method=6)
+        else:
+            img.save(target, "AVIF", quality=quality)
 
     @staticmethod
     def regenerate_optimization(dish_id: int) -> dict[str, str] | None:
@@ -203,7 +413,10 @@ class ImageProcessor:
 
         # Генерируем tiny base64 и dominant color
         paths["tiny_base64"] = ImageProcessor.generate_tiny_base64(img)
-        paths["dominant_color"] = ImageProcessor.extract_dominant_color(img)
+        paths["thumbhash"] = ImageProcessor.generate_thumbhash(img)
+        palette = ImageProcessor.extract_palette(img)
+        paths["dominant_color"] = palette[0]
+        paths["palette"] = ",".join(palette)
 
         # Извлекаем версию из имени файла
         version = source_file.stem.split('_')[-1]
@@ -242,13 +455,16 @@ class ImageProcessor:
         return paths
 
     @staticmethod
-    def delete_images(dish_id: int) -> None:
-        """Удаляет все изображения блюда"""
+    def delete_images(dish_id: int, keep: Iterable[str] = ()) -> None:
+        """Удаляет изображения блюда, кроме файлов из keep (пути новых версий)"""
         dish_dir = Path(settings.upload_dir) / str(dish_id)
+        keep_names = {Path(path).name for path in keep if path}
         if dish_dir.exists():
             for file in dish_dir.iterdir():
-                file.unlink()
-            dish_dir.rmdir()
+                if file.name not in keep_names:
+                    file.unlink()
+            if not keep_names:
+                dish_dir.rmdir()
 
     @staticmethod
     def copy_images(source_dish_id: int, target_dish_id: int) -> dict[str, str] | None:
@@ -300,6 +516,9 @@ class ImageProcessor:
                 file_content = f.read()
             img = ImageProcessor._prepare_image(file_content)
             paths["tiny_base64"] = ImageProcessor.generate_tiny_base64(img)
-            paths["dominant_color"] = ImageProcessor.extract_dominant_color(img)
+            paths["thumbhash"] = ImageProcessor.generate_thumbhash(img)
+            palette = ImageProcessor.extract_palette(img)
+            paths["dominant_color"] = palette[0]
+            paths["palette"] = ",".join(palette)
 
         return paths if paths else None
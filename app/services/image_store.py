@@ -0,0 +1,250 @@
+"""
+Content-addressed storage of dish image renditions.
+
+An uploaded original is identified by its sha256. Its renditions are made
+once into image_store_dir/<sha256[:2]>/<sha256>/ and described by an
+ImageBlob row; Dish.image_hash points at it and the dish image columns hold
+the blob's URLs. Re-uploading a photo some dish already has, or duplicating
+a dish, only takes a reference: nothing is copied or encoded again.
+
+ImageBlob.ref_count is the number of dishes referencing the blob. It is
+adjusted by the dish write paths inside the caller's transaction (like the
+category counters); check()/repair() recompute it from the dishes table.
+A blob nobody referenced for image_blob_grace_hours is removed with its
+files and original by collect(), so an undone replacement is still cheap.
+"""
+import shutil
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update, delete, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models import Dish, ImageBlob, ImageJob
+from app.services.image_processor import ImageProcessor
+
+# Rendition key (ImageProcessor result) -> Dish column
+RENDITION_COLUMNS = {
+    'thumbnail': 'image_thumbnail',
+    'small': 'image_small',
+    'medium': 'image_medium',
+    'large': 'image_large',
+    'tiny_base64': 'image_tiny_base64',
+    'thumbhash': 'image_thumbhash',
+    'dominant_color': 'image_dominant_color',
+    'palette': 'image_palette',
+    'small_avif': 'image_small_avif',
+    'medium_avif': 'image_medium_avif',
+    'large_avif': 'image_large_avif',
+}
+
+
+def apply_renditions(dish: Dish, paths: Optional[Dict[str, str]]) -> None:
+    """Set the dish image columns from a rendition result (None clears them)."""
+    for key, column in RENDITION_COLUMNS.items():
+        setattr(dish, column, (paths or {}).get(key))
+
+
+def rendition_bytes(urls: Iterable[str]) -> int:
+    """Total size of the rendition files behind URLs (missing files and non-URLs count 0)."""
+    total = 0
+    for url in urls:
+        if url and url.startswith('/'):
+            file = Path(url.lstrip('/'))
+            if file.exists():
+                total += file.stat().st_size
+    return total
+
+
+def delete_blob_files(sha256: str, source_path: Optional[str], keep: Iterable[str] = ()) -> None:
+    """
+    Delete the renditions of a blob, except the `keep` URLs/paths;
+    with nothing to keep, also its directory and original.
+    """
+    directory = ImageProcessor.blob_dir(sha256)
+    keep_names = {Path(path).name for path in keep if path}
+    if directory.exists():
+        for file in directory.iterdir():
+            if file.name not in keep_names:
+                file.unlink()
+    if not keep_names:
+        shutil.rmtree(directory, ignore_errors=True)
+        if source_path:
+            Path(source_path).unlink(missing_ok=True)
+
+
+class ImageStore:
+    """Blobs of renditions shared by dishes, with reference counts."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, sha256: str) -> Optional[ImageBlob]:
+        return await self.db.get(ImageBlob, sha256)
+
+    async def add(self, sha256: str, source_path: str) -> ImageBlob:
+        """The blob of an original, created (pending) if it is new; no commit."""
+        blob = await self.get(sha256)
+        if blob is None:
+            blob = ImageBlob(sha256=sha256, source_path=source_path, status='pending', ref_count=0)
+            self.db.add(blob)
+            await self.db.flush()
+        elif blob.source_path is None or not Path(blob.source_path).exists():
+            blob.source_path = source_path
+        return blob
+
+    async def _adjust(self, counts: Dict[str, int]) -> None:
+        """Add {sha256: delta} to reference counts."""
+        now = datetime.utcnow()
+        for sha256, delta in counts.items():
+            if not delta:
+                continue
+            new_count = ImageBlob.ref_count + delta
+            await self.db.execute(
+                update(ImageBlob)
+                .where(ImageBlob.sha256 == sha256)
+                .values(
+                    ref_count=new_count,
+                    released_at=case((new_count <= 0, now), else_=None)
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    async def assign(self, dish: Dish, sha256: Optional[str]) -> None:
+        """
+        Point a dish at the blob of an original (None - no image); no commit.
+
+        The dish gets the blob's renditions if they are ready, otherwise the
+        placeholder until the blob's job applies them.
+        """
+        old_hash = dish.image_hash
+        if old_hash == sha256:
+            return
+        if old_hash is None and dish.image_small:
+            # Legacy per-dish files (before the store) are not shared
+            await run_in_threadpool(ImageProcessor.delete_images, dish.id)
+        if old_hash:
+            await self._adjust({old_hash: -1})
+        blob = None
+        if sha256:
+            await self._adjust({sha256: 1})
+            blob = await self.get(sha256)
+            await self.db.refresh(blob, ['ref_count', 'released_at'])
+        dish.image_hash = sha256
+        apply_renditions(dish, blob.renditions if blob is not None and blob.status == 'ready' else None)
+
+    async def release_dishes(self, dish_ids: Iterable[int]) -> None:
+        """Drop the references of dishes about to be deleted; no commit."""
+        result = await self.db.execute(
+            select(Dish.image_hash).where(Dish.id.in_(list(dish_ids)), Dish.image_hash.is_not(None))
+        )
+        await self._adjust({sha256: -count for sha256, count in Counter(result.scalars().all()).items()})
+
+    async def mark_ready(
+        self,
+        sha256: str,
+        renditions: Dict[str, str],
+        sizes: Optional[List[str]] = None,
+        effort: str = 'max'
+    ) -> List[Dish]:
+        """
+        Store the renditions of a blob and the pipeline version of the
+        rendered sizes (None - all) at the given encoder effort; no commit.
+        Files of an older rendering are the caller's to delete after the commit.
+
+        Returns:
+            Dishes referencing the blob (the caller applies the renditions)
+        """
+        blob = await self.get(sha256)
+        blob.status = 'ready'
+        blob.renditions = renditions
+        current = ImageProcessor.pipeline_versions(effort)
+        # Placeholders and colors (tiny) are remade by every rendering
+        rendered = current if sizes is None else {*sizes, 'tiny'}
+        blob.pipeline = {
+            **(blob.pipeline or {}),
+            **{size_name: current[size_name] for size_name in rendered if size_name in current},
+        }
+        result = await self.db.execute(select(Dish).where(Dish.image_hash == sha256).order_by(Dish.id))
+        return list(result.scalars().all())
+
+    async def collect(self, grace_hours: Optional[float] = None) -> int:
+        """
+        Delete blobs unreferenced for longer than the grace period, with
+        their files and original, and cancel their pending jobs (commits).
+
+        Returns:
+            Number of deleted blobs
+        """
+        if grace_hours is None:
+            grace_hours = get_settings().image_blob_grace_hours
+        cutoff = datetime.utcnow() - timedelta(hours=grace_hours)
+        result = await self.db.execute(
+            select(ImageBlob).where(ImageBlob.ref_count <= 0, ImageBlob.released_at < cutoff)
+        )
+        blobs = result.scalars().all()
+        if not blobs:
+            return 0
+        hashes = [blob.sha256 for blob in blobs]
+        await self.db.execute(
+            update(ImageJob)
+            .where(ImageJob.source_hash.in_(hashes), ImageJob.status == 'pending')
+            .values(status='cancelled', finished_at=datetime.utcnow())
+        )
+        await self.db.execute(delete(ImageBlob).where(ImageBlob.sha256.in_(hashes)))
+        await self.db.commit()
+        for blob in blobs:
+            await run_in_threadpool(delete_blob_files, blob.sha256, blob.source_path)
+        return len(blobs)
+
+    # ==================== CONSISTENCY ====================
+
+    async def check(self) -> List[Dict[str, Any]]:
+        """
+        Compare stored reference counts with the dishes table.
+
+        Returns:
+            List of mismatches with stored and actual values
+            (dish hashes without a blob have stored None)
+        """
+        actual_result = await self.db.execute(
+            select(Dish.image_hash, func.count(Dish.id))
+            .where(Dish.image_hash.is_not(None))
+            .group_by(Dish.image_hash)
+        )
+        actual = dict(actual_result.all())
+        stored_result = await self.db.execute(select(ImageBlob.sha256, ImageBlob.ref_count))
+        stored = dict(stored_result.all())
+
+        mismatches = []
+        for sha256 in sorted(set(actual) | set(stored)):
+            if stored.get(sha256) != actual.get(sha256, 0):
+                mismatches.append({
+                    'sha256': sha256,
+                    'stored': stored.get(sha256),
+                    'actual': actual.get(sha256, 0),
+                })
+        return mismatches
+
+    async def repair(self) -> List[Dict[str, Any]]:
+        """Fix mismatched counts (no commit). Returns the fixed mismatches."""
+        mismatches = await self.check()
+        now = datetime.utcnow()
+        for mismatch in mismatches:
+            if mismatch['stored'] is None:
+                # Blob row lost: dishes keep their URLs, the blob is re-created
+                self.db.add(ImageBlob(sha256=mismatch['sha256'], status='pending', ref_count=mismatch['actual']))
+                continue
+            await self.db.execute(
+                update(ImageBlob)
+                .where(ImageBlob.sha256 == mismatch['sha256'])
+                .values(
+                    ref_count=mismatch['actual'],
+                    released_at=now if mismatch['actual'] == 0 else None
+                )
+            )
+        return mismatches
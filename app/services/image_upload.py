@@ -0,0 +1,131 @@
+"""
+Streaming storage of uploaded images.
+
+An upload is copied to disk in chunks (upload_chunk_size) while its sha256
+is computed, so a request never holds more than one chunk of it in memory.
+The header is identified from the first chunks: the format and pixel
+dimensions are checked before the rest of the file is read, and an
+unacceptable file is rejected without being stored. The pixels themselves
+are only decoded later, from the stored file, by ImageProcessor.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image
+
+from app.config import get_settings
+from app.services.image_processor import AVIF_SUPPORTED, InvalidImage
+
+# Pillow format -> file extension of the stored original
+ALLOWED_FORMATS = {
+    'JPEG': '.jpg',
+    'MPO': '.jpg',  # JPEG with extra frames (many phone cameras)
+    'PNG': '.png',
+    'WEBP': '.webp',
+}
+if AVIF_SUPPORTED:
+    ALLOWED_FORMATS['AVIF'] = '.avif'
+
+# Bytes buffered at most to identify the header (EXIF may precede it)
+HEADER_LIMIT = 512 * 1024
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    sha256: str
+    format: str
+    width: int
+    height: int
+    size: int
+
+
+def sniff_image(head: bytes) -> Optional[Tuple[str, int, int]]:
+    """Format and dimensions from the beginning of a file; None if not identified yet."""
+    try:
+        with Image.open(BytesIO(head)) as img:
+            return img.format, img.width, img.height
+    except Exception:
+        return None
+
+
+def check_header(image_format: str, width: int, height: int) -> None:
+    """
+    Raises:
+        InvalidImage: Unsupported format or more pixels than image_max_pixels
+    """
+    settings = get_settings()
+    if image_format not in ALLOWED_FORMATS:
+        raise InvalidImage(f"Неподдерживаемый формат изображения: {image_format}")
+    if width * height > settings.image_max_pixels:
+        raise InvalidImage(
+            f"Изображение слишком большое: {width}x{height} "
+            f"(макс {settings.image_max_pixels / 1e6:.0f} Мп)"
+        )
+
+
+async def store_upload(upload: UploadFile, directory: Path) -> StoredUpload:
+    """
+    Copy an uploaded image to `directory` as <sha256[:2]>/<sha256><ext>.
+
+    Raises:
+        InvalidImage: Not an image, unsupported format, too many pixels
+            or larger than max_image_size
+    """
+    settings = get_settings()
+    await run_in_threadpool(directory.mkdir, parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".part")
+    tmp_path = Path(tmp_name)
+    digest = hashlib.sha256()
+    head = b""
+    header = None
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await upload.read(settings.upload_chunk_size):
+                size += len(chunk)
+                if size > settings.max_image_size:
+                    raise InvalidImage(
+                        f"Изображение слишком большое (макс {settings.max_image_size // (1024 * 1024)} МБ)"
+                    )
+                if header is None:
+                    head += chunk[:HEADER_LIMIT - len(head)]
+                    header = sniff_image(head)
+                    if header is None and len(head) >= HEADER_LIMIT:
+                        raise InvalidImage("Файл не является изображением")
+                    if header is not None:
+                        check_header(*header)
+                        head = b""
+                digest.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+        if header is None:
+            raise InvalidImage("Файл не является изображением")
+
+        image_format, width, height = header
+        sha256 = digest.hexdigest()
+        path = directory / sha256[:2] / f"{sha256}{ALLOWED_FORMATS[image_format]}"
+        # The same original may already be stored: keep the existing file
+        if path.exists():
+            tmp_path.unlink()
+        else:
+            path.parent.mkdir(exist_ok=True)
+            tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return StoredUpload(
+        path=str(path),
+        sha256=sha256,
+        format=image_format,
+        width=width,
+        height=height,
+        size=size,
+    )
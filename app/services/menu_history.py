@@ -0,0 +1,384 @@
+"""
+Point-in-time menu reconstruction.
+
+The menu (categories and dishes) is snapshotted periodically; each snapshot
+records the newest audit event it already reflects. The state at a moment
+is rebuilt from the nearest earlier snapshot by replaying the dish and
+category audit events after it, so a query never replays history from the
+beginning.
+
+Replay is idempotent: a snapshot may already include changes whose events
+are newer than its last_audit_log_id (events are written after the data
+commit), and applying them again gives the same state. Events without
+per-row data (imports) cannot be replayed; a snapshot is taken right after
+every import, and reconstructions that had to skip such events are marked
+incomplete.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import async_session
+from app.models import Category, Dish, AuditLog, MenuSnapshot
+from app.services.audit import audit_archive
+from app.services.serializers import serializer_for
+
+logger = logging.getLogger(__name__)
+
+# Derived or bulky columns not kept in snapshots and not replayed
+SNAPSHOT_EXCLUDE = frozenset({'image_tiny_base64', 'dishes_total', 'dishes_available'})
+
+ENTITY_KEYS = {'dish': 'dishes', 'category': 'categories'}
+ACTIVE_FIELDS = {'dish': 'is_available', 'category': 'is_active'}
+REPLAY_COLUMNS = ['id', 'created_at', 'action', 'entity_type', 'entity_id', 'new_data']
+
+MenuState = Dict[str, Dict[str, Dict[str, Any]]]
+
+
+def empty_state() -> MenuState:
+    return {'categories': {}, 'dishes': {}}
+
+
+def _row(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in data.items() if key not in SNAPSHOT_EXCLUDE}
+
+
+def apply_event(state: MenuState, event: Dict[str, Any]) -> bool:
+    """
+    Apply one audit event to a menu state (ids are string keys, as in JSON).
+
+    Returns:
+        False if the event changes the menu but cannot be replayed
+    """
+    key = ENTITY_KEYS.get(event.get('entity_type'))
+    if key is None:
+        return True
+    rows = state[key]
+    action = event['action']
+    new_data = event.get('new_data') or {}
+    entity_id = str(event['entity_id']) if event.get('entity_id') is not None else None
+
+    if action == 'create' and entity_id:
+        rows[entity_id] = _row(new_data)
+    elif action == 'update' and entity_id:
+        row = rows.get(entity_id)
+        if row is not None:
+            for field, change in new_data.items():
+                if field not in SNAPSHOT_EXCLUDE and isinstance(change, dict) and 'new' in change:
+                    row[field] = change['new']
+    elif action == 'delete' and entity_id:
+        rows.pop(entity_id, None)
+    elif action in ('bulk_activate', 'bulk_deactivate'):
+        field = ACTIVE_FIELDS[event['entity_type']]
+        for item_id in new_data.get('changed_ids', new_data.get('ids', [])):
+            if str(item_id) in rows:
+                rows[str(item_id)][field] = action == 'bulk_activate'
+    elif action == 'bulk_delete':
+        for item_id in new_data.get('ids', []):
+            rows.pop(str(item_id), None)
+    elif action == 'reorder':
+        for item_id, order in new_data.get('sort_order', {}).items():
+            if item_id in rows:
+                rows[item_id]['sort_order'] = order
+    elif action == 'import':
+        return False
+    return True
+
+
+# ==================== SNAPSHOT STORAGE ====================
+
+class DbSnapshotStore:
+    """Snapshots in the menu_snapshots table (compressed JSON column)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def save(self, taken_at: datetime, last_id: int, data: MenuState) -> None:
+        self.db.add(MenuSnapshot(
+            taken_at=taken_at,
+            last_audit_log_id=last_id,
+            categories_count=len(data['categories']),
+            dishes_count=len(data['dishes']),
+            data=data
+        ))
+        await self.db.flush()
+
+    async def nearest(self, at: datetime) -> Optional[Tuple[datetime, int, MenuState]]:
+        result = await self.db.execute(
+            select(MenuSnapshot.taken_at, MenuSnapshot.last_audit_log_id, MenuSnapshot.data)
+            .where(MenuSnapshot.taken_at <= at)
+            .order_by(MenuSnapshot.taken_at.desc())
+            .limit(1)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+    async def latest_taken_at(self) -> Optional[datetime]:
+        result = await self.db.execute(select(func.max(MenuSnapshot.taken_at)))
+        return result.scalar()
+
+    async def prune(self, before: datetime) -> int:
+        """Delete snapshots older than `before`, always keeping the newest one."""
+        newest = await self.latest_taken_at()
+        if newest is None:
+            return 0
+        result = await self.db.execute(
+            delete(MenuSnapshot)
+            .where(MenuSnapshot.taken_at < before)
+            .where(MenuSnapshot.taken_at < newest)
+        )
+        return result.rowcount or 0
+
+
+class FileSnapshotStore:
+    """Snapshots as gzip JSON files: <dir>/menu-<timestamp>-<last_id>.json.gz"""
+
+    PREFIX = "menu-"
+    SUFFIX = ".json.gz"
+    TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _files(self) -> List[Tuple[datetime, int, Path]]:
+        """(taken_at, last_id, path), oldest first."""
+        if not self.directory.exists():
+            return []
+        files = []
+        for path in self.directory.glob(f"{self.PREFIX}*{self.SUFFIX}"):
+            stem = path.name[len(self.PREFIX):-len(self.SUFFIX)]
+            try:
+                stamp, last_id = stem.rsplit("-", 1)
+                files.append((datetime.strptime(stamp, self.TIME_FORMAT), int(last_id), path))
+            except ValueError:
+                continue
+        return sorted(files)
+
+    def _save(self, taken_at: datetime, last_id: int, data: MenuState) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{self.PREFIX}{taken_at.strftime(self.TIME_FORMAT)}-{last_id}{self.SUFFIX}"
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as gz:
+                gz.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+
+    def _nearest(self, at: datetime) -> Optional[Tuple[datetime, int, MenuState]]:
+        candidates = [f for f in self._files() if f[0] <= at]
+        if not candidates:
+            return None
+        taken_at, last_id, path = candidates[-1]
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return taken_at, last_id, json.load(f)
+
+    def _prune(self, before: datetime) -> int:
+        files = self._files()
+        removed = 0
+        for taken_at, _, path in files[:-1]:
+            if taken_at < before:
+                path.unlink()
+                removed += 1
+        return removed
+
+    async def save(self, taken_at: datetime, last_id: int, data: MenuState) -> None:
+        await run_in_threadpool(self._save, taken_at, last_id, data)
+
+    async def nearest(self, at: datetime) -> Optional[Tuple[datetime, int, MenuState]]:
+        return await run_in_threadpool(self._nearest, at)
+
+    async def latest_taken_at(self) -> Optional[datetime]:
+        files = await run_in_threadpool(self._files)
+        return files[-1][0] if files else None
+
+    async def prune(self, before: datetime) -> int:
+        return await run_in_threadpool(self._prune, before)
+
+
+def snapshot_store(db: AsyncSession):
+    """Store selected by MENU_SNAPSHOT_DIR."""
+    directory = get_settings().menu_snapshot_dir
+    return FileSnapshotStore(directory) if directory else DbSnapshotStore(db)
+
+
+# ==================== HISTORY ====================
+
+class MenuHistory:
+    """Take menu snapshots and rebuild the menu at a moment."""
+
+    def __init__(self, db: AsyncSession, store=None, archive=audit_archive):
+        self.db = db
+        self.store = store or snapshot_store(db)
+        self.archive = archive
+
+    async def current_state(self) -> MenuState:
+        categories = (await self.db.execute(select(Category))).scalars().all()
+        dishes = (await self.db.execute(select(Dish))).scalars().all()
+        category_row = serializer_for(Category, SNAPSHOT_EXCLUDE)
+        dish_row = serializer_for(Dish, SNAPSHOT_EXCLUDE)
+        return {
+            'categories': {str(c.id): category_row(c) for c in categories},
+            'dishes': {str(d.id): dish_row(d) for d in dishes},
+        }
+
+    async def take_snapshot(self) -> Dict[str, Any]:
+        """
+        Snapshot the current menu; the caller commits.
+
+        Returns:
+            {'taken_at', 'last_audit_log_id', 'categories', 'dishes'}
+        """
+        # Read the event high-water mark before the data: every event up
+        # to it is then reflected in the state read below
+        last_id = (await self.db.execute(select(func.max(AuditLog.id)))).scalar() or 0
+        taken_at = datetime.utcnow()
+        state = await self.current_state()
+        await self.store.save(taken_at, last_id, state)
+        return {
+            'taken_at': taken_at,
+            'last_audit_log_id': last_id,
+            'categories': len(state['categories']),
+            'dishes': len(state['dishes']),
+        }
+
+    async def events_after(self, after_id: int, at: datetime, since: Optional[datetime]) -> List[Dict[str, Any]]:
+        """Dish and category events with id > after_id up to `at`, in id order."""
+        events: Dict[int, Dict[str, Any]] = {}
+
+        # Archived days are read only when the snapshot is older than retention
+        days = await run_in_threadpool(
+            self.archive.days_between, since.date() if since else None, at.date()
+        )
+        for day in days:
+            for record in await run_in_threadpool(self.archive.read_day, day):
+                if (record['id'] > after_id and record['entity_type'] in ENTITY_KEYS
+                        and record.get('created_at')
+                        and datetime.fromisoformat(record['created_at']) <= at):
+                    events[record['id']] = record
+
+        result = await self.db.execute(
+            select(*[getattr(AuditLog, column) for column in REPLAY_COLUMNS])
+            .where(AuditLog.id > after_id)
+            .where(AuditLog.created_at <= at)
+            .where(AuditLog.entity_type.in_(list(ENTITY_KEYS)))
+            .order_by(AuditLog.id)
+        )
+        for row in result.all():
+            events[row.id] = dict(zip(REPLAY_COLUMNS, row))
+
+        return [events[event_id] for event_id in sorted(events)]
+
+    async def as_of(self, at: datetime) -> Dict[str, Any]:
+        """
+        Rebuild the menu as it was at `at` (naive UTC).
+
+        Returns:
+            Categories (with their dishes) ordered by sort_order, the snapshot
+            used, replay counters and whether the result is complete
+        """
+        snapshot = await self.store.nearest(at)
+        if snapshot:
+            taken_at, after_id, state = snapshot
+        else:
+            taken_at, after_id, state = None, 0, empty_state()
+
+        events = await self.events_after(after_id, at, taken_at)
+        skipped = sum(1 for event in events if not apply_event(state, event))
+
+        return {
+            'at': at.isoformat(),
+            'snapshot': {
+                'taken_at': taken_at.isoformat(),
+                'last_audit_log_id': after_id,
+            } if taken_at else None,
+            'events_replayed': len(events) - skipped,
+            'events_skipped': skipped,
+            'complete': taken_at is not None and skipped == 0,
+            **self._menu(state),
+        }
+
+    @staticmethod
+    def _menu(state: MenuState) -> Dict[str, Any]:
+        def order(row):
+            return (row.get('sort_order') or 0, row.get('id') or 0)
+
+        by_category: Dict[Any, List[Dict[str, Any]]] = {}
+        for dish in sorted(state['dishes'].values(), key=order):
+            by_category.setdefault(dish.get('category_id'), []).append(dish)
+
+        categories = [
+            {**category, 'dishes': by_category.pop(category.get('id'), [])}
+            for category in sorted(state['categories'].values(), key=order)
+        ]
+        return {
+            'categories': categories,
+            # Dishes whose category is missing from the reconstructed state
+            'orphan_dishes': [dish for dishes in by_category.values() for dish in dishes],
+        }
+
+
+# ==================== PERIODIC SNAPSHOTS ====================
+
+class MenuSnapshotter:
+    """Background task taking a menu snapshot every interval_hours."""
+
+    def __init__(self, interval_hours: float, keep_days: int, session_factory=async_session):
+        self.interval = timedelta(hours=interval_hours)
+        self.keep_days = keep_days
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval.total_seconds() > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> Optional[Dict[str, Any]]:
+        """Take a snapshot if the newest one is older than the interval."""
+        async with self.session_factory() as session:
+            history = MenuHistory(session)
+            latest = await history.store.latest_taken_at()
+            if latest and datetime.utcnow() - latest < self.interval:
+                return None
+            info = await history.take_snapshot()
+            await history.store.prune(datetime.utcnow() - timedelta(days=self.keep_days))
+            await session.commit()
+            return info
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Menu snapshot failed")
+            # Check several times per interval: other processes may snapshot too
+            await asyncio.sleep(max(60.0, self.interval.total_seconds() / 4))
+
+
+_settings = get_settings()
+
+# Global instance started in the app lifespan
+menu_snapshotter = MenuSnapshotter(
+    interval_hours=_settings.menu_snapshot_interval_hours,
+    keep_days=_settings.menu_snapshot_keep_days
+)
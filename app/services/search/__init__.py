@@ -0,0 +1,14 @@
+"""
+Search module: in-memory typeahead index for the admin panel.
+"""
+from .index import SearchIndex, SearchEntry, search_index
+from .normalize import canonicalize, tokenize, query_variants
+
+__all__ = [
+    'SearchIndex',
+    'SearchEntry',
+    'search_index',
+    'canonicalize',
+    'tokenize',
+    'query_variants',
+]
@@ -0,0 +1,247 @@
+"""
+In-memory typeahead index over dish and category names.
+
+Names are split into canonical tokens (see normalize.py). Each kind of
+entity gets its own shard with a sorted token vocabulary for prefix lookups,
+token -> ids postings, and a trigram map over the vocabulary for typo
+tolerance. Fuzzy matching works on distinct words rather than on items, so
+its cost depends on vocabulary size, not on the number of dishes.
+
+The index lives in the worker process: it is built on startup and kept up
+to date by the admin write paths via index_dish/index_category/remove_*.
+"""
+import heapq
+import threading
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.models import Category, Dish
+from .normalize import tokenize, query_variants
+
+
+# Candidates taken from the most selective query token before ranking
+MAX_CANDIDATES = 256
+# Minimal trigram similarity (Jaccard) for a typo match of a word
+MIN_TRIGRAM_SIMILARITY = 0.35
+
+
+class SearchEntry(NamedTuple):
+    """Indexed dish or category."""
+    kind: str
+    id: int
+    name: str
+    category_id: Optional[int]
+    tokens: Tuple[str, ...]
+
+
+def _trigrams(token: str) -> frozenset:
+    """Get padded trigrams of a token."""
+    padded = f"  {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class _Shard:
+    """Index structures for one kind of entity."""
+
+    def __init__(self):
+        self.entries: Dict[int, SearchEntry] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self.vocabulary: List[str] = []
+        self.token_trigrams: Dict[str, frozenset] = {}
+        self.trigram_tokens: Dict[str, Set[str]] = {}
+
+    def add(self, entry: SearchEntry) -> None:
+        self.remove(entry.id)
+        self.entries[entry.id] = entry
+        for token in entry.tokens:
+            ids = self.postings.get(token)
+            if ids is not None:
+                ids.add(entry.id)
+                continue
+            self.postings[token] = {entry.id}
+            insort(self.vocabulary, token)
+            trigrams = _trigrams(token)
+            self.token_trigrams[token] = trigrams
+            for trigram in trigrams:
+                self.trigram_tokens.setdefault(trigram, set()).add(token)
+
+    def remove(self, entity_id: int) -> None:
+        entry = self.entries.pop(entity_id, None)
+        if entry is None:
+            return
+        for token in entry.tokens:
+            ids = self.postings[token]
+            ids.discard(entity_id)
+            if ids:
+                continue
+            del self.postings[token]
+            del self.vocabulary[bisect_left(self.vocabulary, token)]
+            for trigram in self.token_trigrams.pop(token):
+                tokens = self.trigram_tokens[trigram]
+                tokens.discard(token)
+                if not tokens:
+                    del self.trigram_tokens[trigram]
+
+    def match_token(self, q_token: str) -> Dict[str, float]:
+        """
+        Vocabulary words matching a query word.
+
+        Returns:
+            {word: weight}, 1.0 for prefix matches, similarity for typos
+        """
+        matches = {}
+        i = bisect_left(self.vocabulary, q_token)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(q_token):
+            matches[self.vocabulary[i]] = 1.0
+            i += 1
+        if matches:
+            return matches
+
+        q_trigrams = _trigrams(q_token)
+        shared: Dict[str, int] = {}
+        for trigram in q_trigrams:
+            for token in self.trigram_tokens.get(trigram, ()):
+                shared[token] = shared.get(token, 0) + 1
+        for token, count in shared.items():
+            similarity = count / (len(q_trigrams) + len(self.token_trigrams[token]) - count)
+            if similarity >= MIN_TRIGRAM_SIMILARITY:
+                matches[token] = similarity
+        return matches
+
+    def search(self, q_tokens: List[str]) -> Dict[int, float]:
+        """Score entries where every query word matches some name word."""
+        token_matches = []
+        for q_token in q_tokens:
+            matches = self.match_token(q_token)
+            if not matches:
+                return {}
+            token_matches.append(matches)
+
+        # Drive candidate collection by the most selective query word
+        driver = min(
+            range(len(token_matches)),
+            key=lambda n: sum(len(self.postings[t]) for t in token_matches[n])
+        )
+        candidates: Dict[int, float] = {}
+        for token, weight in sorted(token_matches[driver].items(), key=lambda item: -item[1]):
+            need = MAX_CANDIDATES - len(candidates)
+            if need <= 0:
+                break
+            for entity_id in islice(self.postings[token], need):
+                candidates.setdefault(entity_id, weight)
+        others = [matches for n, matches in enumerate(token_matches) if n != driver]
+        first = token_matches[0]
+
+        scored = {}
+        for entity_id, total in candidates.items():
+            entry = self.entries[entity_id]
+            for matches in others:
+                weight = max((matches.get(t, 0.0) for t in entry.tokens), default=0.0)
+                if not weight:
+                    break
+                total += weight
+            else:
+                score = total / len(token_matches) - len(entry.tokens) * 0.01
+                if entry.tokens[0] in first:
+                    score += 0.5
+                scored[entity_id] = score
+        return scored
+
+
+class SearchIndex:
+    """Prefix/trigram index with keyboard-layout and translit awareness."""
+
+    KINDS = ('dish', 'category')
+
+    def __init__(self):
+        self._shards: Dict[str, _Shard] = {kind: _Shard() for kind in self.KINDS}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards.values())
+
+    # ==================== WRITE ====================
+
+    def add(self, kind: str, entity_id: int, name: str, category_id: Optional[int] = None) -> None:
+        """Add or replace an entry."""
+        tokens = tuple(dict.fromkeys(tokenize(name or '')))
+        entry = SearchEntry(kind, entity_id, name or '', category_id, tokens)
+        with self._lock:
+            self._shards[kind].add(entry)
+
+    def remove(self, kind: str, entity_id: int) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            self._shards[kind].remove(entity_id)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._shards = {kind: _Shard() for kind in self.KINDS}
+
+    def index_dish(self, dish: Dish) -> None:
+        """Add or refresh a dish."""
+        self.add('dish', dish.id, dish.name, dish.category_id)
+
+    def index_category(self, category: Category) -> None:
+        """Add or refresh a category."""
+        self.add('category', category.id, category.name)
+
+    def remove_dish(self, dish_id: int) -> None:
+        self.remove('dish', dish_id)
+
+    def remove_category(self, category_id: int) -> None:
+        self.remove('category', category_id)
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Rebuild the whole index from the database."""
+        categories = await db.execute(select(Category.id, Category.name))
+        dishes = await db.execute(select(Dish.id, Dish.name, Dish.category_id))
+
+        self.clear()
+        for cat_id, name in categories.all():
+            self.add('category', cat_id, name)
+        for dish_id, name, category_id in dishes.all():
+            self.add('dish', dish_id, name, category_id)
+
+    # ==================== READ ====================
+
+    def category_name(self, category_id: Optional[int]) -> str:
+        """Resolve a category name from the index."""
+        entry = self._shards['category'].entries.get(category_id)
+        return entry.name if entry else ""
+
+    def search(self, query: str, kind: str, limit: int = 10) -> List[SearchEntry]:
+        """
+        Find entries by word prefixes, tolerating typos, wrong keyboard
+        layout and transliteration.
+
+        Args:
+            query: Raw user input
+            kind: 'dish' or 'category'
+            limit: Maximum number of results
+
+        Returns:
+            Matching entries, best first
+        """
+        with self._lock:
+            shard = self._shards[kind]
+            scored: Dict[int, float] = {}
+            for variant in query_variants(query):
+                q_tokens = tokenize(variant)
+                if not q_tokens:
+                    continue
+                for entity_id, score in shard.search(q_tokens).items():
+                    if score > scored.get(entity_id, 0.0):
+                        scored[entity_id] = score
+
+            best = heapq.nsmallest(limit, scored.items(), key=lambda item: (-item[1], item[0]))
+            return [shard.entries[entity_id] for entity_id, _ in best]
+
+
+# Global instance used by the admin search endpoint
+search_index = SearchIndex()
@@ -0,0 +1,77 @@
+"""
+Text normalization for the admin typeahead index.
+
+Every indexed name and every query is reduced to a canonical Latin form:
+Cyrillic is transliterated and common transliteration variants are folded,
+so "шашлык", "shashlyk" and "shashlik" all end up as the same tokens.
+Queries typed on the wrong keyboard layout are swapped before normalizing.
+"""
+import re
+from typing import List
+
+
+# ЙЦУКЕН <-> QWERTY (same physical keys)
+_LAYOUT_EN = "`qwertyuiop[]asdfghjkl;'zxcvbnm,."
+_LAYOUT_RU = "ёйцукенгшщзхъфывапролджэячсмитьбю"
+
+EN_TO_RU = str.maketrans(_LAYOUT_EN + _LAYOUT_EN.upper(), _LAYOUT_RU + _LAYOUT_RU.upper())
+RU_TO_EN = str.maketrans(_LAYOUT_RU + _LAYOUT_RU.upper(), _LAYOUT_EN + _LAYOUT_EN.upper())
+
+TRANSLIT = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'e',
+    'ж': 'zh', 'з': 'z', 'и': 'i', 'й': 'i', 'к': 'k', 'л': 'l', 'м': 'm',
+    'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
+    'ф': 'f', 'х': 'h', 'ц': 'c', 'ч': 'ch', 'ш': 'sh', 'щ': 'sch',
+    'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya',
+}
+_TRANSLIT_TABLE = str.maketrans(TRANSLIT)
+
+# Folding of ambiguous Latin spellings, applied in order after transliteration
+_FOLDS = (
+    ('shch', 'sch'),
+    ('kh', 'h'),
+    ('tz', 'c'),
+    ('ts', 'c'),
+    ('ck', 'k'),
+    ('ph', 'f'),
+    ('w', 'v'),
+    ('q', 'k'),
+    ('x', 'ks'),
+    ('j', 'y'),
+    ('y', 'i'),
+)
+
+_CYRILLIC_RE = re.compile(r'[а-яё]', re.IGNORECASE)
+_LATIN_RE = re.compile(r'[a-z]', re.IGNORECASE)
+_SPLIT_RE = re.compile(r'[^a-z0-9]+')
+
+
+def canonicalize(text: str) -> str:
+    """Lowercase, transliterate and fold text into canonical Latin form."""
+    value = text.lower().translate(_TRANSLIT_TABLE)
+    for src, dst in _FOLDS:
+        value = value.replace(src, dst)
+    return value
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into canonical tokens."""
+    return [t for t in _SPLIT_RE.split(canonicalize(text)) if t]
+
+
+def query_variants(query: str) -> List[str]:
+    """
+    Get the query as typed plus its keyboard-layout swapped forms.
+
+    Args:
+        query: Raw user input
+
+    Returns:
+        Unique variants, the original first
+    """
+    variants = [query]
+    if _LATIN_RE.search(query):
+        variants.append(query.translate(EN_TO_RU))
+    if _CYRILLIC_RE.search(query):
+        variants.append(query.translate(RU_TO_EN))
+    return list(dict.fromkeys(variants))
@@ -0,0 +1,137 @@
+"""
+Precompiled model serializers.
+
+A ModelSerializer turns instances of one model class into JSON-ready dicts.
+The field list and the converter of every field are fixed when it is built,
+and the function that builds the dict is generated for exactly those fields,
+so a call does no column reflection or per-value type checks:
+
+    dates and datetimes  -> isoformat() strings
+    Numeric (Decimal)    -> float
+    everything else      -> as is
+
+serializer_for() keeps one serializer per (model class, excluded fields);
+audit snapshots, menu snapshots, the audit export and the public JSON API
+all go through it. Secret columns (password_hash) are never serialized.
+"""
+import keyword
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, DateTime, Numeric, Time
+
+# Columns no serializer ever outputs
+SECRET_FIELDS = frozenset({'password_hash'})
+
+# Converter templates; {0} is the value expression (evaluated once)
+_CONVERTERS = {
+    'plain': "{0}",
+    'temporal': "(v if (v := {0}) is None or v.__class__ is str else v.isoformat())",
+    'decimal': "(float(v) if (v := {0}).__class__ is _Decimal else v)",
+}
+
+
+def _column_kind(column) -> str:
+    if isinstance(column.type, (DateTime, Date, Time)):
+        return 'temporal'
+    if isinstance(column.type, Numeric) and column.type.asdecimal:
+        return 'decimal'
+    return 'plain'
+
+
+def _compile(name: str, source_lines: List[str], **names) -> Callable:
+    source = "\n".join(source_lines)
+    namespace = {'_Decimal': Decimal, **names}
+    exec(compile(source, f"<serializer {name}>", "exec"), namespace)
+    return namespace[name]
+
+
+class ModelSerializer:
+    """Serializer generated for one model class."""
+
+    def __init__(
+        self,
+        model_class,
+        fields: Optional[Dict[str, str]] = None,
+        exclude: Iterable[str] = ()
+    ):
+        """
+        Args:
+            model_class: Declarative model
+            fields: Output key -> column attribute, in output order
+                (default: every column under its own name)
+            exclude: Columns left out of the default field list
+        """
+        columns = model_class.__table__.columns
+        if fields is None:
+            skip = SECRET_FIELDS | set(exclude)
+            fields = {column.key: column.key for column in columns if column.key not in skip}
+        invalid = (set(fields.values()) - set(columns.keys())) | (SECRET_FIELDS & set(fields.values()))
+        if invalid:
+            raise ValueError(f"Cannot serialize {model_class.__name__} fields: {sorted(invalid)}")
+
+        self.model_class = model_class
+        self.fields: Tuple[Tuple[str, str, str], ...] = tuple(
+            (key, attr, _column_kind(columns[attr])) for key, attr in fields.items()
+        )
+        #: Output keys, in order
+        self.columns: Tuple[str, ...] = tuple(key for key, _, _ in self.fields)
+        #: Mapped attributes to select() for from_row(), in order
+        self.select_columns = tuple(getattr(model_class, attr) for _, attr, _ in self.fields)
+
+        name = model_class.__name__.lower()
+        # Loaded values are read straight from the instance __dict__ (what the
+        # instrumented attributes return anyway); if any is missing (expired,
+        # deferred, never set) the attribute path loads or defaults it
+        self._from_attributes = _compile(f"serialize_{name}_attrs", [f"def serialize_{name}_attrs(obj):", "    return {"] + [
+            f"        {key!r}: {_CONVERTERS[kind].format(self._access(attr))},"
+            for key, attr, kind in self.fields
+        ] + ["    }"])
+        self._from_object = _compile(f"serialize_{name}", [
+            f"def serialize_{name}(obj):",
+            "    d = obj.__dict__",
+            "    try:",
+            "        return {",
+        ] + [
+            f"            {key!r}: {_CONVERTERS[kind].format(f'd[{attr!r}]')},"
+            for key, attr, kind in self.fields
+        ] + [
+            "        }",
+            "    except KeyError:",
+            "        return _from_attributes(obj)",
+        ], _from_attributes=self._from_attributes)
+        self._from_row = _compile(f"serialize_{name}_row", [f"def serialize_{name}_row(row):", "    return {"] + [
+            f"        {key!r}: {_CONVERTERS[kind].format(f'row[{i}]')},"
+            for i, (key, _, kind) in enumerate(self.fields)
+        ] + ["    }"])
+
+    @staticmethod
+    def _access(attr: str) -> str:
+        if attr.isidentifier() and not keyword.iskeyword(attr):
+            return f"obj.{attr}"
+        return f"getattr(obj, {attr!r})"
+
+    def __call__(self, obj) -> Dict[str, Any]:
+        return self._from_object(obj)
+
+    def many(self, objs: Iterable) -> List[Dict[str, Any]]:
+        return list(map(self._from_object, objs))
+
+    def from_row(self, row: Sequence[Any]) -> Dict[str, Any]:
+        """Serialize a row selected with select(*serializer.select_columns)."""
+        return self._from_row(row)
+
+    def __repr__(self):
+        return f"<ModelSerializer {self.model_class.__name__} {len(self.fields)} fields>"
+
+
+_registry: Dict[Tuple[type, frozenset], ModelSerializer] = {}
+
+
+def serializer_for(model_class, exclude: Iterable[str] = ()) -> ModelSerializer:
+    """Shared serializer of all columns of a model, minus `exclude`."""
+    key = (model_class, frozenset(exclude))
+    serializer = _registry.get(key)
+    if serializer is None:
+        serializer = _registry[key] = ModelSerializer(model_class, exclude=key[1])
+    return serializer
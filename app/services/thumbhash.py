@@ -0,0 +1,94 @@
+"""
+ThumbHash encoder (https://evanw.github.io/thumbhash/).
+
+A ThumbHash is a ~25 byte DCT of a small image: average color, luminance
+up to 7x7 frequencies and 3x3 chroma, plus the aspect ratio. Base64 of it
+is ~33 characters versus 200-400 of a tiny WebP data URI; the browser
+decodes it to a 32px image (static/js/progressive-image.js).
+
+Pure Python and fed a downscaled image (at most 32px, THUMBHASH_SIDE);
+the DCT is separable, about a millisecond at that size. Dish images are
+flattened to RGB on upload, so the alpha channel of the format is not used.
+"""
+import base64
+from math import cos, floor, pi
+from typing import List, Sequence, Tuple
+
+# Side the image is downscaled to before encoding (the format allows up to 100)
+THUMBHASH_SIDE = 32
+
+
+def _round(value: float) -> int:
+    """Math.round of the reference implementation (half up)."""
+    return int(floor(value + 0.5))
+
+
+def _encode_channel(channel: Sequence[float], w: int, h: int, nx: int, ny: int) -> Tuple[float, List[float], float]:
+    """DCT of a channel: DC term, AC terms normalized to 0..1, AC scale."""
+    rows = [channel[y * w:(y + 1) * w] for y in range(h)]
+    # Separable DCT: rows projected on each horizontal frequency once
+    projections = []
+    for cx in range(nx):
+        fx = [cos(pi / w * cx * (x + 0.5)) for x in range(w)]
+        projections.append([sum(value * factor for value, factor in zip(row, fx)) for row in rows])
+
+    dc, ac, scale = 0.0, [], 0.0
+    for cy in range(ny):
+        fy = [cos(pi / h * cy * (y + 0.5)) for y in range(h)]
+        cx = 0
+        while cx * ny < nx * (ny - cy):
+            f = sum(value * factor for value, factor in zip(projections[cx], fy)) / (w * h)
+            if cx or cy:
+                ac.append(f)
+                scale = max(scale, abs(f))
+            else:
+                dc = f
+            cx += 1
+    if scale:
+        ac = [0.5 + 0.5 / scale * f for f in ac]
+    return dc, ac, scale
+
+
+def rgb_to_thumbhash(w: int, h: int, rgb: bytes) -> bytes:
+    """
+    ThumbHash of an RGB image (w*h*3 bytes, w and h at most 100).
+
+    Raises:
+        ValueError: Image larger than 100x100
+    """
+    if w > 100 or h > 100:
+        raise ValueError(f"ThumbHash input must be at most 100x100, got {w}x{h}")
+
+    # Luminance, yellow-blue and red-green channels
+    count = w * h
+    l, p, q = [0.0] * count, [0.0] * count, [0.0] * count
+    for i in range(count):
+        r, g, b = rgb[i * 3] / 255, rgb[i * 3 + 1] / 255, rgb[i * 3 + 2] / 255
+        l[i] = (r + g + b) / 3
+        p[i] = (r + g) / 2 - b
+        q[i] = r - g
+
+    lx = max(1, _round(7 * w / max(w, h)))
+    ly = max(1, _round(7 * h / max(w, h)))
+    l_dc, l_ac, l_scale = _encode_channel(l, w, h, max(3, lx), max(3, ly))
+    p_dc, p_ac, p_scale = _encode_channel(p, w, h, 3, 3)
+    q_dc, q_ac, q_scale = _encode_channel(q, w, h, 3, 3)
+
+    is_landscape = w > h
+    header24 = (_round(63 * l_dc) | (_round(31.5 + 31.5 * p_dc) << 6)
+                | (_round(31.5 + 31.5 * q_dc) << 12) | (_round(31 * l_scale) << 18))
+    header16 = ((ly if is_landscape else lx) | (_round(63 * p_scale) << 3)
+                | (_round(63 * q_scale) << 9) | (int(is_landscape) << 15))
+    hash_bytes = [header24 & 255, (header24 >> 8) & 255, header24 >> 16, header16 & 255, header16 >> 8]
+
+    # AC terms, 4 bits each
+    factors = l_ac + p_ac + q_ac
+    hash_bytes.extend([0] * ((len(factors) + 1) // 2))
+    for index, f in enumerate(factors):
+        hash_bytes[5 + (index >> 1)] |= _round(15 * f) << ((index & 1) << 2)
+    return bytes(hash_bytes)
+
+
+def encode_thumbhash(w: int, h: int, rgb: bytes) -> str:
+    """ThumbHash as base64 (without padding), as stored on the dish."""
+    return base64.b64encode(rgb_to_thumbhash(w, h, rgb)).decode('ascii').rstrip('=')
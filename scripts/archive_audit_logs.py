@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Архивация старых записей журнала аудита.
+Записи старше срока хранения (AUDIT_RETENTION_DAYS, по умолчанию 90 дней)
+переносятся в сжатые gzip JSONL-файлы по дням (AUDIT_ARCHIVE_DIR)
+и удаляются из таблицы audit_logs. Архив доступен в разделе
+"История изменений" (источник "Архив").
+
+Использование:
+    python scripts/archive_audit_logs.py              # архивировать
+    python scripts/archive_audit_logs.py --days 30    # свой срок хранения
+    python scripts/archive_audit_logs.py --dry-run    # только посчитать
+
+Запуск по расписанию (cron, раз в сутки):
+    15 3 * * * cd /app && python scripts/archive_audit_logs.py
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import get_settings
+from app.database import async_session
+from app.services.audit import AuditArchiver, audit_archive
+
+
+async def archive(days: int, dry_run: bool) -> None:
+    async with async_session() as session:
+        archiver = AuditArchiver(session, audit_archive)
+        cutoff = archiver.cutoff(days)
+
+        if dry_run:
+            count = await archiver.count_expired(days)
+            print(f"Записей старше {cutoff:%Y-%m-%d}: {count}")
+            return
+
+        print(f"Архивация записей старше {cutoff:%Y-%m-%d} в {audit_archive.directory}...")
+        result = await archiver.run(days)
+
+    print(f"✅ Перенесено записей: {result['archived']}, файлов по дням: {result['days']}")
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Архивация журнала аудита")
+    parser.add_argument("--days", type=int, default=settings.audit_retention_days,
+                        help="срок хранения в таблице, дней")
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать записи")
+    args = parser.parse_args()
+    asyncio.run(archive(args.days, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Пересчёт дневной статистики журнала аудита (audit_daily_stats).
+Создаёт таблицу, если её нет, и заново считает количество действий
+по дням, администраторам, типам действий и сущностей.
+Дальше статистика обновляется автоматически при записи журнала.
+Дни, уже перенесённые в архив, без --with-archive не пересчитываются
+и сохраняют свою статистику.
+
+Использование:
+    python scripts/backfill_audit_rollups.py                 # по таблице audit_logs
+    python scripts/backfill_audit_rollups.py --with-archive  # плюс архивные дни
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import async_session, init_db
+from app.services.audit import AuditRollups, audit_archive
+
+
+async def backfill(with_archive: bool) -> None:
+    print("Пересчёт дневной статистики журнала аудита...")
+
+    # Создаёт audit_daily_stats, если её нет
+    await init_db()
+
+    async with async_session() as session:
+        rows = await AuditRollups(session).rebuild(audit_archive if with_archive else None)
+        await session.commit()
+
+    print(f"✅ Готово: строк статистики {rows}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пересчёт дневной статистики аудита")
+    parser.add_argument("--with-archive", action="store_true",
+                        help="учесть архивные записи (AUDIT_ARCHIVE_DIR)")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.with_archive))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Заполнение истории цен и доступности блюд (dish_field_changes)
+по существующим записям журнала аудита.
+Создаёт таблицу, если её нет. Повторный запуск безопасен:
+уже учтённые события пропускаются.
+Новые изменения попадают в историю автоматически при записи журнала.
+
+Использование:
+    python scripts/backfill_dish_history.py                 # по таблице audit_logs
+    python scripts/backfill_dish_history.py --with-archive  # плюс архивные дни
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+from app.database import async_session, init_db
+from app.models import AuditLog
+from app.services.audit import audit_archive
+from app.services.audit.dish_history import apply_changes, extract_changes, BULK_AVAILABILITY
+
+BATCH_SIZE = 1000
+ACTIONS = ['create', 'update', *BULK_AVAILABILITY]
+COLUMNS = ['id', 'created_at', 'admin_user_id', 'action', 'entity_type', 'entity_id', 'new_data']
+
+
+async def backfill(with_archive: bool) -> None:
+    print("Заполнение истории цен и доступности блюд...")
+
+    # Создаёт dish_field_changes, если её нет
+    await init_db()
+
+    total = 0
+    async with async_session() as session:
+        if with_archive:
+            for day in audit_archive.days():
+                rows = [row for record in audit_archive.read_day(day) for row in extract_changes(record)]
+                await apply_changes(session, rows)
+                await session.commit()
+                total += len(rows)
+            print(f"  ✅ Архив: изменений {total}")
+
+        last_id = 0
+        while True:
+            result = await session.execute(
+                select(*[getattr(AuditLog, column) for column in COLUMNS])
+                .where(AuditLog.id > last_id)
+                .where(AuditLog.entity_type == 'dish', AuditLog.action.in_(ACTIONS))
+                .order_by(AuditLog.id)
+                .limit(BATCH_SIZE)
+            )
+            events = [dict(zip(COLUMNS, row)) for row in result.all()]
+            if not events:
+                break
+            last_id = events[-1]['id']
+
+            rows = [row for event in events for row in extract_changes(event)]
+            await apply_changes(session, rows)
+            await session.commit()
+            total += len(rows)
+
+    print(f"✅ Готово: обработано изменений {total}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="История цен и доступности блюд")
+    parser.add_argument("--with-archive", action="store_true",
+                        help="учесть архивные записи (AUDIT_ARCHIVE_DIR)")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.with_archive))
+
+
+if __name__ == "__main__":
+    main()
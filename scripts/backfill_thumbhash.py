@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Заполнение ThumbHash-плейсхолдеров (dishes.image_thumbhash) существующих блюд.
+Добавляет колонку и считает хеш по уже созданному thumbnail - без
+перекодирования. Новые загрузки получают его автоматически.
+
+Использование:
+    python scripts/backfill_thumbhash.py           # только блюда без хеша
+    python scripts/backfill_thumbhash.py --force   # пересчитать все
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image
+from sqlalchemy import select, text
+from app.database import async_session, init_db
+from app.models import Dish, ImageBlob
+from app.services.image_processor import ImageProcessor
+
+
+def thumbhash_of(url: str | None) -> str | None:
+    """ThumbHash по файлу размера (URL вида /static/...); None, если файла нет."""
+    if not url or not Path(url.lstrip("/")).exists():
+        return None
+    with Image.open(url.lstrip("/")) as img:
+        return ImageProcessor.generate_thumbhash(img)
+
+
+async def backfill(force: bool):
+    print("ThumbHash-плейсхолдеры изображений блюд...")
+
+    await init_db()
+
+    async with async_session() as session:
+        try:
+            await session.execute(text("ALTER TABLE dishes ADD COLUMN image_thumbhash VARCHAR(64)"))
+            await session.commit()
+            print("  ✅ Добавлена колонка: image_thumbhash")
+        except Exception as e:
+            if "duplicate column" in str(e).lower():
+                print("  ⏭️  Колонка уже существует: image_thumbhash")
+            else:
+                print(f"  ❌ Ошибка для image_thumbhash: {e}")
+            await session.rollback()
+
+        updated = 0
+        # Общие размеры (хранилище по хешу): хеш в blob и во всех его блюдах
+        blobs = (await session.execute(select(ImageBlob).where(ImageBlob.status == "ready"))).scalars().all()
+        for blob in blobs:
+            if (blob.renditions or {}).get("thumbhash") and not force:
+                continue
+            thumbhash = thumbhash_of(blob.renditions.get("thumbnail"))
+            if thumbhash is None:
+                print(f"  ⏭️  {blob.sha256[:12]}: нет thumbnail")
+                continue
+            # Новый dict: изменение JSON внутри объекта SQLAlchemy не отслеживает
+            blob.renditions = {**blob.renditions, "thumbhash": thumbhash}
+            dishes = await session.execute(select(Dish).where(Dish.image_hash == blob.sha256))
+            for dish in dishes.scalars().all():
+                dish.image_thumbhash = thumbhash
+                updated += 1
+
+        # Изображения вне хранилища
+        query = select(Dish).where(Dish.image_hash.is_(None), Dish.image_thumbnail.is_not(None))
+        if not force:
+            query = query.where(Dish.image_thumbhash.is_(None))
+        for dish in (await session.execute(query)).scalars().all():
+            thumbhash = thumbhash_of(dish.image_thumbnail)
+            if thumbhash is None:
+                print(f"  ⏭️  [{dish.id}] {dish.name}: нет thumbnail")
+                continue
+            dish.image_thumbhash = thumbhash
+            updated += 1
+
+        await session.commit()
+        print(f"  ✅ Обновлено блюд: {updated}")
+
+    print("\n✅ Готово! Режим плейсхолдеров: IMAGE_PLACEHOLDER=thumbhash")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заполнение ThumbHash-плейсхолдеров")
+    parser.add_argument("--force", action="store_true", help="пересчитать хеш всех блюд")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.force))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк извлечения цвета изображения.
+Сравнивает прежний средний цвет (getdata() и цикл по 2500 пикселям в
+Python) с текущими: средний цвет через BOX-масштабирование до 1x1 и палитру
+k-means (quantize) по размеру tiny, как в ImageProcessor при загрузке.
+Всё считается в C; время - на одно изображение, в микросекундах.
+
+Использование:
+    python scripts/benchmark_dominant_color.py [--source photo.jpg ...] [--number 500]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image
+
+from app.services.image_processor import ImageProcessor
+
+
+def legacy_dominant_color(img: Image.Image) -> str:
+    """Прежняя реализация (для сравнения)."""
+    small = img.copy()
+    small.thumbnail((50, 50), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    count = len(pixels)
+    r = sum(pixel[0] for pixel in pixels) // count
+    g = sum(pixel[1] for pixel in pixels) // count
+    b = sum(pixel[2] for pixel in pixels) // count
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def sources(paths: list[str]) -> list[tuple[str, bytes]]:
+    if paths:
+        return [(Path(path).name, Path(path).read_bytes()) for path in paths]
+    from benchmark_image_encoding import synthetic_photo
+    return [("синтетическое 1200x800", synthetic_photo(1200, 800))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк доминантного цвета и палитры")
+    parser.add_argument("--source", nargs="*", default=[], help="изображения (по умолчанию синтетическое фото)")
+    parser.add_argument("--number", type=int, default=500, help="повторов на замер")
+    args = parser.parse_args()
+
+    for name, content in sources(args.source):
+        img = ImageProcessor._prepare_image(content)
+        resized = ImageProcessor._cascade(img)
+        thumbnail, tiny = resized["thumbnail"], resized["tiny"]
+
+        cases = [
+            ("прежний средний (thumbnail)", lambda: legacy_dominant_color(thumbnail)),
+            ("средний BOX (thumbnail)", lambda: ImageProcessor.extract_dominant_color(thumbnail)),
+            ("палитра k-means (tiny)", lambda: ImageProcessor.extract_palette(tiny)),
+        ]
+        print(f"{name}: thumbnail {thumbnail.size[0]}x{thumbnail.size[1]}, tiny {tiny.size[0]}x{tiny.size[1]}")
+        baseline = None
+        for label, func in cases:
+            per_image = min(timeit.repeat(func, number=args.number, repeat=3)) / args.number * 1e6
+            baseline = baseline or per_image
+            print(f"  {label:<30} {per_image:>8.0f} мкс  {baseline / per_image:>5.1f}x  {func()}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк обработки одной загрузки (ImageProcessor.process_and_save).
+Измеряет время на фото 24 Мп (6000x4000) при разном числе потоков
+кодирования: 1 - прежняя последовательная обработка, далее - параллельная
+(IMAGE_ENCODE_THREADS). Проверяет, что набор файлов и ключей результата
+одинаков при любом числе потоков.
+
+Ускорение ограничено числом ядер: на одном ядре потоки ничего не дают.
+
+Использование:
+    python scripts/benchmark_image_encoding.py [--source photo.jpg] [--threads 1,2,4] [--runs 1]
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Результаты пишутся во временную папку, не в static/uploads
+_tmp = tempfile.TemporaryDirectory(prefix="bench_images_")
+os.environ["UPLOAD_DIR"] = _tmp.name
+os.environ["DEBUG"] = "false"
+
+from PIL import Image, ImageFilter
+
+from app.services.image_processor import ImageProcessor, AVIF_SUPPORTED
+
+
+def synthetic_photo(width: int = 6000, height: int = 4000) -> bytes:
+    """JPEG, похожий на фото с телефона: плавные градиенты, детали и шум сенсора."""
+    base = Image.merge('RGB', (
+        Image.linear_gradient('L').resize((width, height)),
+        Image.radial_gradient('L').resize((width, height)),
+        Image.linear_gradient('L').rotate(90).resize((width, height)),
+    ))
+    detail = Image.effect_noise((width // 8, height // 8), 80).resize((width, height), Image.Resampling.BICUBIC)
+    img = Image.blend(base, Image.merge('RGB', (detail, detail, detail)), 0.35)
+    grain = Image.effect_noise((width, height), 12).filter(ImageFilter.GaussianBlur(0.6))
+    img = Image.blend(img, Image.merge('RGB', (grain, grain, grain)), 0.08)
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=92)
+    return buffer.getvalue()
+
+
+def run(content: bytes, threads: int, runs: int) -> tuple[float, dict, list]:
+    best = None
+    for i in range(runs):
+        dish_id = threads * 100 + i
+        start = time.perf_counter()
+        paths = ImageProcessor.process_and_save(content, dish_id, "photo.jpg", version="bench", threads=threads)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    files = sorted(os.listdir(Path(_tmp.name) / str(dish_id)))
+    return best, paths, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк параллельного кодирования изображений")
+    parser.add_argument("--source", help="JPEG для теста (по умолчанию синтетическое фото 24 Мп)")
+    parser.add_argument("--threads", default=f"1,2,4,{os.cpu_count() or 1}",
+                        help="список значений числа потоков")
+    parser.add_argument("--runs", type=int, default=1, help="повторов на значение (берётся лучший)")
+    args = parser.parse_args()
+
+    if args.source:
+        content = Path(args.source).read_bytes()
+    else:
+        print("🔄 Генерация синтетического фото 6000x4000...")
+        content = synthetic_photo()
+    with Image.open(io.BytesIO(content)) as img:
+        size = img.size
+
+    threads_list = sorted({max(1, int(value)) for value in args.threads.split(",")})
+    print(f"Фото: {size[0]}x{size[1]} ({size[0] * size[1] / 1e6:.1f} Мп), "
+          f"{len(content) / 1024 / 1024:.1f} МБ; ядер: {os.cpu_count()}; AVIF: {'да' if AVIF_SUPPORTED else 'нет'}")
+    print(f"Файлов на загрузку: {len(ImageProcessor.rendition_plan('bench'))} + tiny base64\n")
+
+    print(f"{'Потоков':>8}  {'Время, с':>9}  {'Ускорение':>9}")
+    baseline = reference = None
+    same = True
+    for threads in threads_list:
+        elapsed, paths, files = run(content, threads, args.runs)
+        if baseline is None:
+            baseline, reference = elapsed, (list(paths), files)
+        print(f"{threads:>8}  {elapsed:>9.2f}  {baseline / elapsed:>8.2f}x")
+        if (list(paths), files) != reference:
+            print(f"  ❌ Результат при {threads} потоках отличается: {list(paths)} {files}")
+            same = False
+
+    if same:
+        print("\n✅ Набор файлов и порядок ключей одинаковы")
+    _tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
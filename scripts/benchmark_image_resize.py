@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк и проверка качества масштабирования загрузок.
+Сравнивает прежнюю схему (каждый размер, tiny и dominant color - из копии
+полного оригинала через thumbnail) с текущей: JPEG декодируется сразу
+уменьшенным (draft), размеры получаются каскадом. Кодирование в WebP/AVIF
+не входит в замер - оно одинаково в обеих схемах.
+
+Выводит время, пиковую память процесса и SSIM каждого размера относительно
+прежней схемы (по яркости, блоками 8x8). Код выхода 1, если SSIM какого-либо
+размера ниже --min-ssim.
+
+Использование:
+    python scripts/benchmark_image_resize.py [--source photo.jpg] [--runs 3] [--min-ssim 0.97]
+"""
+import argparse
+import io
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image, ImageMath
+
+from app.services.image_processor import ImageProcessor
+
+LARGEST = max(ImageProcessor.SIZES.values(), key=lambda dimensions: dimensions[0])
+
+
+def legacy_resize(content: bytes) -> dict:
+    """Прежняя схема: copy() + thumbnail(LANCZOS) полного оригинала на каждый размер."""
+    img = ImageProcessor._prepare_image(content)
+    resized = {}
+    for size_name, dimensions in ImageProcessor.SIZES.items():
+        img_copy = img.copy()
+        img_copy.thumbnail(dimensions, Image.Resampling.LANCZOS)
+        resized[size_name] = img_copy
+    ImageProcessor.generate_tiny_base64(img)
+    ImageProcessor.extract_dominant_color(img)
+    return resized
+
+
+def cascade_resize(content: bytes) -> dict:
+    """Текущая схема (как в process_and_save)."""
+    img = ImageProcessor._prepare_image(content, fit=LARGEST)
+    resized = ImageProcessor._cascade(img)
+    ImageProcessor.generate_tiny_base64(resized["tiny"])
+    ImageProcessor.extract_palette(resized["tiny"])
+    return resized
+
+
+VARIANTS = {"прежняя": legacy_resize, "каскад + draft": cascade_resize}
+
+
+def _peak_rss_kb() -> int:
+    """Пиковый RSS процесса, КБ (VmHWM; ru_maxrss наследуется от родителя через exec)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def peak_memory(variant: str, content: bytes) -> float:
+    """Прирост пиковой памяти (МБ) на одну обработку; выполняется в отдельном процессе."""
+    before = _peak_rss_kb()
+    VARIANTS[variant](content)
+    return (_peak_rss_kb() - before) / 1024
+
+
+def ssim(a: Image.Image, b: Image.Image) -> float:
+    """SSIM по яркости на неперекрывающихся блоках (без numpy)."""
+    if a.size != b.size:
+        b = b.resize(a.size, Image.Resampling.LANCZOS)
+    block = 8 if min(a.size) >= 64 else 2
+    x = a.convert('L').convert('F')
+    y = b.convert('L').convert('F')
+
+    def mean(expression, **images):
+        return ImageMath.lambda_eval(expression, **images).reduce(block)
+
+    mx, my = x.reduce(block), y.reduce(block)
+    xx = mean(lambda v: v['x'] * v['x'], x=x)
+    yy = mean(lambda v: v['y'] * v['y'], y=y)
+    xy = mean(lambda v: v['x'] * v['y'], x=x, y=y)
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    index = ImageMath.lambda_eval(
+        lambda v: ((v['mx'] * v['my'] * 2 + c1) * ((v['xy'] - v['mx'] * v['my']) * 2 + c2))
+        / ((v['mx'] * v['mx'] + v['my'] * v['my'] + c1)
+           * (v['xx'] - v['mx'] * v['mx'] + v['yy'] - v['my'] * v['my'] + c2)),
+        mx=mx, my=my, xx=xx, yy=yy, xy=xy
+    )
+    values = index.getdata()
+    return sum(values) / len(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк каскадного масштабирования")
+    parser.add_argument("--source", help="JPEG для теста (по умолчанию синтетическое фото 24 Мп)")
+    parser.add_argument("--runs", type=int, default=3, help="повторов (берётся лучшее время)")
+    parser.add_argument("--min-ssim", type=float, default=0.97, help="минимально допустимый SSIM")
+    args = parser.parse_args()
+
+    if args.source:
+        content = Path(args.source).read_bytes()
+    else:
+        from benchmark_image_encoding import synthetic_photo
+        print("🔄 Генерация синтетического фото 6000x4000...")
+        content = synthetic_photo()
+    with Image.open(io.BytesIO(content)) as img:
+        print(f"Фото: {img.size[0]}x{img.size[1]} ({img.size[0] * img.size[1] / 1e6:.1f} Мп), "
+              f"{len(content) / 1024 / 1024:.1f} МБ\n")
+
+    print(f"{'Схема':<16} {'Время, с':>9} {'Пик памяти, МБ':>15}")
+    results = {}
+    for variant, func in VARIANTS.items():
+        best = None
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            results[variant] = func(content)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        # Пиковая память - в свежем процессе, чтобы замеры не влияли друг на друга
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            memory = executor.submit(peak_memory, variant, content).result()
+        print(f"{variant:<16} {best:>9.2f} {memory:>15.0f}")
+
+    legacy, cascade = results["прежняя"], results["каскад + draft"]
+    print(f"\n{'Размер':<10} {'Прежний':>11} {'Каскад':>11} {'SSIM':>7}")
+    failed = False
+    for size_name in ImageProcessor.SIZES:
+        value = ssim(legacy[size_name], cascade[size_name])
+        ok = value >= args.min_ssim
+        failed = failed or not ok
+        print(f"{size_name:<10} {'x'.join(map(str, legacy[size_name].size)):>11} "
+              f"{'x'.join(map(str, cascade[size_name].size)):>11} {value:>7.4f} {'✅' if ok else '❌'}")
+
+    if failed:
+        print(f"\n❌ SSIM ниже {args.min_ssim}")
+        sys.exit(1)
+    print(f"\n✅ Все размеры не хуже SSIM {args.min_ssim}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк восстановления меню на момент времени.
+Создаёт временную БД с синтетическим меню и историей изменений цен и
+сравнивает восстановление от ближайшего снимка (снимки каждые --every
+событий) с полным проигрыванием журнала с начала.
+
+Использование:
+    python scripts/benchmark_menu_time_travel.py [--dishes 300] [--events 1000,10000,50000] [--every 2000]
+"""
+import argparse
+import asyncio
+import copy
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+_tmp = tempfile.mkdtemp(prefix="menu-time-travel-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+os.environ["AUDIT_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/audit.db"
+os.environ["AUDIT_ARCHIVE_DIR"] = f"{_tmp}/archive"
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import insert, delete
+
+from app.database import async_session, init_db, engine, audit_engine
+from app.models import AuditLog, MenuSnapshot
+from app.services.menu_history import MenuHistory, apply_event, empty_state
+
+
+class NoSnapshots:
+    """Хранилище без снимков: восстановление всегда с начала журнала."""
+
+    async def nearest(self, at):
+        return None
+
+
+def build_history(rnd, dishes: int, events: int, every: int, start: datetime):
+    """События создания меню, изменения цен и снимки каждые `every` событий."""
+    categories = max(1, dishes // 20)
+    log, snapshots = [], []
+    state = empty_state()
+    moment = start
+
+    def add(event):
+        nonlocal moment
+        moment += timedelta(seconds=30)
+        event.update({'id': len(log) + 1, 'created_at': moment})
+        log.append(event)
+        apply_event(state, event)
+        if event['id'] % every == 0:
+            snapshots.append({
+                'taken_at': moment + timedelta(seconds=1),
+                'last_audit_log_id': event['id'],
+                'categories_count': len(state['categories']),
+                'dishes_count': len(state['dishes']),
+                'data': copy.deepcopy(state),
+            })
+
+    for cat_id in range(1, categories + 1):
+        add({'action': 'create', 'entity_type': 'category', 'entity_id': cat_id,
+             'new_data': {'id': cat_id, 'name': f"Категория {cat_id}", 'sort_order': cat_id,
+                          'is_active': True}})
+    prices = {}
+    for dish_id in range(1, dishes + 1):
+        prices[dish_id] = float(rnd.randint(100, 900))
+        add({'action': 'create', 'entity_type': 'dish', 'entity_id': dish_id,
+             'new_data': {'id': dish_id, 'name': f"Блюдо {dish_id}", 'price': prices[dish_id],
+                          'category_id': rnd.randint(1, categories), 'sort_order': dish_id,
+                          'is_available': True, 'description': "Описание " * 10}})
+    while len(log) < events:
+        dish_id = rnd.randint(1, dishes)
+        new_price = float(rnd.randint(100, 900))
+        add({'action': 'update', 'entity_type': 'dish', 'entity_id': dish_id,
+             'new_data': {'price': {'old': prices[dish_id], 'new': new_price}}})
+        prices[dish_id] = new_price
+    return log, snapshots
+
+
+async def measure(history: MenuHistory, at: datetime, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await history.as_of(at)
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+async def run(args):
+    await init_db()
+    rnd = random.Random(42)
+    start = datetime(2024, 1, 1)
+
+    print(f"Блюд: {args.dishes}, снимок каждые {args.every} событий")
+    print(f"{'Событий':>8} {'С начала, мс':>14} {'От снимка, мс':>14} {'Проиграно':>10} {'Ускорение':>10}")
+
+    for events in args.events:
+        log, snapshots = build_history(rnd, args.dishes, events, args.every, start)
+        async with async_session() as session:
+            await session.execute(delete(AuditLog))
+            await session.execute(delete(MenuSnapshot))
+            for i in range(0, len(log), 5000):
+                await session.execute(insert(AuditLog), [
+                    {**event, 'entity_name': None} for event in log[i:i + 5000]
+                ])
+            if snapshots:
+                await session.execute(insert(MenuSnapshot), snapshots)
+            await session.commit()
+
+            at = log[-1]['created_at']
+            full = MenuHistory(session, store=NoSnapshots())
+            nearest = MenuHistory(session)
+            full_ms = await measure(full, at, args.repeat)
+            nearest_ms = await measure(nearest, at, args.repeat)
+            replayed = (await nearest.as_of(at))['events_replayed']
+
+        print(f"{events:>8} {full_ms:>14.1f} {nearest_ms:>14.1f} {replayed:>10} {full_ms / nearest_ms:>9.1f}x")
+
+    await engine.dispose()
+    await audit_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dishes", type=int, default=300)
+    parser.add_argument("--events", type=lambda s: [int(x) for x in s.split(",")],
+                        default=[1000, 10000, 50000])
+    parser.add_argument("--every", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
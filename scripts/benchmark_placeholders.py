@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Сравнение веса главной страницы с плейсхолдерами изображений в обоих режимах
+(IMAGE_PLACEHOLDER): "webp" - inline base64 WebP, "thumbhash" - ThumbHash.
+Страница рендерится по текущей БД; размер - без сжатия, gzip и brotli
+(если установлен), плюс пересчёт на заданное число блюд.
+
+Перед запуском заполните хеши: python scripts/backfill_thumbhash.py
+
+Использование:
+    python scripts/benchmark_placeholders.py [--dishes 150]
+"""
+import argparse
+import gzip
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ["DEBUG"] = "false"
+
+from fastapi.testclient import TestClient
+
+from app.api.menu import templates
+from app.main import app
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MODES = ("webp", "thumbhash")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Вес страницы с плейсхолдерами WebP и ThumbHash")
+    parser.add_argument("--dishes", type=int, default=150, help="число блюд для пересчёта")
+    args = parser.parse_args()
+
+    # Без lifespan: фоновые задачи приложения для рендера не нужны
+    client = TestClient(app)
+    pages = {}
+    for mode in MODES:
+        templates.env.globals["image_placeholder"] = mode
+        response = client.get("/", headers={"Accept-Encoding": "identity"})
+        response.raise_for_status()
+        pages[mode] = response.content
+
+    with_images = pages["webp"].count(b'class="blur-up"')
+    hashed = pages["thumbhash"].count(b"data-thumbhash=")
+    print(f"Блюд с изображениями на странице: {with_images}, с ThumbHash: {hashed}")
+    if not hashed:
+        print("❌ Нет блюд с ThumbHash: запустите scripts/backfill_thumbhash.py")
+        sys.exit(1)
+
+    header = f"{'Режим':<10} {'HTML, КБ':>9} {'gzip, КБ':>9}"
+    if brotli:
+        header += f" {'brotli, КБ':>11}"
+    print(header)
+    sizes = {}
+    for mode, page in pages.items():
+        sizes[mode] = len(page)
+        row = f"{mode:<10} {len(page) / 1024:>9.1f} {len(gzip.compress(page, 9)) / 1024:>9.1f}"
+        if brotli:
+            row += f" {len(brotli.compress(page, quality=4)) / 1024:>11.1f}"
+        print(row)
+
+    saved_per_dish = (sizes["webp"] - sizes["thumbhash"]) / hashed
+    print(f"\nЭкономия: {saved_per_dish:.0f} байт на блюдо, "
+          f"~{saved_per_dish * args.dishes / 1024:.0f} КБ HTML на {args.dishes} блюд (без сжатия)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк in-memory индекса поиска админки.
+Строит индекс на синтетических названиях и замеряет время запросов.
+
+Использование:
+    python scripts/benchmark_search_index.py [--items 30000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.search import SearchIndex
+
+
+WORDS = [
+    "шашлык", "свинина", "говядина", "курица", "утка", "салат", "цезарь", "борщ",
+    "солянка", "пельмени", "вареники", "блины", "сырники", "бриошь", "хот", "дог",
+    "паштет", "скумбрия", "сельдь", "пеламида", "соус", "базилик", "капуста", "огурец",
+    "картофель", "грибы", "сметана", "брынза", "перец", "лук", "клюква", "варенье",
+]
+
+QUERIES = [
+    "шаш",          # префикс
+    "ifiksr",       # "шашлык" в латинской раскладке
+    "shashlik",     # транслит
+    "cezar",        # транслит с ц
+    "салат цез",    # несколько слов
+    "солянко",      # опечатка
+    "ghfn",         # мусор в раскладке
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    index = SearchIndex()
+
+    started = time.perf_counter()
+    for cat_id in range(1, 51):
+        index.add('category', cat_id, f"{rnd.choice(WORDS).capitalize()} {cat_id}")
+    for dish_id in range(1, args.items + 1):
+        name = " ".join(rnd.sample(WORDS, rnd.randint(1, 4))).capitalize()
+        index.add('dish', dish_id, name, rnd.randint(1, 50))
+    build_ms = (time.perf_counter() - started) * 1000
+
+    print(f"Элементов: {len(index)}, построение: {build_ms:.0f} мс")
+    print(f"{'Запрос':<14} {'Найдено':>8} {'мкс/запрос':>12}")
+
+    for query in QUERIES:
+        found = index.search(query, 'dish', limit=10)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            index.search(query, 'dish', limit=10)
+        per_query_us = (time.perf_counter() - started) / args.repeat * 1_000_000
+        print(f"{query:<14} {len(found):>8} {per_query_us:>12.1f}")
+
+    started = time.perf_counter()
+    for dish_id in range(1, 1001):
+        index.add('dish', dish_id, "Шашлык из баранины", 1)
+    update_us = (time.perf_counter() - started) / 1000 * 1_000_000
+    print(f"Инкрементальное обновление: {update_us:.1f} мкс/блюдо")
+
+
+if __name__ == "__main__":
+    main()
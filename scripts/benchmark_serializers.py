@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сериализации моделей.
+Сравнивает прежний рефлексивный model_to_dict (обход __table__.columns с
+getattr и проверками типов на каждое значение) с предкомпилированными
+сериализаторами на синтетических блюдах и категориях, в строках в секунду.
+
+Использование:
+    python scripts/benchmark_serializers.py [--rows 20000]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models import Category, Dish, AuditLog
+from app.services.serializers import serializer_for
+
+
+def reflective_model_to_dict(model, exclude=None):
+    """Прежняя реализация model_to_dict (для сравнения)."""
+    exclude = exclude or []
+    exclude.extend(['password_hash', '_sa_instance_state'])
+    data = {}
+    for column in model.__table__.columns:
+        if column.name not in exclude:
+            value = getattr(model, column.name)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = float(value)
+            data[column.name] = value
+    return data
+
+
+def loaded(obj):
+    """Как строка, загруженная из БД: все колонки заданы (пустые - None)."""
+    for column in obj.__table__.columns:
+        if column.key not in obj.__dict__:
+            setattr(obj, column.key, None)
+    return obj
+
+
+def make_objects(rows: int):
+    now = datetime(2024, 5, 1, 12, 0)
+    dishes = [
+        loaded(Dish(
+            id=i, category_id=i % 20 + 1, name=f"Блюдо {i}", slug=f"dish-{i}",
+            description="Описание блюда " * 5, price=Decimal(f"{100 + i % 900}.50"),
+            weight="250 г", calories=300 + i % 200, is_available=i % 7 != 0, sort_order=i,
+            image_thumbnail=f"/static/uploads/dishes/{i}/thumbnail.webp",
+            image_small=f"/static/uploads/dishes/{i}/small.webp",
+            image_medium=f"/static/uploads/dishes/{i}/medium.webp",
+            image_large=f"/static/uploads/dishes/{i}/large.webp",
+            image_tiny_base64="data:image/webp;base64," + "A" * 200,
+            image_dominant_color="#aa8844",
+            created_at=now - timedelta(days=i % 365), updated_at=now,
+        ))
+        for i in range(1, rows + 1)
+    ]
+    categories = [
+        loaded(Category(id=i, name=f"Категория {i}", slug=f"cat-{i}", description="Описание",
+                 sort_order=i, is_active=True, dishes_total=10, dishes_available=8,
+                 created_at=now, updated_at=now))
+        for i in range(1, rows + 1)
+    ]
+    logs = [
+        loaded(AuditLog(id=i, admin_user_id=1, action="update", entity_type="dish", entity_id=i,
+                 entity_name=f"Блюдо {i}", new_data={"price": {"old": 100, "new": 110}},
+                 created_at=now))
+        for i in range(1, rows + 1)
+    ]
+    return {'Dish': dishes, 'Category': categories, 'AuditLog': logs}
+
+
+def rate(func, objects) -> float:
+    started = time.perf_counter()
+    for obj in objects:
+        func(obj)
+    return len(objects) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Модель':<10} {'Рефлексия, строк/с':>20} {'Сериализатор, строк/с':>23} {'Ускорение':>10}")
+    for name, objects in make_objects(args.rows).items():
+        serializer = serializer_for(type(objects[0]))
+        assert all(serializer(obj) == reflective_model_to_dict(obj) for obj in objects[:100])
+
+        reflective = max(rate(reflective_model_to_dict, objects) for _ in range(args.repeat))
+        compiled = max(rate(serializer, objects) for _ in range(args.repeat))
+        print(f"{name:<10} {reflective:>20,.0f} {compiled:>23,.0f} {compiled / reflective:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Проверка согласованности счётчиков блюд в категориях.
+Сравнивает dishes_total/dishes_available с фактическим числом блюд.
+
+Использование:
+    python scripts/check_category_counters.py           # только проверка
+    python scripts/check_category_counters.py --repair  # проверка и исправление
+
+Код возврата 1, если найдены расхождения и --repair не указан.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import async_session
+from app.services.category_counters import CategoryCounters
+
+
+async def check(repair: bool) -> int:
+    async with async_session() as session:
+        counters = CategoryCounters(session)
+        mismatches = await counters.repair() if repair else await counters.check()
+
+        if not mismatches:
+            print("✅ Счётчики согласованы")
+            return 0
+
+        for m in mismatches:
+            print(
+                f"  {'🔧' if repair else '❌'} [{m['category_id']}] {m['name']}: "
+                f"хранится {m['stored'][0]}/{m['stored'][1]}, "
+                f"фактически {m['actual'][0]}/{m['actual'][1]} (всего/в наличии)"
+            )
+
+        if repair:
+            await session.commit()
+            print(f"\n✅ Исправлено категорий: {len(mismatches)}")
+            return 0
+
+        print(f"\n❌ Расхождений: {len(mismatches)}. Запустите с --repair для исправления.")
+        return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка счётчиков блюд в категориях")
+    parser.add_argument("--repair", action="store_true", help="исправить расхождения")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(check(args.repair)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Проверка согласованности хранилища изображений по хешу.
+Сравнивает image_blobs.ref_count с числом блюд, ссылающихся на хеш.
+
+Использование:
+    python scripts/check_image_store.py           # только проверка
+    python scripts/check_image_store.py --repair  # проверка и исправление
+
+Код возврата 1, если найдены расхождения и --repair не указан.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import async_session
+from app.services.image_store import ImageStore
+
+
+async def check(repair: bool) -> int:
+    async with async_session() as session:
+        store = ImageStore(session)
+        mismatches = await store.repair() if repair else await store.check()
+
+        if not mismatches:
+            print("✅ Счётчики ссылок согласованы")
+            return 0
+
+        for m in mismatches:
+            stored = "нет записи" if m['stored'] is None else m['stored']
+            print(f"  {'🔧' if repair else '❌'} {m['sha256'][:12]}: хранится {stored}, фактически {m['actual']}")
+
+        if repair:
+            await session.commit()
+            print(f"\n✅ Исправлено: {len(mismatches)}")
+            return 0
+
+        print(f"\n❌ Расхождений: {len(mismatches)}. Запустите с --repair для исправления.")
+        return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка хранилища изображений")
+    parser.add_argument("--repair", action="store_true", help="исправить расхождения")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(check(args.repair)))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.database import async_session, init_db
 from app.models import AdminUser
 from app.services.auth import get_password_hash
+from app.services.dashboard_stats import DashboardStatsService
 from sqlalchemy import select
 
 
@@ -50,6 +51,7 @@ async def create_admin():
             password_hash=get_password_hash(password)
         )
         session.add(admin)
+        await DashboardStatsService(session).admins_changed()
         await session.commit()
 
         print(f"\n✅ Администратор '{username}' создан!")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Отдельный обработчик очереди изображений (image_jobs).
+
+Приложение само обрабатывает очередь в фоне; этот скрипт нужен, чтобы
+вынести обработку на другой процесс или сервер с общей БД и папками
+uploads / image_originals, либо разобрать очередь без запуска приложения.
+Несколько обработчиков могут работать одновременно: задание забирает
+только один из них.
+
+Использование:
+    python scripts/image_worker.py           # работать до Ctrl+C
+    python scripts/image_worker.py --drain   # обработать очередь и выйти
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, func
+from app.database import async_session, init_db
+from app.models import ImageJob
+from app.services.audit import audit_writer
+from app.services.image_jobs import ImageJobRunner, ACTIVE_STATUSES
+from app.services.image_pool import image_pool
+from app.config import get_settings
+
+
+async def count_active() -> int:
+    async with async_session() as session:
+        result = await session.execute(
+            select(func.count(ImageJob.id)).where(ImageJob.status.in_(ACTIVE_STATUSES))
+        )
+        return result.scalar() or 0
+
+
+async def run(drain: bool) -> None:
+    settings = get_settings()
+    await init_db()
+    await audit_writer.start()
+    runner = ImageJobRunner(
+        pool=image_pool,
+        concurrency=settings.image_job_concurrency,
+        poll_interval=settings.image_job_poll_interval
+    )
+    print(f"🔄 Обработка очереди изображений (одновременно {runner.concurrency})")
+    try:
+        if drain:
+            while await count_active():
+                await runner.run_once()
+                await asyncio.sleep(runner.poll_interval)
+        else:
+            await runner.start()
+            await asyncio.Event().wait()
+    finally:
+        await runner.stop()
+        await image_pool.stop()
+        await audit_writer.stop()
+
+    print(f"✅ Готово: обработано {image_pool.completed}, ошибок {image_pool.failed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Обработчик очереди изображений")
+    parser.add_argument("--drain", action="store_true", help="обработать очередь и выйти")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.drain))
+    except KeyboardInterrupt:
+        print("\n⏹️  Остановлено")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,9 @@ from sqlalchemy import select, delete
 from app.database import async_session, init_db
 from app.models.category import Category
 from app.models.dish import Dish
+from app.services.category_counters import CategoryCounters
+from app.services.dashboard_stats import DashboardStatsService
+from app.services.menu_history import MenuHistory
 
 
 def slugify(text):
@@ -205,6 +208,15 @@ async def import_menu():
 
         await session.commit()
 
+        # Пересчитываем счётчики блюд в категориях и статистику главной
+        await CategoryCounters(session).repair()
+        await DashboardStatsService(session).recompute()
+        await session.commit()
+
+        # Импорт не попадает в журнал аудита: фиксируем снимок меню
+        await MenuHistory(session).take_snapshot()
+        await session.commit()
+
         # Подсчет
         cat_count = await session.execute(select(Category))
         dish_count = await session.execute(select(Dish))
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
-Миграция для создания таблицы audit_logs
+Миграция для создания таблицы audit_logs (в БД аудита, AUDIT_DATABASE_URL)
 Запуск: python scripts/migrate_audit.py
+Перенос журнала из основной БД: scripts/migrate_audit_db.py
 """
 
 import asyncio
@@ -11,7 +12,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy import text
-from app.database import engine, Base
+from app.database import audit_engine
 from app.models import AuditLog  # Импортируем для регистрации модели
 
 
@@ -26,7 +27,7 @@ async def check_table_exists(conn, table_name: str) -> bool:
 async def migrate():
     print("🔄 Запуск миграции для audit_logs...")
 
-    async with engine.begin() as conn:
+    async with audit_engine.begin() as conn:
         # Проверяем, существует ли таблица
         table_exists = await check_table_exists(conn, 'audit_logs')
 
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Миграция: компактное хранение данных журнала аудита.
+Переводит old_data/new_data всех записей audit_logs в сжатый формат:
+- для изменений (update) остаётся только diff изменённых полей,
+  полная копия старой строки удаляется;
+- большие производные поля (image_tiny_base64) заменяются отпечатком;
+- JSON сериализуется компактно и сжимается zlib (CompressedJSON).
+
+Печатает отчёт: сколько байт занимали данные до и после,
+в среднем на запись, по типам действий.
+
+Использование:
+    python scripts/migrate_audit_compact.py            # конвертировать
+    python scripts/migrate_audit_compact.py --dry-run  # только отчёт
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import bindparam, text, update
+from app.database import audit_session
+from app.models import AuditLog
+from app.models.types import CompressedJSON
+from app.services.audit import compact_event
+
+BATCH_SIZE = 1000
+
+
+def stored_size(value: Any) -> int:
+    """Размер значения в базе, байт."""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return len(bytes(value))
+
+
+def decode(column_type: CompressedJSON, value: Any) -> Any:
+    return column_type.process_result_value(value, None)
+
+
+def print_report(report: Dict[str, Dict[str, int]]) -> None:
+    print(f"\n{'Действие':<18}{'Записей':>9}{'До, байт':>13}{'После, байт':>13}{'Экономия/запись':>17}")
+    totals = {'rows': 0, 'before': 0, 'after': 0}
+    for action, row in sorted(report.items()):
+        saved = (row['before'] - row['after']) / row['rows'] if row['rows'] else 0
+        print(f"{action:<18}{row['rows']:>9}{row['before']:>13}{row['after']:>13}{saved:>17.0f}")
+        for key in totals:
+            totals[key] += row[key]
+
+    if not totals['rows']:
+        print("Записей нет")
+        return
+    saved_total = totals['before'] - totals['after']
+    percent = saved_total / totals['before'] * 100 if totals['before'] else 0
+    print(f"{'Итого':<18}{totals['rows']:>9}{totals['before']:>13}{totals['after']:>13}"
+          f"{saved_total / totals['rows']:>17.0f}")
+    print(f"\nСэкономлено: {saved_total} байт ({percent:.1f}%)")
+
+
+async def migrate(dry_run: bool) -> None:
+    column_type = CompressedJSON()
+    report: Dict[str, Dict[str, int]] = {}
+    last_id = 0
+
+    async with audit_session() as session:
+        while True:
+            # Сырые значения: старые строки хранят JSON текстом
+            result = await session.execute(
+                text(
+                    "SELECT id, action, old_data, new_data FROM audit_logs "
+                    "WHERE id > :last_id ORDER BY id LIMIT :limit"
+                ),
+                {'last_id': last_id, 'limit': BATCH_SIZE}
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            params = []
+            for row in rows:
+                old_data, new_data = compact_event(
+                    row.action, decode(column_type, row.old_data), decode(column_type, row.new_data)
+                )
+                before = stored_size(row.old_data) + stored_size(row.new_data)
+                after = (
+                    stored_size(column_type.process_bind_param(old_data, None))
+                    + stored_size(column_type.process_bind_param(new_data, None))
+                )
+                stats = report.setdefault(row.action, {'rows': 0, 'before': 0, 'after': 0})
+                stats['rows'] += 1
+                stats['before'] += before
+                stats['after'] += after
+                params.append({'b_id': row.id, 'b_old': old_data, 'b_new': new_data})
+
+            if not dry_run:
+                table = AuditLog.__table__
+                await session.execute(
+                    update(table)
+                    .where(table.c.id == bindparam('b_id'))
+                    .values(old_data=bindparam('b_old'), new_data=bindparam('b_new')),
+                    params
+                )
+                await session.commit()
+
+    print_report(report)
+    if dry_run:
+        print("\n⏭️  Пробный запуск: данные не изменены")
+    else:
+        print("\n✅ Миграция завершена! Чтобы вернуть место на диске, выполните VACUUM")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Компактное хранение журнала аудита")
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать экономию")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Миграция: перенос журнала аудита в отдельную БД (AUDIT_DATABASE_URL).
+Копирует audit_logs, audit_daily_stats, dish_field_changes и menu_snapshots
+из основной БД пакетами, значения переносятся как есть (сжатые данные не
+перекодируются). Повторный запуск безопасен: уже перенесённые строки
+пропускаются.
+
+Использование:
+    python scripts/migrate_audit_db.py          # скопировать
+    python scripts/migrate_audit_db.py --drop   # скопировать и удалить таблицы из основной БД
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.config import get_settings
+from app.database import AuditBase, engine, audit_engine, init_db
+import app.models  # noqa: F401  регистрирует модели
+
+BATCH_SIZE = 2000
+
+
+async def main_columns(table_name: str) -> list:
+    """Колонки таблицы в основной БД (пусто, если таблицы нет)."""
+    async with engine.connect() as conn:
+        result = await conn.execute(text(f"PRAGMA table_info({table_name})"))
+        return [row[1] for row in result.all()]
+
+
+async def count_rows(db_engine, table_name: str) -> int:
+    async with db_engine.connect() as conn:
+        return (await conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))).scalar() or 0
+
+
+async def copy_table(table) -> int:
+    """Копирует строки таблицы пакетами по rowid."""
+    existing = set(await main_columns(table.name))
+    columns = [column.name for column in table.columns if column.name in existing]
+    column_list = ", ".join(columns)
+    insert_sql = text(
+        f"INSERT OR IGNORE INTO {table.name} ({column_list}) "
+        f"VALUES ({', '.join(':' + name for name in columns)})"
+    )
+
+    copied = 0
+    last_rowid = 0
+    while True:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text(
+                    f"SELECT rowid AS _rowid, {column_list} FROM {table.name} "
+                    f"WHERE rowid > :last ORDER BY rowid LIMIT :limit"
+                ),
+                {'last': last_rowid, 'limit': BATCH_SIZE}
+            )
+            rows = result.mappings().all()
+        if not rows:
+            break
+        last_rowid = rows[-1]['_rowid']
+        async with audit_engine.begin() as conn:
+            await conn.execute(insert_sql, [{name: row[name] for name in columns} for row in rows])
+        copied += len(rows)
+    return copied
+
+
+async def migrate(drop: bool) -> None:
+    settings = get_settings()
+    if settings.audit_database_url == settings.database_url:
+        print("ℹ️  AUDIT_DATABASE_URL совпадает с DATABASE_URL: переносить нечего")
+        return
+
+    print(f"🔄 Перенос журнала аудита в {settings.audit_database_url}")
+    await init_db()
+
+    moved = []
+    for table in AuditBase.metadata.sorted_tables:
+        if not await main_columns(table.name):
+            print(f"  ⏭️  {table.name}: нет в основной БД")
+            continue
+        copied = await copy_table(table)
+        source, target = await count_rows(engine, table.name), await count_rows(audit_engine, table.name)
+        if target < source:
+            print(f"  ❌ {table.name}: в БД аудита {target} строк из {source}")
+            continue
+        print(f"  ✅ {table.name}: скопировано {copied}, в БД аудита {target}")
+        moved.append(table.name)
+
+    if drop and moved:
+        async with engine.begin() as conn:
+            for table_name in moved:
+                await conn.execute(text(f"DROP TABLE {table_name}"))
+                print(f"  🗑️  {table_name} удалена из основной БД")
+        print("\nЧтобы вернуть место на диске, выполните VACUUM основной БД")
+
+    await engine.dispose()
+    await audit_engine.dispose()
+    print("\n✅ Миграция завершена!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Перенос журнала аудита в отдельную БД")
+    parser.add_argument("--drop", action="store_true", help="удалить перенесённые таблицы из основной БД")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.drop))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Миграция: счётчики блюд в таблице categories (dishes_total, dishes_available).
+Добавляет колонки и заполняет их по текущим данным.
+
+Использование:
+    python scripts/migrate_category_counters.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.database import async_session, init_db
+from app.services.category_counters import CategoryCounters
+
+
+async def migrate():
+    """Добавляет колонки счётчиков и пересчитывает их."""
+    print("Добавление счётчиков блюд в таблицу categories...")
+
+    await init_db()
+
+    columns_to_add = [
+        ("dishes_total", "INTEGER NOT NULL DEFAULT 0"),
+        ("dishes_available", "INTEGER NOT NULL DEFAULT 0"),
+    ]
+
+    async with async_session() as session:
+        for column_name, column_type in columns_to_add:
+            try:
+                await session.execute(
+                    text(f"ALTER TABLE categories ADD COLUMN {column_name} {column_type}")
+                )
+                await session.commit()
+                print(f"  ✅ Добавлена колонка: {column_name}")
+            except Exception as e:
+                if "duplicate column" in str(e).lower():
+                    print(f"  ⏭️  Колонка уже существует: {column_name}")
+                else:
+                    print(f"  ❌ Ошибка для {column_name}: {e}")
+                await session.rollback()
+
+        fixed = await CategoryCounters(session).repair()
+        await session.commit()
+        print(f"  ✅ Пересчитано категорий: {len(fixed)}")
+
+    print("\n✅ Миграция завершена!")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
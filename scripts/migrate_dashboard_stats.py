@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Миграция: материализованная статистика главной страницы админки.
+Создаёт таблицу dashboard_stats, индекс по dishes.updated_at
+и заполняет статистику по текущим данным.
+
+Использование:
+    python scripts/migrate_dashboard_stats.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.database import async_session, init_db
+from app.services.dashboard_stats import DashboardStatsService
+
+
+async def migrate():
+    """Создаёт таблицу статистики и пересчитывает её."""
+    print("Создание таблицы dashboard_stats...")
+
+    # Создаёт dashboard_stats, если её нет
+    await init_db()
+
+    async with async_session() as session:
+        await session.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_dishes_updated_at ON dishes (updated_at)")
+        )
+        await session.commit()
+        print("  ✅ Индекс ix_dishes_updated_at")
+
+        stats = await DashboardStatsService(session).recompute()
+        await session.commit()
+        print(f"  ✅ Статистика пересчитана: блюд {stats.dishes_total}, категорий {stats.categories_total}")
+
+    print("\n✅ Миграция завершена!")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Миграция: палитра изображения блюда (dishes.image_palette).
+Добавляет колонку и заполняет палитру и доминантный цвет (самый частый цвет
+палитры вместо среднего) по уже созданному thumbnail - без перекодирования.
+
+Использование:
+    python scripts/migrate_image_palette.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image
+from sqlalchemy import select, text
+from app.database import async_session, init_db
+from app.models import Dish, ImageBlob
+from app.services.image_processor import ImageProcessor
+
+
+def palette_of(url: str | None) -> list[str] | None:
+    """Палитра по файлу размера (URL вида /static/...); None, если файла нет."""
+    if not url or not Path(url.lstrip("/")).exists():
+        return None
+    with Image.open(url.lstrip("/")) as img:
+        return ImageProcessor.extract_palette(img)
+
+
+async def migrate():
+    print("Добавление палитры изображений в таблицу dishes...")
+
+    await init_db()
+
+    async with async_session() as session:
+        try:
+            await session.execute(text("ALTER TABLE dishes ADD COLUMN image_palette VARCHAR(64)"))
+            await session.commit()
+            print("  ✅ Добавлена колонка: image_palette")
+        except Exception as e:
+            if "duplicate column" in str(e).lower():
+                print("  ⏭️  Колонка уже существует: image_palette")
+            else:
+                print(f"  ❌ Ошибка для image_palette: {e}")
+            await session.rollback()
+
+        # Общие размеры (хранилище по хешу): палитра в blob и во всех его блюдах
+        blobs = (await session.execute(select(ImageBlob).where(ImageBlob.status == "ready"))).scalars().all()
+        updated = 0
+        for blob in blobs:
+            if (blob.renditions or {}).get("palette"):
+                continue
+            palette = palette_of(blob.renditions.get("thumbnail"))
+            if palette is None:
+                print(f"  ⏭️  {blob.sha256[:12]}: нет thumbnail")
+                continue
+            # Новый dict: изменение JSON внутри объекта SQLAlchemy не отслеживает
+            blob.renditions = {**blob.renditions, "dominant_color": palette[0], "palette": ",".join(palette)}
+            dishes = await session.execute(select(Dish).where(Dish.image_hash == blob.sha256))
+            for dish in dishes.scalars().all():
+                dish.image_dominant_color = palette[0]
+                dish.image_palette = ",".join(palette)
+                updated += 1
+
+        # Изображения вне хранилища
+        dishes = await session.execute(
+            select(Dish).where(Dish.image_hash.is_(None), Dish.image_thumbnail.is_not(None),
+                               Dish.image_palette.is_(None))
+        )
+        for dish in dishes.scalars().all():
+            palette = palette_of(dish.image_thumbnail)
+            if palette is None:
+                print(f"  ⏭️  [{dish.id}] {dish.name}: нет thumbnail")
+                continue
+            dish.image_dominant_color = palette[0]
+            dish.image_palette = ",".join(palette)
+            updated += 1
+
+        await session.commit()
+        print(f"  ✅ Обновлено блюд: {updated}")
+
+    print("\n✅ Миграция завершена!")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
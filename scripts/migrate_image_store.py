@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Миграция: хранилище изображений по хешу (image_blobs, dishes.image_hash).
+Создаёт таблицу и колонки; с --import-legacy переносит изображения блюд из
+папок static/uploads/dishes/<id>/ в хранилище. Оригиналы старых загрузок не
+сохранялись, поэтому хешем и оригиналом служит large WebP; блюда с
+одинаковыми файлами (например, дубликаты) получают общие размеры.
+
+Использование:
+    python scripts/migrate_image_store.py                   # только схема
+    python scripts/migrate_image_store.py --import-legacy   # и перенос файлов
+"""
+import argparse
+import asyncio
+import hashlib
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, text
+from app.config import get_settings
+from app.database import async_session, init_db
+from app.models import Dish, ImageBlob
+from app.services.image_processor import ImageProcessor
+from app.services.image_store import ImageStore, RENDITION_COLUMNS
+
+
+def import_files(dish: Dish, sha256: str) -> tuple[dict, str]:
+    """Переносит файлы блюда в папку хеша; возвращает (размеры, оригинал) для ImageBlob."""
+    settings = get_settings()
+    directory = ImageProcessor.blob_dir(sha256)
+    directory.mkdir(parents=True, exist_ok=True)
+    source = Path(settings.image_originals_dir) / sha256[:2] / f"{sha256}.webp"
+    source.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(dish.image_large.lstrip("/"), source)
+
+    renditions = {}
+    for key, column in RENDITION_COLUMNS.items():
+        value = getattr(dish, column)
+        if value and value.startswith("/"):
+            file = Path(value.lstrip("/"))
+            if not file.exists():
+                continue
+            shutil.move(file, directory / file.name)
+            value = f"/{settings.image_store_dir}/{sha256[:2]}/{sha256}/{file.name}"
+        renditions[key] = value
+    return renditions, str(source)
+
+
+# (таблица, колонка, тип) - колонки, появившиеся после создания таблиц
+COLUMNS = [
+    ("dishes", "image_hash", "VARCHAR(64)"),
+    ("image_blobs", "pipeline", "JSON"),
+    ("image_jobs", "sizes", "VARCHAR(100)"),
+    ("image_jobs", "effort", "VARCHAR(10) NOT NULL DEFAULT 'max'"),
+    ("image_jobs", "background", "BOOLEAN NOT NULL DEFAULT 0"),
+    ("image_jobs", "output_bytes", "INTEGER"),
+    ("image_jobs", "saved_bytes", "INTEGER"),
+]
+
+
+async def add_columns(session) -> None:
+    for table, column_name, column_type in COLUMNS:
+        try:
+            await session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column_name} {column_type}"))
+            await session.commit()
+            print(f"  ✅ Добавлена колонка: {table}.{column_name}")
+        except Exception as e:
+            if "duplicate column" in str(e).lower():
+                print(f"  ⏭️  Колонка уже существует: {table}.{column_name}")
+            else:
+                print(f"  ❌ Ошибка для {table}.{column_name}: {e}")
+            await session.rollback()
+    await session.execute(text("CREATE INDEX IF NOT EXISTS ix_dishes_image_hash ON dishes (image_hash)"))
+    await session.commit()
+
+
+async def import_legacy(session) -> None:
+    store = ImageStore(session)
+    result = await session.execute(
+        select(Dish).where(Dish.image_hash.is_(None), Dish.image_large.is_not(None)).order_by(Dish.id)
+    )
+    imported = shared = 0
+    for dish in result.scalars().all():
+        large = Path(dish.image_large.lstrip("/"))
+        if not large.exists():
+            print(f"  ⏭️  [{dish.id}] {dish.name}: нет файла {large}")
+            continue
+        sha256 = hashlib.sha256(large.read_bytes()).hexdigest()
+        if await store.get(sha256) is None:
+            renditions, source = import_files(dish, sha256)
+            session.add(ImageBlob(sha256=sha256, source_path=source, status="ready",
+                                  renditions=renditions, ref_count=0))
+            await session.flush()
+            imported += 1
+        else:
+            shared += 1
+        # Оставшиеся файлы папки блюда (старые версии) удаляются
+        await store.assign(dish, sha256)
+        await session.commit()
+        print(f"  ✅ [{dish.id}] {dish.name}: {sha256[:12]}")
+    print(f"  ✅ Перенесено изображений: {imported}, общих с другими блюдами: {shared}")
+
+
+async def migrate(legacy: bool):
+    print("Хранилище изображений по хешу...")
+
+    await init_db()
+
+    async with async_session() as session:
+        await add_columns(session)
+
+        if legacy:
+            await import_legacy(session)
+
+    print("\n✅ Миграция завершена!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Миграция на хранилище изображений по хешу")
+    parser.add_argument("--import-legacy", action="store_true",
+                        help="перенести изображения блюд в хранилище")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.import_legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@
 """
 Скрипт миграции изображений для оптимизации под медленный интернет.
 Добавляет tiny_base64, dominant_color и AVIF версии для существующих блюд.
+Только для старых файлов в папках блюд; изображения в хранилище по хешу
+перегенерирует scripts/rerender_images.py (параллельно, с продолжением).
 
 Использование:
     python scripts/migrate_images_optimization.py
@@ -54,7 +56,9 @@ async def migrate_images():
                 if paths:
                     # Обновляем поля
                     dish.image_tiny_base64 = paths.get("tiny_base64")
+                    dish.image_thumbhash = paths.get("thumbhash")
                     dish.image_dominant_color = paths.get("dominant_color")
+                    dish.image_palette = paths.get("palette")
                     dish.image_small_avif = paths.get("small_avif")
                     dish.image_medium_avif = paths.get("medium_avif")
                     dish.image_large_avif = paths.get("large_avif")
@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.database import async_session, init_db
 from app.models import AdminUser
 from app.services.auth import get_password_hash
+from app.services.dashboard_stats import DashboardStatsService
 
 
 async def create_admin():
@@ -21,6 +22,7 @@ async def create_admin():
             password_hash=get_password_hash("admin123")
         )
         session.add(admin)
+        await DashboardStatsService(session).admins_changed()
         await session.commit()
         print("✅ Админ создан: admin / admin123")
 
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Массовая перегенерация размеров изображений в хранилище по хешу.
+
+Для каждого оригинала (ImageBlob) сравнивает версию обработки его размеров
+(ImageBlob.pipeline) с текущей (ImageProcessor.pipeline_versions()) и ставит
+в очередь image_jobs задание только на устаревшие размеры. Оригинал,
+общий для нескольких блюд, обрабатывается один раз. Задания обрабатываются
+параллельно в пуле процессов, как image_worker.py --drain.
+
+Прогресс хранится в очереди: после сбоя или Ctrl+C повторный запуск не
+создаёт заданий заново, а дорабатывает оставшиеся; уже перегенерированные
+размеры пропускаются по версии.
+
+Использование:
+    python scripts/rerender_images.py --dry-run               # что будет сделано
+    python scripts/rerender_images.py                         # устаревшие размеры
+    python scripts/rerender_images.py --sizes small,medium    # только эти размеры
+    python scripts/rerender_images.py --force --workers 4     # все, в 4 процесса
+
+Перед первым запуском: python scripts/migrate_image_store.py
+"""
+import argparse
+import asyncio
+import signal
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, func
+from app.config import get_settings
+from app.database import async_session, init_db
+from app.models import Dish, ImageBlob, ImageJob
+from app.services.audit import audit_writer
+from app.services.image_jobs import ImageJobQueue, ImageJobRunner, ACTIVE_STATUSES
+from app.services.image_pool import ImagePool
+from app.services.image_processor import ImageProcessor
+
+# Размеры с файлами (tiny - только плейсхолдеры, пересчитывается всегда)
+SIZES = [size_name for size_name in ImageProcessor.SIZES if size_name != "tiny"]
+
+
+def stale_sizes(blob: ImageBlob, sizes: list[str], current: dict[str, str], force: bool) -> list[str]:
+    """Размеры оригинала, сделанные другой версией обработки (force - все)"""
+    if force:
+        return list(sizes)
+    done = blob.pipeline or {}
+    stale = [size_name for size_name in sizes if done.get(size_name) != current[size_name]]
+    if not stale and done.get("tiny") != current["tiny"]:
+        # Изменились только плейсхолдеры: их пересчитывает обработка самого маленького размера
+        stale = [sizes[0]]
+    return stale
+
+
+def files_bytes(blob: ImageBlob, sizes: list[str]) -> int:
+    """Размер файлов указанных размеров оригинала на диске"""
+    total = 0
+    for key, value in (blob.renditions or {}).items():
+        if key.removesuffix("_avif") in sizes and value and value.startswith("/"):
+            file = Path(value.lstrip("/"))
+            if file.exists():
+                total += file.stat().st_size
+    return total
+
+
+def format_bytes(value: int) -> str:
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    for unit in ("Б", "КБ", "МБ"):
+        if value < 1024:
+            return f"{sign}{value:.0f} {unit}" if unit == "Б" else f"{sign}{value:.1f} {unit}"
+        value /= 1024
+    return f"{sign}{value:.1f} ГБ"
+
+
+async def plan(sizes: list[str], force: bool, dry_run: bool, limit: int | None) -> dict[str, list[str]]:
+    """
+    Ставит в очередь задания на устаревшие размеры (кроме dry_run).
+
+    Returns:
+        {sha256: размеры} оригиналов, которые будут обработаны, включая
+        задания, оставшиеся в очереди от прерванного запуска
+    """
+    current = ImageProcessor.pipeline_versions()
+    planned: dict[str, list[str]] = {}
+    async with async_session() as session:
+        legacy = await session.execute(
+            select(func.count(Dish.id)).where(Dish.image_hash.is_(None), Dish.image_small.is_not(None))
+        )
+        legacy_count = legacy.scalar() or 0
+        if legacy_count:
+            print(f"  ⏭️  Блюд со старыми файлами (не в хранилище): {legacy_count}")
+            print("     Перенесите их: python scripts/migrate_image_store.py --import-legacy")
+
+        result = await session.execute(
+            select(ImageBlob)
+            .where(ImageBlob.status == "ready", ImageBlob.ref_count > 0)
+            .order_by(ImageBlob.sha256)
+        )
+        blobs = result.scalars().all()
+        active_result = await session.execute(
+            select(ImageJob.source_hash, ImageJob.sizes).where(ImageJob.status.in_(ACTIVE_STATUSES))
+        )
+        active = dict(active_result.all())
+
+        queue = ImageJobQueue(session)
+        missing = current_count = 0
+        for blob in blobs:
+            if limit is not None and len(planned) >= limit:
+                break
+            if blob.sha256 in active:
+                # Задание прерванного запуска (или загрузки) ещё в очереди
+                queued = active[blob.sha256]
+                planned[blob.sha256] = queued.split(",") if queued else list(SIZES)
+                continue
+            stale = stale_sizes(blob, sizes, current, force)
+            if not stale:
+                current_count += 1
+                continue
+            if not blob.source_path or not Path(blob.source_path).exists():
+                missing += 1
+                print(f"  ⏭️  {blob.sha256[:12]}: нет оригинала {blob.source_path}")
+                continue
+            planned[blob.sha256] = stale
+            if not dry_run:
+                # Все размеры - обычное задание, как при загрузке
+                await queue.enqueue_rerender(blob, None if stale == SIZES else stale)
+        if not dry_run:
+            await session.commit()
+
+    print(f"  Оригиналов: {len(blobs)}, актуальных: {current_count}, без оригинала: {missing}")
+    print(f"  К обработке: {len(planned)}")
+    return planned
+
+
+async def measure(planned: dict[str, list[str]]) -> int:
+    """Размер файлов запланированных размеров на диске"""
+    if not planned:
+        return 0
+    async with async_session() as session:
+        result = await session.execute(select(ImageBlob).where(ImageBlob.sha256.in_(list(planned))))
+        return sum(files_bytes(blob, planned[blob.sha256]) for blob in result.scalars().all())
+
+
+async def count_active(hashes: list[str]) -> int:
+    async with async_session() as session:
+        result = await session.execute(
+            select(func.count(ImageJob.id))
+            .where(ImageJob.source_hash.in_(hashes), ImageJob.status.in_(ACTIVE_STATUSES))
+        )
+        return result.scalar() or 0
+
+
+async def drain(planned: dict[str, list[str]], workers: int) -> bool:
+    """Обрабатывает задания запланированных оригиналов; False - прервано Ctrl+C"""
+    settings = get_settings()
+    pool = ImagePool(
+        workers=workers,
+        max_pending=max(1, workers) * 2,
+        queue_timeout=settings.image_queue_timeout
+    )
+    runner = ImageJobRunner(pool=pool, concurrency=max(1, workers) * 2, poll_interval=0.2)
+    hashes = list(planned)
+    total = len(hashes)
+    # Ctrl+C: выполняемые задания возвращаются в очередь сразу, а не по истечении аренды
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGINT, stop.set)
+    started = time.perf_counter()
+    last_report = 0.0
+    await audit_writer.start()
+    try:
+        while not stop.is_set() and (remaining := await count_active(hashes)):
+            await runner.run_once()
+            now = time.perf_counter()
+            if now - last_report >= 5:
+                last_report = now
+                done = total - remaining
+                print(f"  🔄 {done}/{total}, {done / (now - started):.2f} изобр./с")
+            try:
+                await asyncio.wait_for(stop.wait(), runner.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await runner.stop(timeout=0 if stop.is_set() else 30.0)
+        await pool.stop()
+        await audit_writer.stop()
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGINT)
+
+    elapsed = time.perf_counter() - started
+    print(f"  ✅ Обработано: {pool.completed}, ошибок: {pool.failed}")
+    print(f"  ⏱️  {elapsed:.1f} с, {pool.completed / elapsed if elapsed else 0:.2f} изобр./с")
+    return not stop.is_set()
+
+
+async def run(args: argparse.Namespace) -> None:
+    sizes = args.sizes.split(",") if args.sizes else list(SIZES)
+    unknown = [size_name for size_name in sizes if size_name not in SIZES]
+    if unknown:
+        print(f"❌ Неизвестные размеры: {', '.join(unknown)} (есть: {', '.join(SIZES)})")
+        sys.exit(2)
+    # В порядке SIZES: самый маленький - первым
+    sizes = [size_name for size_name in SIZES if size_name in sizes]
+
+    print("Перегенерация изображений...")
+    print(f"  Размеры: {', '.join(sizes)}{' (все заново)' if args.force else ''}")
+    await init_db()
+
+    planned = await plan(sizes, args.force, args.dry_run, args.limit)
+    before = await measure(planned)
+    print(f"  Файлы этих размеров сейчас: {format_bytes(before)}")
+    if args.dry_run or not planned:
+        print("\n✅ Готово (ничего не изменено)" if args.dry_run else "\n✅ Всё актуально")
+        return
+
+    if not await drain(planned, args.workers):
+        print("\n⏹️  Остановлено; повторный запуск продолжит с того же места")
+        return
+
+    after = await measure(planned)
+    print(f"  📦 Было {format_bytes(before)}, стало {format_bytes(after)}, "
+          f"сэкономлено {format_bytes(before - after)}")
+    print("\n✅ Перегенерация завершена!")
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Массовая перегенерация изображений")
+    parser.add_argument("--sizes", help=f"только эти размеры через запятую ({','.join(SIZES)})")
+    parser.add_argument("--workers", type=int, default=max(1, settings.image_workers),
+                        help="процессов обработки (0 - в этом процессе)")
+    parser.add_argument("--force", action="store_true", help="перегенерировать и актуальные размеры")
+    parser.add_argument("--dry-run", action="store_true", help="только показать, что будет сделано")
+    parser.add_argument("--limit", type=int, help="не больше стольких оригиналов")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("\n⏹️  Остановлено")
+
+
+if __name__ == "__main__":
+    main()
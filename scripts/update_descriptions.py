@@ -8,6 +8,8 @@ sys.path.insert(0, '/Users/denisstorozev/Desktop/Проекты /PythonProject14
 from sqlalchemy import select, update
 from app.database import async_session, init_db
 from app.models import Dish
+from app.services.dashboard_stats import DashboardStatsService
+from app.services.menu_history import MenuHistory
 
 # Данные из PDF с полной граммовкой ингредиентов (столбиком)
 DISH_UPDATES = {
@@ -366,6 +368,11 @@ async def update_dishes():
             else:
                 not_found.append(dish.name)
 
+        await DashboardStatsService(session).recompute()
+        await session.commit()
+
+        # Изменения мимо журнала аудита: фиксируем снимок меню
+        await MenuHistory(session).take_snapshot()
         await session.commit()
 
         print(f"\n{'='*50}")
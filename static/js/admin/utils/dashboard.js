@@ -43,16 +43,72 @@
             if (this.container && this.periodSelect) this.init();
         }
 
-        init() { this.periodSelect.addEventListener('change', () => this.loadActivity()); }
+        init() {
+            this.periodSelect.addEventListener('change', () => this.loadActivity());
+            // Server-rendered first page carries the cursor of the next one
+            this.nextCursor = this.container.dataset.nextCursor || null;
+            this.renderMoreButton();
+            // Newest event id shown; new events are long-polled after it
+            this.lastId = parseInt(this.container.dataset.lastId, 10) || 0;
+            this.pollNew();
+        }
+
+        async pollNew() {
+            while (true) {
+                if (document.hidden) {
+                    await new Promise(resolve => document.addEventListener('visibilitychange', resolve, { once: true }));
+                    continue;
+                }
+                try {
+                    const params = new URLSearchParams({ after_id: this.lastId, wait: 25 });
+                    const response = await fetch(`${this.apiEndpoint}?${params}`);
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    const data = await response.json();
+                    this.lastId = Math.max(this.lastId, data.last_id);
+                    this.prependItems(data.items);
+                } catch (e) {
+                    console.error('Error polling activity:', e);
+                    await new Promise(resolve => setTimeout(resolve, 10000));
+                }
+            }
+        }
+
+        prependItems(items) {
+            if (!items.length) return;
+            this.container.querySelector('.activity-empty')?.remove();
+            this.container.insertAdjacentHTML('afterbegin', items.map((item, i) => this.renderItem(item, i)).join(''));
+        }
 
         async loadActivity() {
             this.showLoading();
             try {
                 const response = await fetch(`${this.apiEndpoint}?period=${this.periodSelect.value}`);
-                this.renderActivity((await response.json()).items);
+                const data = await response.json();
+                this.nextCursor = data.next_cursor;
+                this.lastId = Math.max(this.lastId, ...data.items.map(item => item.id));
+                this.renderActivity(data.items);
             } catch (e) { console.error('Error loading activity:', e); window.toast?.error('Ошибка', 'Не удалось загрузить историю'); }
         }
 
+        async loadMore() {
+            if (!this.nextCursor) return;
+            const params = new URLSearchParams({ period: this.periodSelect.value, cursor: this.nextCursor });
+            try {
+                const response = await fetch(`${this.apiEndpoint}?${params}`);
+                const data = await response.json();
+                this.nextCursor = data.next_cursor;
+                this.container.querySelector('.activity-feed__more')?.remove();
+                this.container.insertAdjacentHTML('beforeend', data.items.map((item, i) => this.renderItem(item, i)).join(''));
+                this.renderMoreButton();
+            } catch (e) { console.error('Error loading activity:', e); window.toast?.error('Ошибка', 'Не удалось загрузить историю'); }
+        }
+
+        renderMoreButton() {
+            if (!this.nextCursor) return;
+            this.container.insertAdjacentHTML('beforeend', '<button type="button" class="btn btn--ghost btn--small activity-feed__more">Показать ещё</button>');
+            this.container.querySelector('.activity-feed__more').addEventListener('click', () => this.loadMore());
+        }
+
         showLoading() {
             const skeleton = '<div class="skeleton-activity-item"><div class="skeleton skeleton-avatar"></div><div class="skeleton-content"><div class="skeleton skeleton-text" style="width:80%"></div><div class="skeleton skeleton-text" style="width:60%"></div></div></div>';
             this.container.innerHTML = `<div class="activity-feed__loading">${skeleton.repeat(5)}</div>`;
@@ -63,7 +119,12 @@
                 this.container.innerHTML = '<div class="activity-empty"><svg width="48" height="48" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="1"><rect x="3" y="3" width="18" height="18" rx="2" ry="2"></rect><line x1="3" y1="9" x2="21" y2="9"></line></svg><p>Нет активности за этот период</p></div>';
                 return;
             }
-            this.container.innerHTML = items.map((item, i) => `
+            this.container.innerHTML = items.map((item, i) => this.renderItem(item, i)).join('');
+            this.renderMoreButton();
+        }
+
+        renderItem(item, i) {
+            return `
                 <div class="activity-item" style="animation-delay:${i * 0.05}s">
                     <div class="activity-item__icon activity-item__icon--${item.action}">${ACTION_ICONS[item.action] || ACTION_ICONS.default}</div>
                     <div class="activity-item__content">
@@ -74,7 +135,7 @@
                         <div class="activity-item__entity">${item.entity_type_display}: <strong>${item.entity_name || '—'}</strong></div>
                     </div>
                     <time class="activity-item__time">${this.formatTimeAgo(item.created_at)}</time>
-                </div>`).join('');
+                </div>`;
         }
 
         formatTimeAgo(isoString) {
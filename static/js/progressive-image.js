@@ -4,7 +4,7 @@
  *
  * Последовательность:
  * 1. Мгновенно: CSS background-color (dominant color)
- * 2. <50ms: tiny placeholder (inline base64)
+ * 2. <50ms: tiny placeholder (inline base64 или ThumbHash в data-thumbhash)
  * 3. По viewport: целевой размер по Network API
  * 4. Поддержка AVIF с fallback на WebP
  */
@@ -17,6 +17,120 @@
         console.warn('NetworkAdapter not loaded, using default behavior');
     }
 
+    /**
+     * Декодирует ThumbHash (base64) в PNG data URI ~32px
+     * Формат: https://evanw.github.io/thumbhash/ (кодирует app/services/thumbhash.py)
+     * @param {string} value
+     * @returns {string}
+     */
+    function thumbHashToDataURL(value) {
+        const { PI, min, max, cos, round } = Math;
+        const hash = Uint8Array.from(atob(value), (c) => c.charCodeAt(0));
+        const header24 = hash[0] | (hash[1] << 8) | (hash[2] << 16);
+        const header16 = hash[3] | (hash[4] << 8);
+        const lDc = (header24 & 63) / 63;
+        const pDc = ((header24 >> 6) & 63) / 31.5 - 1;
+        const qDc = ((header24 >> 12) & 63) / 31.5 - 1;
+        const lScale = ((header24 >> 18) & 31) / 31;
+        const hasAlpha = header24 >> 23;
+        const pScale = ((header16 >> 3) & 63) / 63;
+        const qScale = ((header16 >> 9) & 63) / 63;
+        const isLandscape = header16 >> 15;
+        const lx = max(3, isLandscape ? (hasAlpha ? 5 : 7) : header16 & 7);
+        const ly = max(3, isLandscape ? header16 & 7 : (hasAlpha ? 5 : 7));
+        const aDc = hasAlpha ? (hash[5] & 15) / 15 : 1;
+        const aScale = (hash[5] >> 4) / 15;
+        const acStart = hasAlpha ? 6 : 5;
+        let acIndex = 0;
+
+        const decodeChannel = (nx, ny, scale) => {
+            const ac = [];
+            for (let cy = 0; cy < ny; cy++) {
+                for (let cx = cy ? 0 : 1; cx * ny < nx * (ny - cy); cx++, acIndex++) {
+                    const nibble = (hash[acStart + (acIndex >> 1)] >> ((acIndex & 1) << 2)) & 15;
+                    ac.push((nibble / 7.5 - 1) * scale);
+                }
+            }
+            return ac;
+        };
+        const lAc = decodeChannel(lx, ly, lScale);
+        const pAc = decodeChannel(3, 3, pScale * 1.25);
+        const qAc = decodeChannel(3, 3, qScale * 1.25);
+        const aAc = hasAlpha ? decodeChannel(5, 5, aScale) : null;
+
+        // Пропорции: число частот яркости по сторонам
+        const ratioX = isLandscape ? (hasAlpha ? 5 : 7) : hash[3] & 7;
+        const ratioY = isLandscape ? hash[3] & 7 : (hasAlpha ? 5 : 7);
+        const ratio = ratioX / ratioY;
+        const w = round(ratio > 1 ? 32 : 32 * ratio);
+        const h = round(ratio > 1 ? 32 / ratio : 32);
+
+        const canvas = document.createElement('canvas');
+        canvas.width = w;
+        canvas.height = h;
+        const ctx = canvas.getContext('2d');
+        const image = ctx.createImageData(w, h);
+        const rgba = image.data;
+        const fx = [];
+        const fy = [];
+        for (let y = 0, i = 0; y < h; y++) {
+            for (let x = 0; x < w; x++, i += 4) {
+                let l = lDc, p = pDc, q = qDc, a = aDc;
+                for (let cx = 0, n = max(lx, hasAlpha ? 5 : 3); cx < n; cx++) {
+                    fx[cx] = cos(PI / w * (x + 0.5) * cx);
+                }
+                for (let cy = 0, n = max(ly, hasAlpha ? 5 : 3); cy < n; cy++) {
+                    fy[cy] = cos(PI / h * (y + 0.5) * cy);
+                }
+                for (let cy = 0, j = 0; cy < ly; cy++) {
+                    for (let cx = cy ? 0 : 1, fy2 = fy[cy] * 2; cx * ly < lx * (ly - cy); cx++, j++) {
+                        l += lAc[j] * fx[cx] * fy2;
+                    }
+                }
+                for (let cy = 0, j = 0; cy < 3; cy++) {
+                    for (let cx = cy ? 0 : 1, fy2 = fy[cy] * 2; cx < 3 - cy; cx++, j++) {
+                        const f = fx[cx] * fy2;
+                        p += pAc[j] * f;
+                        q += qAc[j] * f;
+                    }
+                }
+                if (aAc) {
+                    for (let cy = 0, j = 0; cy < 5; cy++) {
+                        for (let cx = cy ? 0 : 1, fy2 = fy[cy] * 2; cx < 5 - cy; cx++, j++) {
+                            a += aAc[j] * fx[cx] * fy2;
+                        }
+                    }
+                }
+                const b = l - 2 / 3 * p;
+                const r = (3 * l - b + q) / 2;
+                const g = r - q;
+                rgba[i] = max(0, 255 * min(1, r));
+                rgba[i + 1] = max(0, 255 * min(1, g));
+                rgba[i + 2] = max(0, 255 * min(1, b));
+                rgba[i + 3] = max(0, 255 * min(1, a));
+            }
+        }
+        ctx.putImageData(image, 0, 0);
+        return canvas.toDataURL();
+    }
+
+    /**
+     * Подставляет ThumbHash-плейсхолдеры изображениям без src
+     * @param {ParentNode} root
+     */
+    function applyThumbHashes(root) {
+        root.querySelectorAll('img[data-thumbhash]:not([src])').forEach((img) => {
+            try {
+                img.src = thumbHashToDataURL(img.dataset.thumbhash);
+            } catch (error) {
+                console.warn('ThumbHash decode failed:', error);
+            }
+        });
+    }
+
+    // Скрипт подключён в конце body: плейсхолдеры - до первой отрисовки карточек
+    applyThumbHashes(document);
+
     /**
      * Управляет прогрессивной загрузкой одного изображения
      */
@@ -229,6 +343,7 @@
          * @private
          */
         _observeImages() {
+            applyThumbHashes(document);
             const selector = 'img[data-src], img.blur-up[data-small], img.blur-up[data-medium]';
             document.querySelectorAll(selector).forEach((img) => {
                 if (!this.images.has(img)) {
@@ -243,6 +358,7 @@
          * @private
          */
         _loadAllImmediately() {
+            applyThumbHashes(document);
             const selector = 'img[data-src], img.blur-up';
             document.querySelectorAll(selector).forEach((img) => {
                 const progressive = new ProgressiveImage(img);